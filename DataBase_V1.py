@@ -1,5 +1,5 @@
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
+from tkinter import ttk, filedialog, messagebox, scrolledtext, simpledialog
 import sys
 
 try:
@@ -22,8 +22,68 @@ except ImportError:
     HAS_MATPLOTLIB = False
 
 from datetime import datetime
+from refresh_scheduler import RefreshScheduler
+from display_format import FormattedColumns
+from compact_store import CompactGradebook
+from correlation import CorrelationCache, correlation_figure
+from anomalies import AnomalyFlags, TAG_COLORS
+from sqlite_store import GradebookStore
+from gradebook_stats import overview_stats, assignment_stats, column_stats, rankings
+from approx_stats import ApproxSummary
+from weighting import load_scheme, checked, weights_path
+from gradebook_model import DERIVED, GradebookModel
+from validation import validate, fix
+from dashboard import DashboardRenderer
+from file_watch import TailReader
+from standing import Standing, profile_text, profile_figure
+from curving import WhatIf, CURVES, CURVE_HELP, whatif_text, whatif_figure
+from binning import STRATEGIES, STRATEGY_LABELS, bin_edges
+from workspace import Workspace, OVERALL, comparison_text, comparison_figure
+from grouped_stats import GroupedStats, cohort_like, grouped_text, grouped_figure
+from report_view import Report, ReportView
+from query_filter import OPS, MaskCache, clause_text, describe, or_groups, parse_query
+from clustering import Clustering, DEFAULT_K, K_CHOICES, cluster_tags, cluster_text, cluster_figure
+import base64
+import threading
+import os
+
+# imported gradebooks live here between sessions
+STORE_PATH = os.path.join(os.path.expanduser("~"), ".gradebook_store.db")
+DB_PAGE_ROWS = 200
+DB_WINDOW_PAGES = 5   # pages kept in the table while scrolling a database
+WATCH_MS = 2000   # how often a watched file is checked for new rows
+# overall standing shown as extra table columns -> cell format
+STANDING_FORMATS = {'Rank': '%.0f', 'Percentile': '%.0f'}
+# Groups tab chart choices -> GroupedStats statistic
+GROUP_STATS = (('Mean', 'mean'), ('Median', 'median'), ('Pass rate', 'pass_rate'))
 
 class GradebookViewer:
+    # every derived view and the inputs it reads (used by the refresh scheduler)
+    VIEWS = ('table', 'overview', 'assignments', 'rankings', 'chart', 'comparison', 'correlation',
+             'dashboard', 'whatif', 'sections', 'groups', 'clusters')
+    # views that only show the students the structured filter keeps
+    FILTERED_VIEWS = ('table', 'overview', 'assignments', 'rankings', 'chart', 'comparison',
+                      'correlation', 'dashboard')
+    VIEW_INPUTS = {
+        'data': VIEWS,
+        'search': ('table',),
+        'query': FILTERED_VIEWS,
+        'chart_column': ('chart',),
+        'correlation_kind': ('correlation',),
+        'curve': ('whatif',),
+        'section_subject': ('sections',),
+        'group_by': ('groups',),
+        'cluster_k': ('clusters',),
+        # rows appended by the file watch are inserted into the table directly
+        'rows_appended': tuple(v for v in VIEWS if v != 'table'),
+    }
+    
+    # everything that belongs to one open gradebook; switching section tabs
+    # swaps these in and out, the rest of the viewer doesn't know about sections
+    SECTION_FIELDS = ('df', 'shown_rows', 'numeric_cols', 'formatted', 'compact', 'model',
+                      'anomalies', 'row_flags', 'standing', 'tail', 'loaded_path', 'auto_fixed',
+                      'whatif', 'clustering')
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Gradebook Viewer Pro")
@@ -32,9 +92,77 @@ class GradebookViewer:
         
         self.df = None
         self.numeric_cols = []
-        self.filtered_df = None
+        self.shown_rows = None       # positions of the rows the table shows (filter + search)
+        self.formatted = None
+        self.compact = None
+        # grade matrix + Total/Average/Status/GPA, built lazily and cached per input version
+        self.model = None
+        self.corr_cache = CorrelationCache()
+        # per-column stats (quartiles etc.) of the current data, shared by the
+        # Assignments tab and the histogram binning
+        self.col_stats = {}
+        self.col_stats_version = None
+        # dashboard panels are drawn in worker processes, the pool is started on first use
+        self.dash_renderer = DashboardRenderer()
+        self.dash_job = None
+        self.dash_images = []
+        self.anomalies = None
+        self.row_flags = None
+        # rank / percentile of every student, and the drill-down window showing one
+        self.standing = None
+        self.profile_win = None
+        # what-if curves: an overlay on the model's grade matrix, never written back
+        self.whatif = None
+        self.whatif_version = None
+        self.curve_steps = 0
+        self.grouped = None          # (data version, group column, GroupedStats)
+        self.clustering = None       # (model, model version, k, Clustering)
+        self.query = []              # structured filter: [(connector, (column, op, value)), ...]
+        self.query_version = 0
+        self.query_masks = MaskCache()
+        # credit / category weights for student averages (None = plain mean):
+        # the weights.json next to the loaded file, unless one was picked with
+        # the Weights button
+        self.weights = None
+        self.weights_file = None
+        self.weights_chosen = False
+        self.weight_problems = []    # how the weights don't fit the current gradebook
+        
+        # several gradebooks open at once, one tab each (see workspace.py)
+        self.workspace = Workspace()
+        self.switching_section = False
+        
+        # SQLite mode: the table pages rows in and the tabs use SQL aggregates
+        self.store = None
+        self.store_book = None
+        self.db_pages = []           # [(first row_no, last row_no, tree items)] in view order
+        self.db_start = self.db_end = 0   # records before the window / up to its end
+        self.db_total = 0
+        self.db_fetching = False
+        
+        # approximate mode: sketches from one streaming pass, exact data loads behind it
+        self.approx = None
+        self.approx_job = None
+        self.exact_job = None
+        
+        # watch mode: the loaded CSV is polled and new rows at its end are appended
+        self.tail = None
+        self.loaded_path = None
+        self.auto_fixed = False
+        self.watch_job = None
+        
+        # notebook tabs are rendered lazily: each remembers the inputs it was last
+        # rendered with and is only recomputed when shown with different ones
+        self.data_version = 0
+        self.tab_views = {}
+        self.tab_keys = {}
+        
+        # coalesces bursts of refresh requests into one render per quiet period
+        self.scheduler = RefreshScheduler(self.root, self.render_views, self.VIEWS,
+                                          self.VIEW_INPUTS, delay_ms=150)
         
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
     
     def setup_ui(self):
         # Top toolbar
@@ -48,10 +176,38 @@ class GradebookViewer:
         btn_frame = tk.Frame(toolbar, bg="#2c3e50")
         btn_frame.pack(side=tk.RIGHT, padx=25)
         
+        # opt-in: keep grades as uint8 + missing bitmask, names dictionary encoded
+        self.compact_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(btn_frame, text="Compact", variable=self.compact_var,
+                      font=("Arial", 10), bg="#2c3e50", fg="white", selectcolor="#34495e",
+                      activebackground="#2c3e50", activeforeground="white").pack(side=tk.LEFT, padx=5)
+        
+        # keep reading rows the LMS appends to the loaded CSV
+        self.watch_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(btn_frame, text="👁 Watch", variable=self.watch_var, command=self.toggle_watch,
+                      font=("Arial", 10), bg="#2c3e50", fg="white", selectcolor="#34495e",
+                      activebackground="#2c3e50", activeforeground="white").pack(side=tk.LEFT, padx=5)
+        
         tk.Button(btn_frame, text="📁 Load File", command=self.load_file,
                  font=("Arial", 11, "bold"), bg="#3498db", fg="white",
                  padx=15, pady=8, cursor="hand2").pack(side=tk.LEFT, padx=5)
         
+        tk.Button(btn_frame, text="➕ Section", command=self.add_section,
+                 font=("Arial", 11, "bold"), bg="#2980b9", fg="white",
+                 padx=15, pady=8, cursor="hand2").pack(side=tk.LEFT, padx=5)
+        
+        tk.Button(btn_frame, text="⚡ Quick Look", command=self.load_approximate,
+                 font=("Arial", 11, "bold"), bg="#e67e22", fg="white",
+                 padx=15, pady=8, cursor="hand2").pack(side=tk.LEFT, padx=5)
+        
+        tk.Button(btn_frame, text="🗄 Open in DB", command=self.open_database,
+                 font=("Arial", 11, "bold"), bg="#16a085", fg="white",
+                 padx=15, pady=8, cursor="hand2").pack(side=tk.LEFT, padx=5)
+        
+        tk.Button(btn_frame, text="⚖ Weights", command=self.load_weights,
+                 font=("Arial", 11, "bold"), bg="#7f8c8d", fg="white",
+                 padx=15, pady=8, cursor="hand2").pack(side=tk.LEFT, padx=5)
+        
         tk.Button(btn_frame, text="💾 Export", command=self.export_statistics,
                  font=("Arial", 11, "bold"), bg="#27ae60", fg="white",
                  padx=15, pady=8, cursor="hand2").pack(side=tk.LEFT, padx=5)
@@ -74,6 +230,38 @@ class GradebookViewer:
         tk.Button(search_frame, text="Clear", command=lambda: self.search_var.set(""),
                  bg="#95a5a6", fg="white", padx=10, pady=5).pack(side=tk.LEFT, padx=5)
         
+        # Structured filter: column/op/value clauses joined with AND / OR; the
+        # table and the stats/chart tabs only show the students it keeps
+        query_frame = tk.Frame(self.root, bg="white", relief=tk.RIDGE, bd=1)
+        query_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        tk.Label(query_frame, text="🧮", font=("Arial", 14), bg="white").pack(side=tk.LEFT, padx=10)
+        
+        self.query_col_var = tk.StringVar()
+        self.query_col_combo = ttk.Combobox(query_frame, textvariable=self.query_col_var,
+                                            state="readonly", width=14)
+        self.query_col_combo.pack(side=tk.LEFT, padx=2, pady=8)
+        self.query_op_var = tk.StringVar(value=OPS[0])
+        ttk.Combobox(query_frame, textvariable=self.query_op_var, values=list(OPS),
+                     state="readonly", width=8).pack(side=tk.LEFT, padx=2)
+        self.query_value_var = tk.StringVar()
+        query_entry = tk.Entry(query_frame, textvariable=self.query_value_var, font=("Arial", 11), width=10)
+        query_entry.pack(side=tk.LEFT, padx=2)
+        query_entry.bind("<Return>", lambda e: self.add_clause('and'))
+        
+        for connector in ('and', 'or'):
+            tk.Button(query_frame, text=f"+ {connector.upper()}", command=lambda c=connector: self.add_clause(c),
+                     bg="#3498db", fg="white", padx=6).pack(side=tk.LEFT, padx=2)
+        tk.Button(query_frame, text="✎", command=self.edit_query,
+                 bg="#95a5a6", fg="white", padx=6).pack(side=tk.LEFT, padx=2)
+        tk.Button(query_frame, text="Clear", command=self.clear_query,
+                 bg="#95a5a6", fg="white", padx=10).pack(side=tk.LEFT, padx=5)
+        
+        self.query_chips = tk.Frame(query_frame, bg="white")
+        self.query_chips.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.query_label = tk.Label(query_frame, text="", bg="white", fg="#7f8c8d", font=("Arial", 9))
+        self.query_label.pack(side=tk.RIGHT, padx=10)
+        
         # Main content
         content = tk.PanedWindow(self.root, orient=tk.HORIZONTAL, sashwidth=5, bg="#bdc3c7")
         content.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -85,13 +273,23 @@ class GradebookViewer:
         tk.Label(left, text="📋 Student Data", font=("Arial", 14, "bold"),
                 bg="#34495e", fg="white", pady=12).pack(fill=tk.X)
         
+        # one tab per open gradebook (section); the tabs only switch, the table is shared
+        section_row = tk.Frame(left, bg="white")
+        section_row.pack(fill=tk.X, padx=5, pady=(5, 0))
+        tk.Button(section_row, text="✖", command=self.close_section,
+                 bg="#95a5a6", fg="white", padx=6).pack(side=tk.RIGHT)
+        self.section_bar = ttk.Notebook(section_row, height=0)
+        self.section_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.section_bar.bind("<<NotebookTabChanged>>", self.on_section_changed)
+        
         tree_frame = tk.Frame(left)
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         scroll_y = ttk.Scrollbar(tree_frame)
         scroll_x = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL)
         
-        self.tree = ttk.Treeview(tree_frame, yscrollcommand=scroll_y.set,
+        self.scroll_y = scroll_y
+        self.tree = ttk.Treeview(tree_frame, yscrollcommand=self.on_tree_scroll,
                                 xscrollcommand=scroll_x.set)
         
         scroll_y.config(command=self.tree.yview)
@@ -99,6 +297,9 @@ class GradebookViewer:
         scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
         scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
         self.tree.pack(fill=tk.BOTH, expand=True)
+        # double-click a student for their profile, selection then keeps it in sync
+        self.tree.bind("<Double-1>", self.open_profile)
+        self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
         
         # Right: Statistics
         right = tk.Frame(content, bg="white", relief=tk.RIDGE, bd=2)
@@ -109,10 +310,12 @@ class GradebookViewer:
         
         self.notebook = ttk.Notebook(right)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
         
         # Tab 1: Overview
         self.overview_tab = tk.Frame(self.notebook, bg="white")
         self.notebook.add(self.overview_tab, text="📈 Overview")
+        self.tab_views[str(self.overview_tab)] = 'overview'
         
         self.overview_text = scrolledtext.ScrolledText(self.overview_tab, 
                                                        wrap=tk.WORD, 
@@ -123,16 +326,17 @@ class GradebookViewer:
         # Tab 2: Assignments
         self.assign_tab = tk.Frame(self.notebook, bg="white")
         self.notebook.add(self.assign_tab, text="📝 Assignments")
+        self.tab_views[str(self.assign_tab)] = 'assignments'
         
-        self.assign_text = scrolledtext.ScrolledText(self.assign_tab, 
-                                                     wrap=tk.WORD,
-                                                     font=("Consolas", 9),
-                                                     bg="#f8f9fa", padx=15, pady=15)
-        self.assign_text.pack(fill=tk.BOTH, expand=True)
+        # one section per assignment, only the ones on screen are built
+        self.assign_report = ReportView(self.assign_tab, wrap=tk.WORD, font=("Consolas", 9),
+                                        bg="#f8f9fa", padx=15, pady=15)
+        self.assign_report.pack(fill=tk.BOTH, expand=True)
         
         # Tab 3: Rankings
         self.rank_tab = tk.Frame(self.notebook, bg="white")
         self.notebook.add(self.rank_tab, text="🏆 Rankings")
+        self.tab_views[str(self.rank_tab)] = 'rankings'
         
         rank_container = tk.Frame(self.rank_tab, bg="white")
         rank_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -141,24 +345,23 @@ class GradebookViewer:
                                  font=("Arial", 11, "bold"), bg="white", fg="#27ae60")
         top_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
-        self.top_text = scrolledtext.ScrolledText(top_frame, wrap=tk.WORD,
-                                                  font=("Consolas", 10), bg="#f8f9fa",
-                                                  height=13)
-        self.top_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.top_report = ReportView(top_frame, jump=False, wrap=tk.WORD,
+                                     font=("Consolas", 10), bg="#f8f9fa", height=13)
+        self.top_report.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         bottom_frame = tk.LabelFrame(rank_container, text="⚠️ Needs Attention",
                                      font=("Arial", 11, "bold"), bg="white", fg="#e74c3c")
         bottom_frame.pack(fill=tk.BOTH, expand=True)
         
-        self.bottom_text = scrolledtext.ScrolledText(bottom_frame, wrap=tk.WORD,
-                                                     font=("Consolas", 10), bg="#f8f9fa",
-                                                     height=13)
-        self.bottom_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.bottom_report = ReportView(bottom_frame, jump=False, wrap=tk.WORD,
+                                        font=("Consolas", 10), bg="#f8f9fa", height=13)
+        self.bottom_report.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         if HAS_MATPLOTLIB:
             # Tab 4: Charts
             self.chart_tab = tk.Frame(self.notebook, bg="white")
             self.notebook.add(self.chart_tab, text="📊 Charts")
+            self.tab_views[str(self.chart_tab)] = 'chart'
             
             chart_controls = tk.Frame(self.chart_tab, bg="white")
             chart_controls.pack(fill=tk.X, padx=15, pady=12)
@@ -170,7 +373,19 @@ class GradebookViewer:
             self.chart_combo = ttk.Combobox(chart_controls, textvariable=self.chart_var,
                                            state="readonly", width=25)
             self.chart_combo.pack(side=tk.LEFT, padx=5)
-            self.chart_combo.bind("<<ComboboxSelected>>", self.update_chart)
+            self.chart_combo.bind("<<ComboboxSelected>>",
+                                  lambda e: self.scheduler.invalidate('chart_column'))
+            
+            tk.Label(chart_controls, text="Bins:", font=("Arial", 11, "bold"),
+                    bg="white").pack(side=tk.LEFT, padx=(15, 5))
+            
+            self.bins_var = tk.StringVar(value=STRATEGY_LABELS['auto'])
+            bins_combo = ttk.Combobox(chart_controls, textvariable=self.bins_var,
+                                      values=[STRATEGY_LABELS[s] for s in STRATEGIES],
+                                      state="readonly", width=18)
+            bins_combo.pack(side=tk.LEFT, padx=5)
+            bins_combo.bind("<<ComboboxSelected>>",
+                            lambda e: self.scheduler.invalidate('chart_column'))
             
             self.chart_frame = tk.Frame(self.chart_tab, bg="white")
             self.chart_frame.pack(fill=tk.BOTH, expand=True)
@@ -178,9 +393,174 @@ class GradebookViewer:
             # Tab 5: Comparison
             self.comp_tab = tk.Frame(self.notebook, bg="white")
             self.notebook.add(self.comp_tab, text="📉 Compare")
+            self.tab_views[str(self.comp_tab)] = 'comparison'
             
             self.comp_frame = tk.Frame(self.comp_tab, bg="white")
             self.comp_frame.pack(fill=tk.BOTH, expand=True)
+            
+            # Tab 6: Correlation
+            self.corr_tab = tk.Frame(self.notebook, bg="white")
+            self.notebook.add(self.corr_tab, text="🔗 Correlation")
+            self.tab_views[str(self.corr_tab)] = 'correlation'
+            
+            corr_controls = tk.Frame(self.corr_tab, bg="white")
+            corr_controls.pack(fill=tk.X, padx=15, pady=12)
+            
+            tk.Label(corr_controls, text="Show:", font=("Arial", 11, "bold"),
+                    bg="white").pack(side=tk.LEFT, padx=5)
+            
+            self.corr_kind_var = tk.StringVar(value="Correlation")
+            corr_combo = ttk.Combobox(corr_controls, textvariable=self.corr_kind_var,
+                                      values=["Correlation", "Covariance"],
+                                      state="readonly", width=15)
+            corr_combo.pack(side=tk.LEFT, padx=5)
+            corr_combo.bind("<<ComboboxSelected>>",
+                            lambda e: self.scheduler.invalidate('correlation_kind'))
+            
+            self.corr_frame = tk.Frame(self.corr_tab, bg="white")
+            self.corr_frame.pack(fill=tk.BOTH, expand=True)
+            
+            # Tab 7: Dashboard (every subject at once, scrollable grid of panels)
+            self.dash_tab = tk.Frame(self.notebook, bg="white")
+            self.notebook.add(self.dash_tab, text="🧩 Dashboard")
+            self.tab_views[str(self.dash_tab)] = 'dashboard'
+            
+            self.dash_canvas = tk.Canvas(self.dash_tab, bg="white", highlightthickness=0)
+            dash_scroll = ttk.Scrollbar(self.dash_tab, orient=tk.VERTICAL, command=self.dash_canvas.yview)
+            self.dash_canvas.configure(yscrollcommand=dash_scroll.set)
+            dash_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+            self.dash_canvas.pack(fill=tk.BOTH, expand=True)
+            self.dash_frame = tk.Frame(self.dash_canvas, bg="white")
+            self.dash_canvas.create_window((0, 0), window=self.dash_frame, anchor='nw')
+            self.dash_frame.bind("<Configure>", lambda e: self.dash_canvas.configure(
+                scrollregion=self.dash_canvas.bbox('all')))
+        
+        # Tab 8: Sections (every open gradebook side by side)
+        self.sections_tab = tk.Frame(self.notebook, bg="white")
+        self.notebook.add(self.sections_tab, text="🏫 Sections")
+        self.tab_views[str(self.sections_tab)] = 'sections'
+        
+        sections_controls = tk.Frame(self.sections_tab, bg="white")
+        sections_controls.pack(fill=tk.X, padx=15, pady=12)
+        
+        tk.Label(sections_controls, text="Distribution:", font=("Arial", 11, "bold"),
+                bg="white").pack(side=tk.LEFT, padx=5)
+        
+        self.section_subject_var = tk.StringVar(value=OVERALL)
+        self.section_subject_combo = ttk.Combobox(sections_controls, textvariable=self.section_subject_var,
+                                                  values=[OVERALL], state="readonly", width=18)
+        self.section_subject_combo.pack(side=tk.LEFT, padx=5)
+        self.section_subject_combo.bind("<<ComboboxSelected>>",
+                                        lambda e: self.scheduler.invalidate('section_subject'))
+        
+        sections_panes = tk.PanedWindow(self.sections_tab, orient=tk.VERTICAL, sashwidth=5, bg="#bdc3c7")
+        sections_panes.pack(fill=tk.BOTH, expand=True)
+        self.sections_text = scrolledtext.ScrolledText(sections_panes, wrap=tk.NONE, font=("Consolas", 9),
+                                                       bg="#f8f9fa", padx=15, pady=15, height=14)
+        sections_panes.add(self.sections_text)
+        self.sections_frame = tk.Frame(sections_panes, bg="white")
+        sections_panes.add(self.sections_frame)
+        
+        # Tab 9: What-If (curve subjects without touching the data)
+        self.whatif_tab = tk.Frame(self.notebook, bg="white")
+        self.notebook.add(self.whatif_tab, text="🎚 What-If")
+        self.tab_views[str(self.whatif_tab)] = 'whatif'
+        
+        curve_controls = tk.Frame(self.whatif_tab, bg="white")
+        curve_controls.pack(fill=tk.X, padx=15, pady=12)
+        
+        self.curve_subject_var = tk.StringVar()
+        self.curve_subject_combo = ttk.Combobox(curve_controls, textvariable=self.curve_subject_var,
+                                                state="readonly", width=15)
+        self.curve_subject_combo.pack(side=tk.LEFT, padx=5)
+        
+        self.curve_kind_var = tk.StringVar(value=CURVES[0])
+        curve_combo = ttk.Combobox(curve_controls, textvariable=self.curve_kind_var,
+                                   values=list(CURVES), state="readonly", width=7)
+        curve_combo.pack(side=tk.LEFT, padx=5)
+        curve_combo.bind("<<ComboboxSelected>>", lambda e: self.curve_help.config(
+            text=CURVE_HELP[self.curve_kind_var.get()]))
+        
+        self.curve_amount_var = tk.StringVar(value="5")
+        tk.Entry(curve_controls, textvariable=self.curve_amount_var, width=6).pack(side=tk.LEFT, padx=5)
+        
+        tk.Button(curve_controls, text="Apply", command=self.apply_curve,
+                 bg="#3498db", fg="white", padx=10).pack(side=tk.LEFT, padx=5)
+        tk.Button(curve_controls, text="Reset", command=self.reset_curves,
+                 bg="#95a5a6", fg="white", padx=10).pack(side=tk.LEFT, padx=5)
+        
+        self.curve_help = tk.Label(curve_controls, text=CURVE_HELP[CURVES[0]],
+                                   bg="white", fg="#7f8c8d", font=("Arial", 9))
+        self.curve_help.pack(side=tk.LEFT, padx=10)
+        
+        whatif_panes = tk.PanedWindow(self.whatif_tab, orient=tk.VERTICAL, sashwidth=5, bg="#bdc3c7")
+        whatif_panes.pack(fill=tk.BOTH, expand=True)
+        self.whatif_text = scrolledtext.ScrolledText(whatif_panes, wrap=tk.NONE, font=("Consolas", 9),
+                                                     bg="#f8f9fa", padx=15, pady=15, height=16)
+        whatif_panes.add(self.whatif_text)
+        self.whatif_frame = tk.Frame(whatif_panes, bg="white")
+        whatif_panes.add(self.whatif_frame)
+        
+        # Tab 10: Groups (every statistic per section / teacher / cohort value)
+        self.groups_tab = tk.Frame(self.notebook, bg="white")
+        self.notebook.add(self.groups_tab, text="👥 Groups")
+        self.tab_views[str(self.groups_tab)] = 'groups'
+        
+        groups_controls = tk.Frame(self.groups_tab, bg="white")
+        groups_controls.pack(fill=tk.X, padx=15, pady=12)
+        
+        tk.Label(groups_controls, text="Group by:", font=("Arial", 11, "bold"),
+                bg="white").pack(side=tk.LEFT, padx=5)
+        self.group_by_var = tk.StringVar()
+        self.group_by_combo = ttk.Combobox(groups_controls, textvariable=self.group_by_var,
+                                           state="readonly", width=18)
+        self.group_by_combo.pack(side=tk.LEFT, padx=5)
+        self.group_by_combo.bind("<<ComboboxSelected>>", lambda e: self.choose_group())
+        
+        tk.Label(groups_controls, text="Chart:", font=("Arial", 11, "bold"),
+                bg="white").pack(side=tk.LEFT, padx=(15, 5))
+        self.group_stat_var = tk.StringVar(value=GROUP_STATS[0][0])
+        group_stat_combo = ttk.Combobox(groups_controls, textvariable=self.group_stat_var,
+                                        values=[label for label, _ in GROUP_STATS],
+                                        state="readonly", width=10)
+        group_stat_combo.pack(side=tk.LEFT, padx=5)
+        group_stat_combo.bind("<<ComboboxSelected>>", lambda e: self.scheduler.invalidate('group_by'))
+        
+        groups_panes = tk.PanedWindow(self.groups_tab, orient=tk.VERTICAL, sashwidth=5, bg="#bdc3c7")
+        groups_panes.pack(fill=tk.BOTH, expand=True)
+        self.groups_text = scrolledtext.ScrolledText(groups_panes, wrap=tk.NONE, font=("Consolas", 9),
+                                                     bg="#f8f9fa", padx=15, pady=15, height=16)
+        groups_panes.add(self.groups_text)
+        self.groups_frame = tk.Frame(groups_panes, bg="white")
+        groups_panes.add(self.groups_frame)
+        
+        # Tab 11: Clusters (performance profiles from k-means)
+        self.clusters_tab = tk.Frame(self.notebook, bg="white")
+        self.notebook.add(self.clusters_tab, text="🧩 Clusters")
+        self.tab_views[str(self.clusters_tab)] = 'clusters'
+        
+        clusters_controls = tk.Frame(self.clusters_tab, bg="white")
+        clusters_controls.pack(fill=tk.X, padx=15, pady=12)
+        
+        tk.Label(clusters_controls, text="Clusters:", font=("Arial", 11, "bold"),
+                bg="white").pack(side=tk.LEFT, padx=5)
+        self.cluster_k_var = tk.StringVar(value=str(DEFAULT_K))
+        cluster_k_combo = ttk.Combobox(clusters_controls, textvariable=self.cluster_k_var,
+                                       values=[str(k) for k in K_CHOICES], state="readonly", width=4)
+        cluster_k_combo.pack(side=tk.LEFT, padx=5)
+        cluster_k_combo.bind("<<ComboboxSelected>>", lambda e: self.on_cluster_k_changed())
+        
+        self.cluster_color_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(clusters_controls, text="Color table by cluster", variable=self.cluster_color_var,
+                      command=self.retag_table, bg="white").pack(side=tk.LEFT, padx=15)
+        
+        clusters_panes = tk.PanedWindow(self.clusters_tab, orient=tk.VERTICAL, sashwidth=5, bg="#bdc3c7")
+        clusters_panes.pack(fill=tk.BOTH, expand=True)
+        self.clusters_text = scrolledtext.ScrolledText(clusters_panes, wrap=tk.NONE, font=("Consolas", 9),
+                                                       bg="#f8f9fa", padx=15, pady=15, height=14)
+        clusters_panes.add(self.clusters_text)
+        self.clusters_frame = tk.Frame(clusters_panes, bg="white")
+        clusters_panes.add(self.clusters_frame)
         
         # Status bar
         status = tk.Frame(self.root, bg="#34495e", height=30)
@@ -204,251 +584,685 @@ class GradebookViewer:
         if not file_path:
             return
         
+        self.load_path(file_path)
+    
+    def add_section(self):
+        # like Load File, but into a new section tab next to the open ones
+        file_path = filedialog.askopenfilename(
+            title="Select File for a New Section",
+            filetypes=[("Excel/CSV", "*.xlsx *.xls *.csv"), ("All", "*.*")]
+        )
+        
+        if not file_path:
+            return
+        
+        self.load_path(file_path, new_section=True)
+    
+    def load_path(self, file_path, interactive=True, new_section=False):
+        # interactive=False is the watch mode's full reload: no dialogs, and the
+        # data check fixes what it fixed last time without asking again
         try:
             self.status_label.config(text="Loading...", fg="#f39c12")
             self.root.update()
+            self.stash_section()
             
-            if file_path.endswith('.csv'):
-                self.df = pd.read_csv(file_path)
-            else:
-                self.df = pd.read_excel(file_path)
+            df = self.read_frame(file_path)
+            checked = self.install_frame(df, validate(df), file_path, interactive, new_section)
             
-            self.filtered_df = self.df.copy()
-            self.process_data()
-            self.display_data()
-            self.refresh_all()
-            
-            self.status_label.config(text=f"✓ Loaded: {file_path.split('/')[-1]}", fg="#2ecc71")
+            self.status_label.config(text=f"✓ Loaded: {file_path.split('/')[-1]} ({checked})", fg="#2ecc71")
+            self.warn_weights(interactive)
             
-            messagebox.showinfo("Success", 
-                              f"File loaded!\n\n"
-                              f"Students: {len(self.df)}\n"
-                              f"Columns: {len(self.df.columns)}\n"
-                              f"Grades: {len(self.numeric_cols)}")
+            if interactive:
+                messagebox.showinfo("Success", 
+                                  f"File loaded!\n\n"
+                                  f"Students: {len(self.df)}\n"
+                                  f"Columns: {len(self.file_columns())}\n"
+                                  f"Grades: {len(self.numeric_cols)}")
         except Exception as e:
+            self.tail = None
             msg = f"Load failed:\n{str(e)}"
             if "openpyxl" in str(e):
                 msg += "\n\nInstall: pip install openpyxl"
-            messagebox.showerror("Error", msg)
+            if interactive:
+                messagebox.showerror("Error", msg)
             self.status_label.config(text="✖ Load failed", fg="#e74c3c")
     
+    def read_frame(self, file_path):
+        # the file as it is on disk (also runs on the exact-load worker thread)
+        if file_path.endswith('.csv'):
+            return pd.read_csv(file_path)
+        return pd.read_excel(file_path)
+    
+    def install_frame(self, df, report, file_path, interactive, new_section):
+        # everything a freshly read file goes through before it is shown: the
+        # data check (report = validate(df)), its weights, compact mode, the
+        # derived columns. Returns the data check summary for the status line.
+        self.df = df
+        self.tail = TailReader(file_path) if file_path.endswith('.csv') else None
+        self.loaded_path = file_path
+        
+        # one validation pass right after loading, so bad cells show up here
+        # and not later as odd stats or a broken chart
+        checked = "no data problems"
+        if not report.ok:
+            checked = f"{report.count()} data problems"
+            if interactive:
+                self.auto_fixed = messagebox.askyesno(
+                    "Data Check",
+                    f"Problems found in {file_path.split('/')[-1]}:\n\n"
+                    f"{report.text()}\n\n"
+                    "Fix automatically? (trim names, drop empty rows/columns,\n"
+                    "blank grades that aren't numbers between 0 and 100)")
+            if self.auto_fixed:
+                # dropped rows leave gaps in the index, appended rows
+                # (watch mode) are numbered on from the last label
+                self.df = fix(self.df, report).reset_index(drop=True)
+                checked += ", fixed"
+        elif interactive:
+            self.auto_fixed = False
+        
+        if not self.weights_chosen:
+            found = weights_path(file_path)
+            self.weights, self.weights_file = None, None
+            if os.path.exists(found):
+                try:
+                    self.weights, self.weights_file = load_scheme(found), found
+                    checked += ", weights.json"
+                except (ValueError, KeyError, TypeError) as e:
+                    checked += f", bad weights.json ({e})"
+        
+        self.close_database()
+        self.approx = None
+        self.approx_job = None
+        if self.compact_var.get():
+            # the compact store is the only copy of the grades, self.df keeps the text columns
+            self.compact = CompactGradebook(self.df)
+            self.df = self.compact.roster()
+        else:
+            self.compact = None
+        
+        self.shown_rows = np.arange(len(self.df))
+        self.data_version += 1
+        self.process_data()
+        self.register_section(os.path.basename(file_path), new=new_section)
+        # render right away instead of waiting for the debounce window
+        self.scheduler.invalidate('data')
+        self.scheduler.flush()
+        return checked
+    
     def process_data(self):
-        self.numeric_cols = self.df.select_dtypes(include=[np.number]).columns.tolist()
-        
+        self.update_group_choices()     # the grouping column is not a subject
+        self.numeric_cols = self.subject_columns()
+        if self.compact is None:
+            # cell text is formatted once per load and reused by every redraw
+            self.formatted = FormattedColumns(self.df, self.numeric_cols)
+            matrix_fn = whole = None
+        else:
+            # grades are formatted from the compact arrays for the rows shown
+            compact, cols = self.compact, list(self.numeric_cols)
+            numbers = {c: (lambda rows, c=c: compact.values(c, rows)) for c in compact.subjects}
+            self.formatted = FormattedColumns(self.df, cols, columns=self.file_columns(), numbers=numbers)
+            matrix_fn = lambda: compact.matrix(cols)     # float32, kept as it is
+            whole = compact.grades.dtype == np.uint8
+        self.model = GradebookModel(self.df, self.numeric_cols, self.fitted_weights(),
+                                    matrix_fn=matrix_fn, whole_grades=whole)
+        self.update_flags()
+        self.update_standing()
+        self.update_subject_lists()
+    
+    def update_subject_lists(self):
         if HAS_MATPLOTLIB and self.numeric_cols:
             self.chart_combo['values'] = self.numeric_cols
             self.chart_combo.current(0)
+        self.curve_subject_combo['values'] = ["All subjects"] + self.numeric_cols
+        if self.curve_subject_var.get() not in self.curve_subject_combo['values']:
+            self.curve_subject_combo.current(0)
+        self.query_col_combo['values'] = self.query_columns()
+        if self.query_col_var.get() not in self.query_columns():
+            self.query_col_var.set(self.numeric_cols[0] if self.numeric_cols else "")
+        self.show_query_chips()     # matched count of the new data
+        self.update_group_choices()
     
-    def display_data(self, df=None):
-        if df is None:
-            df = self.filtered_df if self.filtered_df is not None else self.df
-        
+    def update_group_choices(self):
+        groups = self.group_columns()
+        self.group_by_combo['values'] = groups
+        if self.group_by_var.get() not in groups:
+            text = [c for c in groups if c not in self.numeric_file_columns()]
+            self.group_by_var.set(text[0] if text else "")
+    
+    def update_flags(self):
+        # outliers / drops / at-risk for every student, one highlight tag per row
+        self.anomalies = AnomalyFlags(self.grade_matrix(), averages=self.model['Average'])
+        self.row_flags = self.anomalies.row_tags()
+    
+    def update_standing(self):
+        # one argsort per column; the table shows the overall rank / percentile
+        names = self.student_names()
+        self.standing = Standing(self.grade_matrix(), self.numeric_cols, self.model['Average'], names)
+        for col, values in self.standing.table_columns().items():
+            self.formatted.set_column(col, values, STANDING_FORMATS[col])
+    
+    def table_tags(self, positions):
+        # one Treeview tag per shown row: its cluster when the table is colored by
+        # cluster, else its flag; flagged rows win over striping
+        tags = np.where(positions % 2 == 0, 'even', 'odd')
+        if self.cluster_color_var.get() and self.model is not None and self.approx is None:
+            return self.current_clustering().row_tags()[positions]
+        if self.row_flags is not None:
+            flags = self.row_flags[positions]
+            tags = np.where(flags != '', flags, tags)
+        return tags
+    
+    def retag_table(self):
+        # recolor the rows already in the table (cluster colors on/off, new k)
+        if self.formatted is None or self.store is not None:
+            return
+        items = self.tree.get_children()
+        shown = self.shown_rows
+        if shown is None or len(items) != len(shown):
+            return
+        for item, tag in zip(items, self.table_tags(shown)):
+            self.tree.item(item, tags=(tag,))
+    
+    # ---- grade access (works for both the plain and the compact representation)
+    def grade_matrix(self):
+        # cached by the model: every tab reads the same array, don't modify it
+        return self.model.matrix()
+    
+    def column_data(self, col):
+        # valid scores of one column, like df[col].dropna()
+        if self.query_mask() is not None:
+            x = self.stats_matrix()[:, self.numeric_cols.index(col)]
+            return pd.Series(x[~np.isnan(x)])
+        if self.compact is not None:
+            return pd.Series(self.compact.column(col).astype(float))
+        return self.df[col].dropna()
+    
+    def display_data(self):
         for item in self.tree.get_children():
             self.tree.delete(item)
         
-        if df is None or len(df) == 0:
+        positions = self.shown_rows
+        if self.df is None or positions is None or len(positions) == 0:
             return
         
-        self.tree['columns'] = list(df.columns)
+        columns = self.file_columns()
+        if self.standing is not None:
+            columns += list(STANDING_FORMATS)
+        
+        self.tree['columns'] = columns
         self.tree['show'] = 'headings'
         
-        for col in df.columns:
+        for col in columns:
             self.tree.heading(col, text=col)
-            width = 150 if col in self.numeric_cols else 180
+            width = 150 if col in self.numeric_cols else 100 if col in STANDING_FORMATS else 180
             self.tree.column(col, width=width, anchor=tk.CENTER)
         
-        for idx, row in df.iterrows():
-            values = []
-            for col in df.columns:
-                val = row[col]
-                if pd.isna(val):
-                    values.append("")
-                elif col in self.numeric_cols:
-                    values.append(f"{val:.1f}")
-                else:
-                    values.append(str(val))
-            
-            tag = 'even' if idx % 2 == 0 else 'odd'
-            self.tree.insert('', tk.END, values=values, tags=(tag,))
+        rows = self.formatted.rows(positions, columns)
+        tags = self.table_tags(positions)
+        # item id = row position, so a clicked row maps straight to its profile
+        iids = positions.astype(str)
+        
+        for values, tag, iid in zip(rows, tags, iids):
+            self.tree.insert('', tk.END, iid=iid, values=values, tags=(tag,))
         
         self.tree.tag_configure('even', background='#f8f9fa')
         self.tree.tag_configure('odd', background='white')
+        for tag, color in TAG_COLORS.items():
+            self.tree.tag_configure(tag, background=color)
+        for tag, color in cluster_tags(max(K_CHOICES)).items():
+            self.tree.tag_configure(tag, background=color)
+        
+        if self.approx is not None:
+            self.record_label.config(
+                text=f"Showing {len(positions)} of a {len(self.df)}-row sample ({self.approx.rows:,} rows in file)")
+        else:
+            self.record_label.config(text=f"Showing {len(positions)} of {len(self.df)} records")
+    
+    def load_weights(self):
+        path = filedialog.askopenfilename(
+            title="Select Weights Config",
+            filetypes=[("JSON", "*.json"), ("All", "*.*")]
+        )
         
-        self.record_label.config(text=f"Showing {len(df)} of {len(self.df)} records")
+        if not path:
+            if self.weights is not None and messagebox.askyesno(
+                    "Weights", "Go back to plain (unweighted) averages?"):
+                self.weights, self.weights_file = None, None
+                self.weights_chosen = True
+            else:
+                return
+        else:
+            try:
+                self.weights, self.weights_file = load_scheme(path), path
+                self.weights_chosen = True
+            except Exception as e:
+                messagebox.showerror("Error", f"Bad weights config:\n{str(e)}")
+                return
+        
+        if self.model is not None:
+            # only Average and what depends on it is rebuilt, the grade matrix stays cached
+            self.model.set_weights(self.fitted_weights())
+            self.update_flags()
+            self.update_standing()
+            self.refresh_all()
+            self.warn_weights(True)
+    
+    def fitted_weights(self):
+        # the loaded weights if they fit this gradebook's subjects, else None (plain mean)
+        scheme, self.weight_problems = checked(self.weights, self.numeric_cols)
+        return scheme
+    
+    def warn_weights(self, interactive):
+        if not self.weight_problems:
+            return
+        name = os.path.basename(self.weights_file or "weights.json")
+        if interactive:
+            messagebox.showwarning("Weights", f"{name} doesn't match this gradebook:\n\n• "
+                                   + "\n• ".join(self.weight_problems))
+        else:
+            self.status_label.config(text=f"⚠ {name}: {self.weight_problems[-1]}", fg="#e67e22")
+    
+    def has_data(self):
+        return self.df is not None or self.store is not None
     
     def filter_data(self, *args):
-        if self.df is None:
+        if not self.has_data():
             return
         
+        # typing only dirties the table, the real filtering runs once typing pauses
+        self.scheduler.invalidate('search')
+    
+    def apply_filter(self):
+        # the table's rows as positions into self.df, nothing is copied
         search = self.search_var.get().lower().strip()
-        
-        if not search:
-            self.filtered_df = self.df.copy()
-        else:
-            mask = self.df.astype(str).apply(
-                lambda x: x.str.lower().str.contains(search, na=False)
-            ).any(axis=1)
-            self.filtered_df = self.df[mask]
-        
-        self.display_data()
+        mask = self.query_mask()
+        rows = np.arange(len(self.df)) if mask is None else np.flatnonzero(mask)
+        if search:
+            rows = rows[self.formatted.search(rows, search, self.file_columns())]
+        self.shown_rows = rows
+    
+    # ---- structured filter ---------------------------------------------------
+    def query_columns(self):
+        # every column a clause can test: the file's, then derived and standing ones
+        # (database mode: the subjects, the filter runs as SQL)
+        if self.store is not None:
+            return list(self.numeric_cols)
+        if self.df is None or self.model is None:
+            return []
+        columns = self.file_columns()
+        extra = [c for c in DERIVED + tuple(STANDING_FORMATS) if c not in columns]
+        return columns + extra
+    
+    def query_column(self, name):
+        if name in self.numeric_cols:
+            return self.grade_matrix()[:, self.numeric_cols.index(name)]
+        if name in self.file_columns():
+            return self.file_column(name)
+        if name in STANDING_FORMATS:
+            return self.standing.table_columns()[name]
+        return self.model[name]
+    
+    def query_filterable(self):
+        # in memory or in the database, not over the approximate mode's sample
+        return self.approx is None and (self.store is not None
+                                        or (self.df is not None and self.model is not None))
+    
+    def query_mask(self):
+        # rows the filter keeps (None = no filter); clause masks are cached until
+        # the grades change, so editing the filter only recombines bitsets
+        if not self.query or self.store is not None or not self.query_filterable():
+            return None
+        model = self.model
+        self.query_masks.reset((id(model), model.version, tuple(model.input_versions.values())), len(self.df))
+        known = set(self.query_columns())
+        # clauses on columns this gradebook doesn't have (another section) are skipped
+        clauses = [(c, clause) for c, clause in self.query if clause[0] in known]
+        return self.query_masks.combine(clauses, self.query_column)
+    
+    def query_rows(self):
+        mask = self.query_mask()
+        return None if mask is None else np.flatnonzero(mask)
+    
+    def db_query(self):
+        # the filter as OR-groups of (subject, op, value) for the store's SQL
+        if not self.query or self.store is None:
+            return None
+        known = set(self.numeric_cols)
+        return or_groups([(c, clause) for c, clause in self.query if clause[0] in known]) or None
+    
+    def query_count(self):
+        # -> (students kept, students in all), None without a filter
+        if self.store is not None:
+            groups = self.db_query()
+            if groups is None:
+                return None
+            return (self.store.student_count(self.store_book, None, groups),
+                    self.store.student_count(self.store_book))
+        rows = self.query_rows()
+        return None if rows is None else (len(rows), len(self.df))
+    
+    def add_clause(self, connector):
+        if not self.query_filterable():
+            self.status_label.config(text="✖ Filters wait for the exact load", fg="#e74c3c")
+            return
+        clause = (self.query_col_var.get(), self.query_op_var.get(), self.query_value_var.get().strip())
+        if not clause[0] or not clause[2]:
+            return
+        self.set_query(self.query + [(connector, clause)])
+    
+    def remove_clause(self, index):
+        self.set_query(self.query[:index] + self.query[index + 1:])
+    
+    def clear_query(self):
+        self.set_query([])
+    
+    def edit_query(self):
+        if not self.query_filterable():
+            return
+        text = simpledialog.askstring("Filter", "e.g. MATH < 50 and CS102 >= 80 or Status == \"Pass or Fail\"",
+                                      initialvalue=describe(self.query), parent=self.root)
+        if text is None:
+            return
+        try:
+            query = parse_query(text, self.query_columns())
+        except ValueError as e:
+            messagebox.showerror("Filter", str(e))
+            return
+        self.set_query(query)
+    
+    def set_query(self, query):
+        if query and self.query_filterable():
+            # bad clauses ("Status < 3") are refused here, not half way through a refresh
+            old = self.query
+            self.query = query
+            try:
+                self.query_count()
+            except ValueError as e:
+                self.query = old
+                messagebox.showerror("Filter", str(e))
+                return
+        self.query = query
+        self.query_version += 1
+        self.show_query_chips()
+        self.scheduler.invalidate('query')
+    
+    def show_query_chips(self):
+        for w in self.query_chips.winfo_children():
+            w.destroy()
+        for i, (connector, clause) in enumerate(self.query):
+            text = clause_text(clause) if i == 0 else f"{connector.upper()} {clause_text(clause)}"
+            tk.Button(self.query_chips, text=f"{text}  ✖", command=lambda i=i: self.remove_clause(i),
+                     bg="#ecf0f1", relief=tk.FLAT, font=("Arial", 9), padx=4).pack(side=tk.LEFT, padx=2)
+        try:
+            count = self.query_count()
+        except ValueError as e:
+            # the filter doesn't fit this gradebook (e.g. a text column in another section)
+            self.query_label.config(text=f"✖ {e}")
+            return
+        self.query_label.config(text="" if count is None else "%d of %d students" % count)
+    
+    def query_note(self):
+        rows = self.query_rows()
+        if rows is None:
+            return None
+        return f"🧮 Filter: {describe(self.query)}  ({len(rows)} of {len(self.df)} students)"
+    
+    # ---- what the stats / chart tabs read (only the students the filter keeps)
+    def stats_key(self):
+        return (self.data_version, self.query_version)
+    
+    def stats_matrix(self):
+        rows = self.query_rows()
+        return self.grade_matrix() if rows is None else self.grade_matrix()[rows]
+    
+    def stats_averages(self):
+        rows = self.query_rows()
+        return self.model['Average'] if rows is None else self.model['Average'][rows]
     
     def refresh_all(self):
-        if self.df is None:
+        if not self.has_data():
             return
         
+        self.data_version += 1
+        self.scheduler.invalidate('data')
+    
+    def current_tab_view(self):
         try:
+            return self.tab_views.get(self.notebook.select())
+        except tk.TclError:
+            return None
+    
+    def tab_key(self, view):
+        # everything a tab's output depends on
+        if view == 'chart':
+            return self.stats_key() + (self.chart_var.get(), self.bins_var.get())
+        if view == 'correlation':
+            return self.stats_key() + (self.corr_kind_var.get(),)
+        if view in self.FILTERED_VIEWS:
+            return self.stats_key()
+        if view == 'whatif':
+            return (self.data_version, self.curve_steps)
+        if view == 'sections':
+            return (self.data_version, self.section_subject_var.get())
+        if view == 'groups':
+            return (self.data_version, self.group_by_var.get(), self.group_stat_var.get())
+        if view == 'clusters':
+            return (self.data_version, self.cluster_k_var.get())
+        return (self.data_version,)
+    
+    def ensure_tab(self, view):
+        # render a tab only if its cached output is missing or out of date
+        if not self.has_data():
+            return
+        key = self.tab_key(view)
+        if self.tab_keys.get(view) == key:
+            return
+        if view == 'sections':
+            # built from every section's aggregates, whatever mode the table is in
+            self.update_sections()
+        elif self.store is not None:
+            self.render_db_tab(view)
+        elif self.approx is not None:
+            self.render_approx_tab(view)
+        elif view == 'overview':
             self.calc_overview()
+        elif view == 'assignments':
             self.calc_assignments()
+        elif view == 'rankings':
             self.calc_rankings()
-            
-            if HAS_MATPLOTLIB:
-                self.update_chart()
-                self.update_comparison()
+        elif view == 'chart' and HAS_MATPLOTLIB:
+            self.update_chart()
+        elif view == 'comparison' and HAS_MATPLOTLIB:
+            self.update_comparison()
+        elif view == 'correlation' and HAS_MATPLOTLIB:
+            self.update_correlation()
+        elif view == 'dashboard' and HAS_MATPLOTLIB:
+            self.update_dashboard()
+        elif view == 'whatif':
+            self.update_whatif()
+        elif view == 'groups':
+            self.update_groups()
+        elif view == 'clusters':
+            self.update_clusters()
+        self.tab_keys[view] = key
+    
+    def on_tab_changed(self, event=None):
+        view = self.current_tab_view()
+        if view is None:
+            return
+        try:
+            self.ensure_tab(view)
+        except Exception as e:
+            messagebox.showerror("Error", f"Refresh failed:\n{str(e)}")
+    
+    def render_views(self, views):
+        # called by the scheduler with only the views whose inputs changed
+        if not self.has_data():
+            return
+        
+        try:
+            # hidden tabs are skipped here, they catch up when they are selected
+            visible = self.current_tab_view()
+            for view in views:
+                if view == 'table' and self.store is not None:
+                    self.load_db_page(reset=True)
+                elif view == 'table':
+                    self.apply_filter()
+                    self.display_data()
+                elif view == visible:
+                    self.ensure_tab(view)
             
             self.status_label.config(text="✓ Refreshed", fg="#2ecc71")
         except Exception as e:
             messagebox.showerror("Error", f"Refresh failed:\n{str(e)}")
     
-    def calc_overview(self):
+    def calc_overview(self, st=None, title="GRADEBOOK OVERVIEW", note=None):
         self.overview_text.delete(1.0, tk.END)
         
         if not self.numeric_cols:
             self.overview_text.insert(tk.END, "\nNo grade data found.\n")
             return
         
+        rows = None
+        if st is None:
+            st = overview_stats(self.stats_matrix(), self.stats_averages())
+            if self.model.weights is not None:
+                note = (f"⚖ Weighted averages ({self.weights_file})\n  "
+                        + "\n  ".join(self.model.weights.describe(self.numeric_cols)))
+            if self.weight_problems:
+                warning = "⚠ Weights don't fit:\n  " + "\n  ".join(self.weight_problems)
+                note = f"{note}\n{warning}" if note else warning
+            rows = self.query_rows()
+            if rows is not None:
+                note = f"{note}\n\n{self.query_note()}" if note else self.query_note()
+        total = st['submissions']
+        if not total:
+            self.overview_text.insert(tk.END, "\nNo grade data found.\n" + (f"\n{note}\n" if note else ""))
+            return
+        
         out = "\n" + "="*60 + "\n"
-        out += "          GRADEBOOK OVERVIEW\n"
+        out += f"          {title}\n"
         out += "="*60 + "\n\n"
         out += f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        out += f"👥 Students: {len(self.df)}\n"
+        out += f"👥 Students: {st['students']}\n"
         out += f"📝 Assignments: {len(self.numeric_cols)}\n\n"
-        
-        all_grades = self.df[self.numeric_cols].values.flatten()
-        all_grades = all_grades[~np.isnan(all_grades)]
+        if note:
+            out += f"{note}\n\n"
         
         out += "─"*60 + "\n"
         out += "📊 OVERALL PERFORMANCE\n"
         out += "─"*60 + "\n"
-        out += f"Total Submissions: {len(all_grades)}\n"
-        out += f"Class Average: {all_grades.mean():.2f}%\n"
-        out += f"Median: {np.median(all_grades):.2f}%\n"
-        out += f"Std Dev: {all_grades.std():.2f}\n"
-        out += f"Range: {all_grades.min():.2f} - {all_grades.max():.2f}\n\n"
-        
-        a = np.sum(all_grades >= 90)
-        b = np.sum((all_grades >= 80) & (all_grades < 90))
-        c = np.sum((all_grades >= 70) & (all_grades < 80))
-        d = np.sum((all_grades >= 60) & (all_grades < 70))
-        f = np.sum(all_grades < 60)
-        total = len(all_grades)
+        out += f"Total Submissions: {total}\n"
+        out += f"Class Average: {st['mean']:.2f}%\n"
+        out += f"Median: {st['median']:.2f}%\n"
+        out += f"Std Dev: {st['std']:.2f}\n"
+        out += f"Range: {st['min']:.2f} - {st['max']:.2f}\n\n"
         
         out += "📈 GRADE DISTRIBUTION\n"
         out += "─"*60 + "\n"
-        out += f"A: {a:4d} ({a/total*100:5.1f}%) {'█'*min(int(a/total*30),30)}\n"
-        out += f"B: {b:4d} ({b/total*100:5.1f}%) {'█'*min(int(b/total*30),30)}\n"
-        out += f"C: {c:4d} ({c/total*100:5.1f}%) {'█'*min(int(c/total*30),30)}\n"
-        out += f"D: {d:4d} ({d/total*100:5.1f}%) {'█'*min(int(d/total*30),30)}\n"
-        out += f"F: {f:4d} ({f/total*100:5.1f}%) {'█'*min(int(f/total*30),30)}\n\n"
+        for letter, n in st['bands'].items():
+            out += f"{letter}: {n:4d} ({n/total*100:5.1f}%) {'█'*min(int(n/total*30),30)}\n"
+        out += "\n"
         
-        pass_rate = (total - f) / total * 100
-        out += f"✓ Pass Rate: {pass_rate:.1f}%\n\n"
+        out += f"✓ Pass Rate: {st['pass_rate']:.1f}%\n\n"
         
-        avgs = self.df[self.numeric_cols].mean(axis=1)
         out += "─"*60 + "\n"
         out += "👥 STUDENT SUMMARY\n"
         out += "─"*60 + "\n"
-        out += f"Average Score: {avgs.mean():.2f}%\n"
-        out += f"Median: {avgs.median():.2f}%\n"
-        out += f"Range: {avgs.min():.2f} - {avgs.max():.2f}%\n\n"
+        out += f"Average Score: {st['student_mean']:.2f}%\n"
+        out += f"Median: {st['student_median']:.2f}%\n"
+        out += f"Range: {st['student_min']:.2f} - {st['student_max']:.2f}%\n\n"
         
-        at_risk = np.sum(avgs < 60)
+        at_risk = st['at_risk']
         if at_risk > 0:
-            out += f"⚠️  At Risk (<60%): {at_risk} ({at_risk/len(avgs)*100:.1f}%)\n\n"
+            out += f"⚠️  At Risk (<60%): {at_risk} ({at_risk/st['students']*100:.1f}%)\n\n"
+        
+        if self.anomalies is not None and self.approx is None:
+            flags = self.anomalies.summary(rows)
+            out += f"🔎 Outlier grades: {flags['outlier_grades']} "
+            out += f"({flags['outlier_students']} students)\n"
+            out += f"📉 Far below own average: {flags['drop_students']} students\n\n"
         
         out += "="*60 + "\n"
         self.overview_text.insert(tk.END, out)
     
-    def calc_assignments(self):
-        self.assign_text.delete(1.0, tk.END)
-        
+    def calc_assignments(self, stats=None, title="ASSIGNMENT STATISTICS", note=None):
+        report = Report()
         if not self.numeric_cols:
+            self.assign_report.show(report)
             return
         
-        out = "\n" + "="*65 + "\n"
-        out += "          ASSIGNMENT STATISTICS\n"
-        out += "="*65 + "\n\n"
-        
-        for i, col in enumerate(self.numeric_cols, 1):
-            data = self.df[col].dropna()
-            if len(data) == 0:
-                continue
-            
-            out += f"\n{'━'*65}\n"
-            out += f"#{i}: {col}\n"
-            out += f"{'━'*65}\n"
-            out += f"Submissions: {len(data)}/{len(self.df)} ({len(data)/len(self.df)*100:.0f}%)\n"
-            out += f"Mean:     {data.mean():.2f}\n"
-            out += f"Median:   {data.median():.2f}\n"
-            out += f"Std Dev:  {data.std():.2f}\n"
-            out += f"Range:    {data.min():.2f} - {data.max():.2f}\n\n"
-            
-            q1, q3 = data.quantile([0.25, 0.75])
-            out += f"Q1: {q1:.2f}  |  Q3: {q3:.2f}  |  IQR: {q3-q1:.2f}\n\n"
-            
-            if data.max() <= 100:
-                a = len(data[data >= 90])
-                b = len(data[(data >= 80) & (data < 90)])
-                c = len(data[(data >= 70) & (data < 80)])
-                d = len(data[(data >= 60) & (data < 70)])
-                f = len(data[data < 60])
-                
-                out += "Grades:\n"
-                out += f" A: {a:3d} ({a/len(data)*100:5.1f}%) {'█'*int(a/len(data)*20)}\n"
-                out += f" B: {b:3d} ({b/len(data)*100:5.1f}%) {'█'*int(b/len(data)*20)}\n"
-                out += f" C: {c:3d} ({c/len(data)*100:5.1f}%) {'█'*int(c/len(data)*20)}\n"
-                out += f" D: {d:3d} ({d/len(data)*100:5.1f}%) {'█'*int(d/len(data)*20)}\n"
-                out += f" F: {f:3d} ({f/len(data)*100:5.1f}%) {'█'*int(f/len(data)*20)}\n\n"
-                out += f"Pass Rate: {(len(data)-f)/len(data)*100:.1f}%\n"
-        
-        out += "\n" + "="*65 + "\n"
-        self.assign_text.insert(tk.END, out)
+        if stats is None:
+            stats = assignment_stats(self.stats_matrix(), self.numeric_cols)
+            self.col_stats = {st['column']: st for st in stats}
+            self.col_stats_version = self.stats_key()
+            note = self.query_note()
+        
+        report.add_text(self.report_header(title, note))
+        for st in stats:
+            report.add(lambda st=st: self.assignment_section(st), 20 if st['bands'] is not None else 12,
+                       label=f"#{st['index']}: {st['column']}")
+        report.add_text("\n" + "="*65 + "\n")
+        self.assign_report.show(report)
+    
+    def report_header(self, title, note=None):
+        parts = ["\n", "="*65, "\n", f"          {title}\n", "="*65, "\n\n"]
+        if note:
+            parts.append(f"{note}\n\n")
+        return "".join(parts)
+    
+    def assignment_section(self, st, index=None):
+        # one assignment's block of the report (built when it's first shown)
+        n, n_students = st['submissions'], st['students']
+        parts = [
+            f"\n{'━'*65}\n",
+            f"#{st['index'] if index is None else index}: {st['column']}\n",
+            f"{'━'*65}\n",
+            f"Submissions: {n}/{n_students} ({n/n_students*100:.0f}%)\n",
+            f"Mean:     {st['mean']:.2f}\n",
+            f"Median:   {st['median']:.2f}\n",
+            f"Std Dev:  {st['std']:.2f}\n",
+            f"Range:    {st['min']:.2f} - {st['max']:.2f}\n\n",
+            f"Q1: {st['q1']:.2f}  |  Q3: {st['q3']:.2f}  |  IQR: {st['q3']-st['q1']:.2f}\n\n",
+        ]
+        if st['bands'] is not None:
+            parts.append("Grades:\n")
+            for letter, k in st['bands'].items():
+                parts.append(f" {letter}: {k:3d} ({k/n*100:5.1f}%) {'█'*int(k/n*20)}\n")
+            parts.append("\n")
+            parts.append(f"Pass Rate: {st['pass_rate']:.1f}%\n")
+        return "".join(parts)
     
     def calc_rankings(self):
-        self.top_text.delete(1.0, tk.END)
-        self.bottom_text.delete(1.0, tk.END)
-        
         if not self.numeric_cols:
+            self.top_report.show(Report())
+            self.bottom_report.show(Report())
             return
         
-        avgs = self.df[self.numeric_cols].mean(axis=1)
-        self.df['_avg_'] = avgs
-        sorted_df = self.df.sort_values('_avg_', ascending=False)
-        
-        # Top performers
-        top_out = "\n"
-        for rank, (idx, row) in enumerate(sorted_df.head(10).iterrows(), 1):
-            name = str(row.iloc[0]) if len(row) > 0 else f"Student {idx}"
-            avg = row['_avg_']
+        names = self.student_names()
+        rows = self.query_rows()
+        if rows is not None:
+            names = names[rows]
+        ranked = rankings(self.stats_matrix(), names, self.stats_averages(), k=10)
+        self.top_report.show(self.ranking_report(ranked['top'], top=True))
+        self.bottom_report.show(self.ranking_report(ranked['bottom'], top=False))
+    
+    def ranking_report(self, students, top):
+        # one section per student: (name, average, grades) or rankings() dicts
+        report = Report()
+        report.add_text("\n")
+        for rank, st in enumerate(students, 1):
+            report.add(lambda rank=rank, st=st: self.ranking_entry(rank, st, top), 3)
+        return report
+    
+    def ranking_entry(self, rank, st, top):
+        if top:
             medal = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉" if rank == 3 else f"{rank:2d}."
-            top_out += f"{medal} {name[:30]:30s} {avg:6.2f}%\n"
-            grades = [f"{row[c]:.1f}" for c in self.numeric_cols if not pd.isna(row[c])]
-            top_out += f"    {', '.join(grades[:10])}\n\n"
-        
-        self.top_text.insert(tk.END, top_out)
-        
-        # Bottom performers
-        bottom_out = "\n"
-        for idx, row in sorted_df.tail(10)[::-1].iterrows():
-            name = str(row.iloc[0]) if len(row) > 0 else f"Student {idx}"
-            avg = row['_avg_']
-            bottom_out += f"⚠️  {name[:30]:30s} {avg:6.2f}%\n"
-            grades = " ".join([f"[{row[c]:.1f}]" if row[c] < 60 else f"{row[c]:.1f}"
-                              for c in self.numeric_cols if not pd.isna(row[c])])
-            bottom_out += f"    {grades}\n\n"
-        
-        self.bottom_text.insert(tk.END, bottom_out)
-        
-        self.df.drop('_avg_', axis=1, inplace=True)
+            grades = [f"{g:.1f}" for g in st['grades']]
+            return f"{medal} {st['name'][:30]:30s} {st['average']:6.2f}%\n    {', '.join(grades[:10])}\n\n"
+        grades = " ".join([f"[{g:.1f}]" if g < 60 else f"{g:.1f}" for g in st['grades']])
+        return f"⚠️  {st['name'][:30]:30s} {st['average']:6.2f}%\n    {grades}\n\n"
     
     def update_chart(self, event=None):
         if not HAS_MATPLOTLIB or not self.numeric_cols:
@@ -461,12 +1275,18 @@ class GradebookViewer:
         if not col:
             return
         
-        data = self.df[col].dropna()
+        data = self.column_data(col)
+        if len(data) == 0:
+            tk.Label(self.chart_frame, text=f"No scores in {col}.",
+                    bg="white", font=("Arial", 11)).pack(pady=30)
+            return
         
         fig = Figure(figsize=(6, 4.5), dpi=100)
         ax = fig.add_subplot(111)
         
-        n, bins, patches = ax.hist(data, bins=min(20, len(data)//3),
+        # edges come from the column's cached quartiles/min/max, no extra pass
+        edges = bin_edges(self.column_summary(col), self.bin_strategy())
+        n, bins, patches = ax.hist(data, bins=edges,
                                     alpha=0.75, edgecolor='black', linewidth=1.2)
         
         if data.max() <= 100:
@@ -502,17 +1322,42 @@ class GradebookViewer:
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
     
+    def bin_strategy(self):
+        label = self.bins_var.get()
+        return next((s for s in STRATEGIES if STRATEGY_LABELS[s] == label), 'auto')
+    
+    def column_summary(self, col):
+        # column_stats of one subject, reused until the data changes
+        if self.col_stats_version != self.stats_key():
+            self.col_stats = {}
+            self.col_stats_version = self.stats_key()
+        if col not in self.col_stats:
+            x = self.stats_matrix()
+            self.col_stats[col] = column_stats(x[:, self.numeric_cols.index(col)], x.shape[0])
+        return self.col_stats[col]
+    
     def update_comparison(self):
         if not HAS_MATPLOTLIB or not self.numeric_cols:
             return
         
+        if self.query_mask() is not None:
+            x = np.asarray(self.stats_matrix(), dtype=float)
+            valid = ~np.isnan(x)
+            counts = valid.sum(axis=0)
+            means = np.where(counts > 0, np.where(valid, x, 0.0).sum(axis=0) / np.maximum(counts, 1), np.nan).tolist()
+        elif self.compact is not None:
+            means = self.compact.column_means()[[self.compact.subjects.index(c) for c in self.numeric_cols]].tolist()
+        else:
+            means = [self.df[c].mean() for c in self.numeric_cols]
+        self.draw_comparison_bars(means)
+    
+    def draw_comparison_bars(self, means):
         for w in self.comp_frame.winfo_children():
             w.destroy()
         
         fig = Figure(figsize=(6, 4.5), dpi=100)
         ax = fig.add_subplot(111)
         
-        means = [self.df[c].mean() for c in self.numeric_cols]
         x = np.arange(len(self.numeric_cols))
         
         bars = ax.bar(x, means, color='#3498db', alpha=0.8, edgecolor='black')
@@ -535,8 +1380,952 @@ class GradebookViewer:
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
     
-    def export_statistics(self):
+    def update_correlation(self):
+        if not HAS_MATPLOTLIB or not self.numeric_cols:
+            return
+        
+        for w in self.corr_frame.winfo_children():
+            w.destroy()
+        
+        # the matrix itself is only recomputed when the data version changes
+        result = self.corr_cache.get(self.stats_key(), self.numeric_cols, self.stats_matrix)
+        kind = 'cov' if self.corr_kind_var.get() == "Covariance" else 'corr'
+        fig = correlation_figure(result, kind)
+        
+        canvas = FigureCanvasTkAgg(fig, self.corr_frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    def update_dashboard(self):
+        if not HAS_MATPLOTLIB or not self.numeric_cols:
+            return
+        
+        for w in self.dash_frame.winfo_children():
+            w.destroy()
+        self.dash_images = []
+        
+        # placeholders first, panels replace them as the worker processes finish
+        columns = max(1, self.dash_canvas.winfo_width() // 560)
+        slots = []
+        for i, col in enumerate(self.numeric_cols):
+            label = tk.Label(self.dash_frame, text=f"{col}\nrendering...", bg="#f8f9fa",
+                            width=60, height=8, font=("Arial", 9))
+            label.grid(row=i // columns, column=i % columns, padx=4, pady=4)
+            slots.append(label)
+        
+        futures = self.dash_renderer.submit(self.stats_matrix(), self.numeric_cols)
+        self.dash_job = {'version': self.data_version, 'futures': futures, 'slots': slots, 'shown': 0}
+        self.poll_dashboard(self.dash_job)
+    
+    def poll_dashboard(self, job):
+        if job is not self.dash_job:
+            return  # a newer dashboard replaced this one
+        for i, future in enumerate(job['futures']):
+            if future is None or not future.done():
+                continue
+            job['futures'][i] = None
+            try:
+                _, png = future.result()
+            except Exception as e:
+                job['slots'][i].config(text=f"failed: {e}")
+                continue
+            image = tk.PhotoImage(data=base64.b64encode(png))
+            self.dash_images.append(image)  # Tk only draws images Python keeps alive
+            job['slots'][i].config(image=image, text="", width=0, height=0)
+            job['shown'] += 1
+        
+        total = len(job['futures'])
+        if any(f is not None for f in job['futures']):
+            self.status_label.config(text=f"🧩 Dashboard {job['shown']}/{total} panels", fg="#f39c12")
+            self.root.after(50, self.poll_dashboard, job)
+        else:
+            self.status_label.config(text=f"🧩 Dashboard: {total} subjects", fg="#2ecc71")
+    
+    def on_close(self):
+        if self.watch_job is not None:
+            self.root.after_cancel(self.watch_job)
+        self.dash_renderer.shutdown()
+        self.close_database()
+        self.root.destroy()
+    
+    # ---- sections (workspace) ------------------------------------------------
+    def register_section(self, name, new=False):
+        # the data just loaded becomes a section: a new tab, or the current one's replacement
+        current = self.workspace.current
+        if new or current is None:
+            section = self.workspace.add(name, self.model)
+        else:
+            section = self.workspace.replace(current, name, self.model)
+        section.state = {f: getattr(self, f) for f in self.SECTION_FIELDS}
+        self.sync_section_tabs()
+    
+    def stash_section(self):
+        # remember the current section's viewer state (not while DB / Quick Look own the view)
+        section = self.workspace.get()
+        if section is not None and self.store is None and self.approx is None:
+            section.state = {f: getattr(self, f) for f in self.SECTION_FIELDS}
+    
+    def restore_section(self):
+        for field, value in self.workspace.get().state.items():
+            setattr(self, field, value)
+        weights = self.fitted_weights()
+        if self.model.weights is not weights:
+            # weights were changed while another section was shown
+            self.model.set_weights(weights)
+            self.update_flags()
+            self.update_standing()
+        self.update_subject_lists()
+    
+    def sync_section_tabs(self):
+        self.switching_section = True
+        try:
+            for tab in self.section_bar.tabs():
+                self.section_bar.forget(tab)
+                self.root.nametowidget(tab).destroy()
+            self.section_tabs = {}
+            for name in self.workspace.sections:
+                frame = tk.Frame(self.section_bar, height=0)
+                self.section_bar.add(frame, text=name)
+                self.section_tabs[str(frame)] = name
+                if name == self.workspace.current:
+                    self.section_bar.select(frame)
+        finally:
+            self.switching_section = False
+    
+    def on_section_changed(self, event=None):
+        if self.switching_section:
+            return
+        name = self.section_tabs.get(self.section_bar.select())
+        if name is not None:
+            self.switch_section(name)
+    
+    def switch_section(self, name):
+        if name == self.workspace.current and self.store is None and self.approx is None:
+            return
+        self.stash_section()
+        self.close_database()
+        self.approx = None
+        self.approx_job = self.exact_job = None
+        self.workspace.current = name
+        self.restore_section()
+        self.data_version += 1
+        self.scheduler.invalidate('data')
+        self.scheduler.flush()
+        self.status_label.config(text=f"✓ Section: {name}", fg="#2ecc71")
+    
+    def close_section(self):
+        name = self.workspace.current
+        if name is None:
+            return
+        self.workspace.remove(name)
+        self.sync_section_tabs()
+        if self.store is None and self.approx is None:
+            if self.workspace.current is not None:
+                self.restore_section()
+            else:
+                for field in self.SECTION_FIELDS:
+                    setattr(self, field, None)
+                self.numeric_cols = []
+                self.auto_fixed = False
+                for item in self.tree.get_children():
+                    self.tree.delete(item)
+                self.record_label.config(text="")
+        self.data_version += 1
+        self.scheduler.invalidate('data')
+        self.scheduler.flush()
+        self.status_label.config(text=f"Closed section: {name}", fg="#2ecc71")
+    
+    def update_sections(self):
+        self.sections_text.delete(1.0, tk.END)
+        for w in self.sections_frame.winfo_children():
+            w.destroy()
+        if not len(self.workspace):
+            self.sections_text.insert(1.0, "\nNo sections open. Use ➕ Section to open gradebooks side by side.\n")
+            return
+        
+        comparison = self.workspace.comparison()
+        self.section_subject_combo['values'] = list(comparison)
+        if self.section_subject_var.get() not in comparison:
+            self.section_subject_var.set(OVERALL)
+        self.sections_text.insert(1.0, comparison_text(comparison))
+        
+        if HAS_MATPLOTLIB:
+            fig = comparison_figure(comparison, self.section_subject_var.get())
+            canvas = FigureCanvasTkAgg(fig, self.sections_frame)
+            canvas.draw()
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    # ---- what-if curves ------------------------------------------------------
+    def current_whatif(self):
+        # rebuilt when the data changes; curves of subjects still there are kept
+        if self.whatif is None or self.whatif_version != self.data_version:
+            old = self.whatif.curves if self.whatif is not None else {}
+            self.whatif = WhatIf(self.grade_matrix(), self.numeric_cols, self.model['Average'],
+                                 self.model.weights, self.model.pass_mark)
+            self.whatif.curves = {s: steps for s, steps in old.items() if s in self.numeric_cols}
+            self.whatif_version = self.data_version
+        return self.whatif
+    
+    def apply_curve(self):
+        if self.model is None or self.store is not None or self.approx is not None:
+            return
+        kind = self.curve_kind_var.get()
+        amount = None
+        if kind != 'sqrt':
+            try:
+                amount = float(self.curve_amount_var.get())
+            except ValueError:
+                messagebox.showerror("Error", f"'{kind}' needs a number")
+                return
+        subject = self.curve_subject_var.get()
+        subjects = self.numeric_cols if subject == "All subjects" else [subject]
+        whatif = self.current_whatif()
+        for s in subjects:
+            whatif.add(s, kind, amount)
+        self.curve_steps += 1
+        self.scheduler.invalidate('curve')
+    
+    def reset_curves(self):
+        if self.whatif is not None:
+            self.whatif.reset()
+        self.curve_steps += 1
+        self.scheduler.invalidate('curve')
+    
+    def update_whatif(self):
+        if not self.numeric_cols:
+            self.whatif_message("No numeric columns to curve.")
+            return
+        whatif = self.current_whatif()
+        summary = whatif.summary()
+        names = self.student_names()
+        self.whatif_text.delete(1.0, tk.END)
+        self.whatif_text.insert(1.0, whatif_text(summary, names))
+        if not whatif.curves:
+            self.whatif_text.insert(tk.END, "\n\nPick a subject and a curve, then Apply. "
+                                            "Curves stack; Reset clears them.")
+        
+        if HAS_MATPLOTLIB:
+            for w in self.whatif_frame.winfo_children():
+                w.destroy()
+            canvas = FigureCanvasTkAgg(whatif_figure(whatif, summary), self.whatif_frame)
+            canvas.draw()
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    def whatif_message(self, text):
+        self.whatif_text.delete(1.0, tk.END)
+        self.whatif_text.insert(1.0, "\n" + text + "\n")
+        for w in self.whatif_frame.winfo_children():
+            w.destroy()
+    
+    # ---- grouped statistics --------------------------------------------------
+    def group_columns(self):
+        # text columns other than the student name (section, teacher ...), then
+        # whole-number columns of a few repeated values (year, section number ...)
         if self.df is None:
+            return []
+        numeric = self.numeric_file_columns()
+        others = [c for c in self.file_columns() if c not in numeric]
+        return others[1:] + [c for c in numeric if cohort_like(self.file_column(c))]
+    
+    def subject_columns(self):
+        # the numeric columns, less a numeric one the Groups tab groups by
+        group = self.group_by_var.get()
+        return [c for c in self.numeric_file_columns() if c != group]
+    
+    # the loaded file's columns; in compact mode the grades live in self.compact
+    def file_columns(self):
+        return list(self.compact.column_order) if self.compact is not None else list(self.df.columns)
+    
+    def numeric_file_columns(self):
+        if self.compact is not None:
+            return list(self.compact.subjects)
+        return self.df.select_dtypes(include=[np.number]).columns.tolist()
+    
+    def file_column(self, col):
+        if self.compact is not None and col in self.compact.subjects:
+            return self.compact.values(col)
+        return self.df[col].to_numpy()
+    
+    def student_names(self):
+        # the first file column (the student name) as text, None for a file without columns
+        columns = self.file_columns()
+        if not columns:
+            return None
+        return pd.Series(self.file_column(columns[0])).astype(str).to_numpy()
+    
+    def choose_group(self):
+        if self.df is not None and self.store is None and self.subject_columns() != self.numeric_cols:
+            # a numeric column became (or stopped being) the grouping column:
+            # rebuild the subjects without it, like a fresh load
+            self.process_data()
+            self.refresh_all()
+        else:
+            self.scheduler.invalidate('group_by')
+    
+    def current_grouped(self):
+        # one sort + reductions per (data, column); the chart choice only redraws
+        col = self.group_by_var.get()
+        if self.grouped is None or self.grouped[:2] != (self.data_version, col):
+            # a section restored with other subjects may still hold the column
+            keep = [j for j, c in enumerate(self.numeric_cols) if c != col]
+            gs = GroupedStats(self.grade_matrix()[:, keep], [self.numeric_cols[j] for j in keep],
+                              self.file_column(col), self.model['Average'])
+            self.grouped = (self.data_version, col, gs)
+        return self.grouped[2]
+    
+    def update_groups(self):
+        col = self.group_by_var.get()
+        if not self.numeric_cols:
+            self.groups_message("No numeric columns to summarize.")
+            return
+        if not col or col not in self.file_columns():
+            self.groups_message("No column to group by. Add a text column such as section or "
+                                "teacher next to the grades, or pick a year / cohort column above.")
+            return
+        gs = self.current_grouped()
+        self.groups_text.delete(1.0, tk.END)
+        self.groups_text.insert(1.0, grouped_text(gs, col))
+        
+        if HAS_MATPLOTLIB and len(gs):
+            for w in self.groups_frame.winfo_children():
+                w.destroy()
+            stat = dict(GROUP_STATS).get(self.group_stat_var.get(), 'mean')
+            canvas = FigureCanvasTkAgg(grouped_figure(gs, stat), self.groups_frame)
+            canvas.draw()
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    def groups_message(self, text):
+        self.groups_text.delete(1.0, tk.END)
+        self.groups_text.insert(1.0, "\n" + text + "\n")
+        for w in self.groups_frame.winfo_children():
+            w.destroy()
+    
+    # ---- performance clusters ------------------------------------------------
+    def current_clustering(self):
+        # refitted only when the grades change (new model or appended rows) or k does
+        k = int(self.cluster_k_var.get())
+        cached = self.clustering
+        if cached is None or cached[0] is not self.model or cached[1:3] != (self.model.version, k):
+            clustering = Clustering(self.grade_matrix(), self.numeric_cols, k)
+            self.clustering = cached = (self.model, self.model.version, k, clustering)
+        return cached[3]
+    
+    def on_cluster_k_changed(self):
+        self.scheduler.invalidate('cluster_k')
+        if self.cluster_color_var.get():
+            self.retag_table()
+    
+    def update_clusters(self):
+        if not self.numeric_cols:
+            self.clusters_message("No numeric columns to cluster.")
+            return
+        clustering = self.current_clustering()
+        self.clusters_text.delete(1.0, tk.END)
+        self.clusters_text.insert(1.0, cluster_text(clustering, self.model['Average'], self.model.pass_mark))
+        
+        if HAS_MATPLOTLIB and len(clustering):
+            for w in self.clusters_frame.winfo_children():
+                w.destroy()
+            canvas = FigureCanvasTkAgg(cluster_figure(clustering), self.clusters_frame)
+            canvas.draw()
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    def clusters_message(self, text):
+        self.clusters_text.delete(1.0, tk.END)
+        self.clusters_text.insert(1.0, "\n" + text + "\n")
+        for w in self.clusters_frame.winfo_children():
+            w.destroy()
+    
+    # ---- student drill-down --------------------------------------------------
+    def selected_position(self):
+        # the selected row's position in self.df (item ids are positions)
+        selection = self.tree.selection()
+        if not selection or self.standing is None or self.store is not None:
+            return None
+        try:
+            position = int(selection[0])
+        except ValueError:
+            return None
+        return position if position < len(self.standing) else None
+    
+    def open_profile(self, event=None):
+        if self.selected_position() is None:
+            return
+        if self.profile_win is None or not self.profile_win.winfo_exists():
+            self.profile_win = tk.Toplevel(self.root)
+            self.profile_win.geometry("720x720")
+            self.profile_win.configure(bg="white")
+            self.profile_text = tk.Text(self.profile_win, height=len(self.standing.columns) + 4,
+                                        font=("Courier", 10), bg="#f8f9fa")
+            self.profile_text.pack(fill=tk.X, padx=10, pady=10)
+            self.profile_chart = tk.Frame(self.profile_win, bg="white")
+            self.profile_chart.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.show_profile()
+        self.profile_win.lift()
+    
+    def on_tree_select(self, event=None):
+        if self.profile_win is not None and self.profile_win.winfo_exists():
+            self.show_profile()
+    
+    def show_profile(self):
+        if self.profile_win is None or not self.profile_win.winfo_exists():
+            return
+        position = self.selected_position()
+        if position is None:
+            return
+        profile = self.standing.profile(position)
+        self.profile_win.title(f"Student Profile - {profile['name']}")
+        self.profile_text.delete(1.0, tk.END)
+        self.profile_text.insert(1.0, profile_text(profile))
+        
+        if HAS_MATPLOTLIB:
+            for w in self.profile_chart.winfo_children():
+                w.destroy()
+            canvas = FigureCanvasTkAgg(profile_figure(profile), self.profile_chart)
+            canvas.draw()
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    # ---- watch mode ----------------------------------------------------------
+    def toggle_watch(self):
+        if self.watch_job is not None:
+            self.root.after_cancel(self.watch_job)
+            self.watch_job = None
+        if self.watch_var.get():
+            if self.tail is None and self.df is not None:
+                self.status_label.config(text="👁 Watch only works for a loaded CSV file", fg="#e67e22")
+            self.watch_job = self.root.after(WATCH_MS, self.poll_watch)
+    
+    def poll_watch(self):
+        self.watch_job = None
+        if not self.watch_var.get():
+            return
+        try:
+            if self.tail is not None:
+                change, rows = self.tail.poll()
+                if change == 'reload' or (change == 'append' and self.compact is not None):
+                    # rewritten file (or the compact store, which can't grow): read it again
+                    self.load_path(self.loaded_path, interactive=False)
+                elif change == 'append':
+                    self.append_rows(rows)
+        except Exception as e:
+            self.status_label.config(text=f"👁 Watch: {str(e)}", fg="#e74c3c")
+        self.watch_job = self.root.after(WATCH_MS, self.poll_watch)
+    
+    def append_rows(self, rows):
+        # new students at the end of the file: only they are parsed, formatted,
+        # scored and inserted into the table; the tabs refresh as usual
+        rows = rows.reindex(columns=self.df.columns)
+        for col in self.numeric_cols:
+            rows[col] = pd.to_numeric(rows[col], errors='coerce')
+        if self.auto_fixed:
+            rows = fix(rows, validate(rows, self.numeric_cols))
+            rows = rows.reindex(columns=self.df.columns)
+        if len(rows) == 0:
+            return
+        start = len(self.df)
+        first = int(self.df.index.max()) + 1 if start else 0
+        rows.index = pd.RangeIndex(first, first + len(rows))
+        
+        # everything that can fail is worked out before the model and the
+        # formatted text grow, so a bad batch leaves the table as it was
+        shown = self.shown_rows
+        old_tags = self.table_tags(shown) if shown is not None else None
+        old_mask = self.query_mask()
+        search = self.search_var.get().lower().strip()
+        keep = np.ones(len(rows), dtype=bool)
+        if search:
+            keep = FormattedColumns(rows, self.numeric_cols).search(np.arange(len(rows)), search)
+        old_standing = {c: self.formatted.text[c] for c in STANDING_FORMATS}
+        self.df = self.model.append(rows)
+        self.formatted.append(rows)
+        self.update_flags()
+        # everyone's rank can move, but only cells whose text changed are rewritten
+        self.update_standing()
+        
+        mask = self.query_mask()
+        if mask is not None and not np.array_equal(mask[:start], old_mask):
+            # the filter keeps a different set of existing students now (a Rank
+            # or Average clause): redraw the table instead of patching it
+            self.apply_filter()
+            self.display_data()
+        else:
+            # tags of rows already in the table can change too (class mean moved,
+            # clusters refitted)
+            items = self.tree.get_children()
+            if shown is not None and len(items) == len(shown):
+                tags = self.table_tags(shown)
+                for i in np.flatnonzero(old_tags != tags):
+                    self.tree.item(items[i], tags=(tags[i],))
+                if self.tree['columns'] and self.tree['columns'][-1] == 'Percentile':
+                    for col, old in old_standing.items():
+                        changed = np.flatnonzero(old[shown] != self.formatted.text[col][shown])
+                        for i in changed:
+                            self.tree.set(items[i], col, self.formatted.text[col][shown[i]])
+            
+            if mask is not None:
+                keep &= mask[start:]
+            positions = start + np.flatnonzero(keep)
+            self.shown_rows = np.concatenate([self.shown_rows, positions])
+            tags = self.table_tags(positions)
+            columns = self.file_columns() + list(STANDING_FORMATS)
+            for values, tag, pos in zip(self.formatted.rows(positions, columns), tags, positions):
+                self.tree.insert('', tk.END, iid=str(pos), values=values, tags=(tag,))
+        self.show_profile()
+        self.record_label.config(text=f"Showing {len(self.shown_rows)} of {len(self.df)} records")
+        self.show_query_chips()
+        
+        self.data_version += 1
+        self.scheduler.invalidate('rows_appended')
+        self.status_label.config(
+            text=f"👁 +{len(rows)} rows from {os.path.basename(self.loaded_path)}", fg="#2ecc71")
+    
+    # ---- approximate mode ----------------------------------------------------
+    def load_approximate(self):
+        file_path = filedialog.askopenfilename(
+            title="Select Large CSV for a Quick Look",
+            filetypes=[("CSV", "*.csv"), ("All", "*.*")]
+        )
+        
+        if not file_path:
+            return
+        
+        # the streaming pass runs on a worker thread too, the Tk loop only
+        # polls its progress
+        job = {'path': file_path, 'rows': 0, 'summary': None, 'error': None}
+        
+        def work():
+            try:
+                job['summary'] = ApproxSummary.from_csv(file_path, progress=lambda rows: job.update(rows=rows))
+            except Exception as e:
+                job['error'] = e
+        
+        job['thread'] = threading.Thread(target=work, daemon=True)
+        job['thread'].start()
+        self.approx_job = job
+        self.status_label.config(text="Streaming...", fg="#f39c12")
+        self.root.after(200, self.poll_approx_load, job)
+    
+    def poll_approx_load(self, job):
+        if job is not self.approx_job:
+            return  # another file was opened in the meantime
+        if job['thread'].is_alive():
+            self.status_label.config(text=f"Streaming... {job['rows']:,} rows", fg="#f39c12")
+            self.root.after(200, self.poll_approx_load, job)
+            return
+        self.approx_job = None
+        file_path, summary = job['path'], job['summary']
+        
+        try:
+            if job['error'] is not None:
+                raise job['error']
+            
+            self.stash_section()
+            self.close_database()
+            self.compact = None
+            self.tail = None
+            self.approx = summary
+            # the table previews a uniform random sample of the rows
+            self.df = summary.sample.reset_index(drop=True)
+            self.shown_rows = np.arange(len(self.df))
+            self.data_version += 1
+            self.process_data()
+            self.scheduler.invalidate('data')
+            self.scheduler.flush()
+            
+            self.status_label.config(
+                text=f"≈ Approximate: {summary.rows:,} rows (exact loading in background)", fg="#e67e22")
+            self.start_exact_load(file_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Load failed:\n{str(e)}")
+            self.status_label.config(text="✖ Load failed", fg="#e74c3c")
+    
+    def start_exact_load(self, file_path):
+        # read (and check) the whole file on a worker thread, the Tk loop polls
+        # for the result
+        job = {'path': file_path, 'df': None, 'report': None, 'error': None}
+        
+        def work():
+            try:
+                job['df'] = self.read_frame(file_path)
+                job['report'] = validate(job['df'])
+            except Exception as e:
+                job['error'] = e
+        
+        job['thread'] = threading.Thread(target=work, daemon=True)
+        job['thread'].start()
+        self.exact_job = job
+        self.root.after(500, self.poll_exact_load, job)
+    
+    def poll_exact_load(self, job):
+        if job is not self.exact_job or self.approx is None:
+            return  # another file was opened in the meantime
+        if job['thread'].is_alive():
+            self.root.after(500, self.poll_exact_load, job)
+            return
+        self.exact_job = None
+        if job['error'] is not None:
+            self.status_label.config(text=f"≈ Approximate (exact load failed: {job['error']})", fg="#e74c3c")
+            return
+        
+        # swap the sketches for the real data, through the same checks as Load File
+        try:
+            checked = self.install_frame(job['df'], job['report'], job['path'], True, True)
+        except Exception as e:
+            self.status_label.config(text=f"≈ Approximate (exact load failed: {e})", fg="#e74c3c")
+            return
+        self.status_label.config(text=f"✓ Exact: {job['path'].split('/')[-1]} ({checked})", fg="#2ecc71")
+        self.warn_weights(True)
+    
+    def approx_note(self):
+        err = self.approx.rank_error() * 100
+        return (f"≈ Streaming estimate of {self.approx.rows:,} rows: counts, means, std, ranges\n"
+                f"  and grade bands are exact; medians/quartiles are within ±{err:.1f}% rank.")
+    
+    def render_approx_tab(self, view):
+        if view == 'overview':
+            self.calc_overview(self.approx.overview(), "GRADEBOOK OVERVIEW (approximate)", self.approx_note())
+        elif view == 'assignments':
+            self.calc_assignments(self.approx.assignments(), "ASSIGNMENT STATISTICS (approximate)",
+                                  self.approx_note())
+        elif view == 'rankings':
+            for report in (self.top_report, self.bottom_report):
+                report.show_text("\nRankings need every row - they appear once the exact load finishes.\n")
+        elif view == 'chart' and HAS_MATPLOTLIB:
+            self.update_chart_approx()
+        elif view == 'comparison' and HAS_MATPLOTLIB:
+            self.draw_comparison_bars([self.approx.stats[c].mean() for c in self.numeric_cols])
+        elif view == 'correlation' and HAS_MATPLOTLIB:
+            for w in self.corr_frame.winfo_children():
+                w.destroy()
+            tk.Label(self.corr_frame, text="Correlation appears once the exact load finishes.",
+                    bg="white", font=("Arial", 11)).pack(pady=30)
+        elif view == 'dashboard' and HAS_MATPLOTLIB:
+            self.dash_job = None
+            for w in self.dash_frame.winfo_children():
+                w.destroy()
+            tk.Label(self.dash_frame, text="The dashboard appears once the exact load finishes.",
+                    bg="white", font=("Arial", 11)).pack(pady=30)
+        elif view == 'whatif':
+            self.whatif_message("What-if curves appear once the exact load finishes.")
+        elif view == 'groups':
+            self.groups_message("Grouped statistics appear once the exact load finishes.")
+        elif view == 'clusters':
+            self.clusters_message("Clusters appear once the exact load finishes.")
+    
+    def update_chart_approx(self):
+        for w in self.chart_frame.winfo_children():
+            w.destroy()
+        
+        col = self.chart_var.get()
+        if not col:
+            return
+        
+        edges = bin_edges(self.approx.column_summary(col), self.bin_strategy())
+        counts, edges = self.approx.histogram(col, bins=edges if edges is not None else 20)
+        q1, median, q3 = self.approx.stats[col].sketch.quantile([0.25, 0.5, 0.75])
+        fig = Figure(figsize=(6, 4.5), dpi=100)
+        ax = fig.add_subplot(111)
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', alpha=0.75,
+               edgecolor='black', linewidth=1.2, color='#3498db')
+        ax.axvline(self.approx.stats[col].mean(), color='red', linestyle='--', linewidth=2.5,
+                   label=f'Mean: {self.approx.stats[col].mean():.2f}', alpha=0.8)
+        ax.axvline(median, color='green', linestyle='--', linewidth=2.5,
+                   label=f'Median ≈ {median:.2f}', alpha=0.8)
+        ax.set_xlabel('Score', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Frequency (estimated)', fontsize=12, fontweight='bold')
+        ax.set_title(f'{col} Distribution (≈ ±{self.approx.rank_error()*100:.1f}% rank)',
+                     fontsize=14, fontweight='bold')
+        ax.legend()
+        ax.grid(alpha=0.3)
+        fig.tight_layout()
+        
+        canvas = FigureCanvasTkAgg(fig, self.chart_frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    # ---- SQLite database mode ------------------------------------------------
+    def open_database(self):
+        file_path = filedialog.askopenfilename(
+            title="Select File to Open in Database Mode",
+            filetypes=[("Excel/CSV", "*.xlsx *.xls *.csv"), ("All", "*.*")]
+        )
+        
+        if not file_path:
+            return
+        
+        try:
+            self.status_label.config(text="Importing...", fg="#f39c12")
+            self.root.update()
+            
+            self.stash_section()
+            self.approx_job = None
+            if self.store is None:
+                self.store = GradebookStore(STORE_PATH)
+            # already imported and unchanged files are reused as they are
+            self.store_book = self.store.import_file(file_path)
+            
+            self.df = None
+            self.tail = None
+            self.model = None
+            self.shown_rows = None
+            self.compact = None
+            self.approx = None
+            self.formatted = None
+            self.anomalies = None
+            self.row_flags = None
+            self.standing = None
+            self.numeric_cols = self.store.subjects(self.store_book)
+            if HAS_MATPLOTLIB and self.numeric_cols:
+                self.chart_combo['values'] = self.numeric_cols
+                self.chart_combo.current(0)
+            self.query_col_combo['values'] = self.query_columns()
+            if self.query_col_var.get() not in self.numeric_cols:
+                self.query_col_var.set(self.numeric_cols[0] if self.numeric_cols else "")
+            self.show_query_chips()
+            
+            self.data_version += 1
+            self.scheduler.invalidate('data')
+            self.scheduler.flush()
+            
+            self.status_label.config(text=f"✓ Database: {os.path.basename(file_path)}", fg="#2ecc71")
+        except Exception as e:
+            messagebox.showerror("Error", f"Database import failed:\n{str(e)}")
+            self.status_label.config(text="✖ Import failed", fg="#e74c3c")
+    
+    def close_database(self):
+        if self.store is not None:
+            self.store.close()
+        self.store = None
+        self.store_book = None
+    
+    def on_tree_scroll(self, first, last):
+        self.scroll_y.set(first, last)
+        # database mode keeps a window of pages: the next one is fetched near
+        # the bottom, the previous one near the top
+        if self.store is None or not self.db_pages or self.db_fetching:
+            return
+        if float(last) > 0.95 and self.db_end < self.db_total:
+            self.db_fetching = True
+            self.root.after_idle(self.load_db_page)
+        elif float(first) < 0.05 and self.db_start > 0:
+            self.db_fetching = True
+            self.root.after_idle(lambda: self.load_db_page(backward=True))
+    
+    def load_db_page(self, reset=False, backward=False):
+        self.db_fetching = False
+        search = self.search_var.get().strip()
+        if reset:
+            for item in self.tree.get_children():
+                self.tree.delete(item)
+            self.db_pages = []
+            self.db_start = self.db_end = 0
+            self.db_total = self.store.student_count(self.store_book, search, self.db_query())
+        if backward:
+            if not self.db_pages:
+                return
+            page = self.store.page(self.store_book, None, DB_PAGE_ROWS, search, self.db_query(),
+                                   before=self.db_pages[0][0])
+        else:
+            if self.db_end >= self.db_total:
+                self.show_db_window()
+                return
+            after = self.db_pages[-1][1] if self.db_pages else None
+            page = self.store.page(self.store_book, after, DB_PAGE_ROWS, search, self.db_query())
+        if reset:
+            self.tree['columns'] = list(page.columns)
+            self.tree['show'] = 'headings'
+            for col in page.columns:
+                self.tree.heading(col, text=col)
+                width = 150 if col in self.numeric_cols else 180
+                self.tree.column(col, width=width, anchor=tk.CENTER)
+            self.tree.tag_configure('even', background='#f8f9fa')
+            self.tree.tag_configure('odd', background='white')
+        if not len(page):
+            self.show_db_window()
+            return
+        
+        rows = FormattedColumns(page, self.numeric_cols).rows()
+        top, _ = self.tree.yview()
+        shown = len(self.tree.get_children())
+        first = self.db_start - len(rows) if backward else self.db_end
+        items = [self.tree.insert('', i if backward else tk.END, values=values,
+                                  tags=('even' if (first + i) % 2 == 0 else 'odd',))
+                 for i, values in enumerate(rows)]
+        entry = (page.index[0], page.index[-1], items)
+        if backward:
+            self.db_pages.insert(0, entry)
+            self.db_start -= len(rows)
+            above = len(rows)
+        else:
+            self.db_pages.append(entry)
+            self.db_end += len(rows)
+            above = 0
+        if len(self.db_pages) > DB_WINDOW_PAGES:
+            # drop the page furthest from where the user is scrolling
+            dropped = self.db_pages.pop(-1 if backward else 0)[2]
+            self.tree.delete(*dropped)
+            if backward:
+                self.db_end -= len(dropped)
+            else:
+                self.db_start += len(dropped)
+                above = -len(dropped)
+        if above and self.tree.get_children():
+            # rows added / removed above the view would make it jump
+            self.tree.yview_moveto((top * shown + above) / len(self.tree.get_children()))
+        self.show_db_window()
+    
+    def show_db_window(self):
+        if self.db_end > self.db_start:
+            text = f"Showing {self.db_start + 1}-{self.db_end} of {self.db_total} records"
+        else:
+            text = f"Showing 0 of {self.db_total} records"
+        self.record_label.config(text=text)
+    
+    def render_db_tab(self, view):
+        if view == 'overview':
+            self.calc_overview_db()
+        elif view == 'assignments':
+            self.calc_assignments_db()
+        elif view == 'rankings':
+            self.calc_rankings_db()
+        elif view == 'chart' and HAS_MATPLOTLIB:
+            self.update_chart_db()
+        elif view == 'comparison' and HAS_MATPLOTLIB:
+            means = [s['mean'] for s in self.store.subject_stats(self.store_book)]
+            self.draw_comparison_bars(means)
+        elif view == 'correlation' and HAS_MATPLOTLIB:
+            for w in self.corr_frame.winfo_children():
+                w.destroy()
+            tk.Label(self.corr_frame, text="Correlation is not available in database mode.",
+                    bg="white", font=("Arial", 11)).pack(pady=30)
+        elif view == 'dashboard' and HAS_MATPLOTLIB:
+            self.dash_job = None
+            for w in self.dash_frame.winfo_children():
+                w.destroy()
+            tk.Label(self.dash_frame, text="The dashboard is not available in database mode.",
+                    bg="white", font=("Arial", 11)).pack(pady=30)
+        elif view == 'whatif':
+            self.whatif_message("What-if curves are not available in database mode.")
+        elif view == 'groups':
+            self.groups_message("Grouped statistics are not available in database mode.")
+        elif view == 'clusters':
+            self.clusters_message("Clusters are not available in database mode.")
+    
+    def calc_overview_db(self):
+        self.overview_text.delete(1.0, tk.END)
+        overall = self.store.overall_stats(self.store_book)
+        n_students, avg_mean, avg_min, avg_max, at_risk = self.store.student_average_stats(self.store_book)
+        if not overall['count']:
+            self.overview_text.insert(tk.END, "\nNo grade data found.\n")
+            return
+        
+        out = "\n" + "="*60 + "\n"
+        out += "          GRADEBOOK OVERVIEW (database)\n"
+        out += "="*60 + "\n\n"
+        out += f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        out += f"👥 Students: {self.store.student_count(self.store_book)}\n"
+        out += f"📝 Assignments: {len(self.numeric_cols)}\n\n"
+        count = self.query_count()
+        if count is not None:
+            # SQL filters page the table; the statistics stay whole-gradebook here
+            out += f"🧮 Table filter: {describe(self.query)}  (%d of %d students, not applied below)\n\n" % count
+        
+        total = overall['count']
+        out += "─"*60 + "\n"
+        out += "📊 OVERALL PERFORMANCE\n"
+        out += "─"*60 + "\n"
+        out += f"Total Submissions: {total}\n"
+        out += f"Class Average: {overall['mean']:.2f}%\n"
+        out += f"Median: {self.store.quantile(self.store_book, None, 0.5):.2f}%\n"
+        out += f"Std Dev: {overall['std']:.2f}\n"
+        out += f"Range: {overall['min']:.2f} - {overall['max']:.2f}\n\n"
+        
+        out += "📈 GRADE DISTRIBUTION\n"
+        out += "─"*60 + "\n"
+        for letter, n in zip("ABCDF", overall['bands']):
+            out += f"{letter}: {n:4d} ({n/total*100:5.1f}%) {'█'*min(int(n/total*30),30)}\n"
+        out += f"\n✓ Pass Rate: {(total - overall['bands'][4]) / total * 100:.1f}%\n\n"
+        
+        out += "─"*60 + "\n"
+        out += "👥 STUDENT SUMMARY\n"
+        out += "─"*60 + "\n"
+        out += f"Average Score: {avg_mean:.2f}%\n"
+        out += f"Median: {self.store.student_average_quantile(self.store_book, 0.5):.2f}%\n"
+        out += f"Range: {avg_min:.2f} - {avg_max:.2f}%\n\n"
+        if at_risk:
+            out += f"⚠️  At Risk (<60%): {at_risk} ({at_risk/n_students*100:.1f}%)\n\n"
+        out += "="*60 + "\n"
+        self.overview_text.insert(tk.END, out)
+    
+    def calc_assignments_db(self):
+        n_students = self.store.student_count(self.store_book)
+        report = Report()
+        report.add_text(self.report_header("ASSIGNMENT STATISTICS (database)"))
+        
+        for i, st in enumerate(self.store.subject_stats(self.store_book), 1):
+            if not st['count']:
+                continue
+            # the quartile queries only run for sections that are shown
+            report.add(lambda i=i, st=st: self.assignment_section(self.store_stats(st, n_students), i),
+                       20 if st['max'] <= 100 else 12, label=f"#{i}: {st['subject']}")
+        
+        report.add_text("\n" + "="*65 + "\n")
+        self.assign_report.show(report)
+    
+    def store_stats(self, st, n_students):
+        # a subject_stats() row in the shape assignment_section() reads
+        n, col = st['count'], st['subject']
+        bands = dict(zip("ABCDF", st['bands'])) if st['max'] <= 100 else None
+        return {
+            'column': col, 'submissions': n, 'students': n_students,
+            'mean': st['mean'], 'std': st['std'], 'min': st['min'], 'max': st['max'],
+            'median': self.store.quantile(self.store_book, col, 0.5),
+            'q1': self.store.quantile(self.store_book, col, 0.25),
+            'q3': self.store.quantile(self.store_book, col, 0.75),
+            'bands': bands,
+            'pass_rate': (n - st['bands'][4]) / n * 100,
+        }
+    
+    def calc_rankings_db(self):
+        top = self.store.top_k(self.store_book, 10)
+        bottom = self.store.top_k(self.store_book, 10, ascending=True)
+        details = self.store.students_by_id(self.store_book, [r[0] for r in top + bottom])
+        
+        def entries(rows):
+            return [{'name': str(name), 'average': avg,
+                     'grades': details.loc[sid, self.numeric_cols].dropna().tolist()}
+                    for sid, name, avg in rows]
+        self.top_report.show(self.ranking_report(entries(top), top=True))
+        self.bottom_report.show(self.ranking_report(entries(bottom), top=False))
+    
+    def update_chart_db(self):
+        for w in self.chart_frame.winfo_children():
+            w.destroy()
+        
+        col = self.chart_var.get()
+        if not col:
+            return
+        
+        # only the bin counts come back from SQLite
+        bins = self.store.histogram(self.store_book, col, width=5)
+        fig = Figure(figsize=(6, 4.5), dpi=100)
+        ax = fig.add_subplot(111)
+        if bins:
+            starts, counts = zip(*bins)
+            ax.bar(starts, counts, width=5, align='edge', alpha=0.75,
+                   edgecolor='black', linewidth=1.2, color='#3498db')
+        ax.set_xlabel('Score', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Frequency', fontsize=12, fontweight='bold')
+        ax.set_title(f'{col} Distribution', fontsize=14, fontweight='bold')
+        ax.grid(alpha=0.3)
+        fig.tight_layout()
+        
+        canvas = FigureCanvasTkAgg(fig, self.chart_frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    def export_statistics(self):
+        if not self.has_data():
             messagebox.showwarning("No Data", "Load a file first!")
             return
         
@@ -547,10 +2336,13 @@ class GradebookViewer:
         
         if path:
             try:
+                # the export reads these tabs, so make sure they are up to date
+                self.ensure_tab('overview')
+                self.ensure_tab('assignments')
                 with open(path, 'w', encoding='utf-8') as f:
                     f.write(self.overview_text.get(1.0, tk.END))
                     f.write("\n\n" + "="*80 + "\n\n")
-                    f.write(self.assign_text.get(1.0, tk.END))
+                    f.write(self.assign_report.get_text())
                 messagebox.showinfo("Success", f"Exported to:\n{path}")
             except Exception as e:
                 messagebox.showerror("Error", f"Export failed:\n{str(e)}")
@@ -1,16 +1,32 @@
 import pandas as pd
+from weighting import load_scheme, checked, weights_path
+from gradebook_model import GradebookModel
+from validation import validate, fix
 # import matplotlib.pyplot as plt
 # import numpy as np
 #reading the file
-df = pd.read_csv(r'C:\Users\anase\Desktop\Project files\project.csv')
+data_path = r'C:\Users\anase\Desktop\Project files\project.csv'
+df = pd.read_csv(data_path)
 subjects = ['CS101','CS102','ENG102','MATH','SSC1']
+#weights.json from the data file's folder, checked against the subjects
+weights, problems = checked(load_scheme(weights_path(data_path)), subjects)
+for problem in problems:
+    print("Weights:", problem)
+#check the data once before using it (bad grades, duplicate/untrimmed names, empty rows)
+report = validate(df, subjects)
+if not report.ok:
+    print("Data check:")
+    print(report.text())
+    df = fix(df, report)
 #For loop to convert all the data to numeric
 for col in subjects:
     df[col] = pd.to_numeric(df[col], errors='coerce')
+#derived columns come from one shared model: computed on first use, then cached
+model = GradebookModel(df, subjects, weights)
 #Add Total column
-df['Total']= df[subjects].sum(axis=1)
-#Add Average column
-df['Average'] = df[subjects].mean(axis=1)
+df['Total']= model['Total']
+#Add Average column (credit/category weighted when weights.json exists, plain mean otherwise)
+df['Average'] = model['Average']
 #Add top students part
 top_students = df.sort_values(by='Total', ascending=False).head()
 print("Top 5 Students:")
@@ -20,8 +36,9 @@ lowest_students = df.sort_values(by='Total', ascending=True).head()
 print("Students that needs attention: ")
 print(lowest_students)
 pass_students = 50
-#Add the status column pass/fail, "lambda x" creates anonymous function where x represents each individual average score
-df['Status'] = df['Average'].apply(lambda x: 'Pass' if x >= pass_students else 'Fail')
+#Add the status column pass/fail (Average >= pass mark, missing average counts as Fail)
+model.set_pass_mark(pass_students)
+df['Status'] = model['Status']
 total_students=len(df)
 passed=(df['Average']>=pass_students).sum()
 failed=(df['Average']<pass_students).sum()
@@ -43,30 +60,9 @@ for subject in subjects:
     print(f"\n{subject}:")
     print(f"pass: {subject_pass} students ({subject_pass_percentage:.2f}%)")
     print(f"fail: {subject_fail} students ({subject_fail_percentage:.2f}%)")
-#GPA calculation
-def GPA(Average):
-    if Average >=93:
-        return 4.0
-    elif Average >=90:
-        return 3.7
-    elif Average >=85:
-        return 3.5
-    elif Average >=83:
-        return 3.3
-    elif Average >=80:
-        return 3.0
-    elif Average >=75:
-        return 2.7
-    elif Average >=70:
-        return 2.5
-    elif Average >=60:
-        return 2.2
-    elif Average >=50:
-        return 2.0
-    else:
-        return 0.0
+#GPA calculation (grading.py scale, same cut-offs as the old GPA() if/elif chain)
 #Add gpa column
-df['GPA']=df['Average'].apply(GPA)
+df['GPA']=model['GPA']
 #To print all the columns together and it can be removed if other team members want
 pd.set_option('display.max_columns',None)
 
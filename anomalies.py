@@ -0,0 +1,86 @@
+import warnings
+
+import numpy as np
+
+
+# ==============================================================================
+# OUTLIER / AT-RISK DETECTION
+# Everything is computed for the whole grade matrix at once (students x
+# subjects) and kept as boolean matrices, so flagging a million rows is a few
+# NumPy passes instead of an iterrows() loop.
+# ==============================================================================
+AT_RISK_AVERAGE = 60     # same cut-off the Overview tab uses
+Z_LIMIT = 2.5            # |z| above this is an unusual grade for that subject
+IQR_FACTOR = 1.5         # Tukey fences
+DROP_POINTS = 25         # this many points below the student's mean of their other grades
+
+# row tag per student, most serious first
+ROW_TAGS = ('at_risk', 'drop', 'outlier')
+TAG_COLORS = {'at_risk': '#fadbd8', 'drop': '#fdebd0', 'outlier': '#fcf3cf'}
+
+
+class AnomalyFlags:
+    def __init__(self, matrix, z_limit=Z_LIMIT, iqr_factor=IQR_FACTOR,
+                 drop_points=DROP_POINTS, at_risk_average=AT_RISK_AVERAGE, averages=None):
+        x = np.asarray(matrix, dtype=float)
+        valid = ~np.isnan(x)
+        n_rows = x.shape[0]
+        self.n_rows = n_rows
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            counts = valid.sum(axis=0)
+            means = np.where(counts > 0, np.where(valid, x, 0).sum(axis=0) / np.maximum(counts, 1), np.nan)
+            centered = np.where(valid, x - means, 0.0)
+            stds = np.sqrt((centered * centered).sum(axis=0) / (counts - 1))
+            z = (x - means) / np.where(stds > 0, stds, np.nan)
+
+            if n_rows:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', RuntimeWarning)  # all-empty columns
+                    q1, q3 = np.nanpercentile(x, [25, 75], axis=0)
+            else:
+                q1 = q3 = np.full(x.shape[1], np.nan)
+            iqr = q3 - q1
+            self.low_fence = q1 - iqr_factor * iqr
+            self.high_fence = q3 + iqr_factor * iqr
+
+            # NaN compares False everywhere, so missing cells are never flagged
+            self.z_outliers = np.abs(z) > z_limit
+            self.fence_outliers = (x < self.low_fence) | (x > self.high_fence)
+            self.outliers = self.z_outliers | self.fence_outliers
+
+            # drop: a grade far below the mean of the student's other grades.
+            # Column order says nothing about when an assignment was due, so
+            # grades are not compared with their left-hand neighbour
+            row_counts = valid.sum(axis=1, keepdims=True)
+            row_sums = np.where(valid, x, 0.0).sum(axis=1, keepdims=True)
+            others = (row_sums - x) / np.where(row_counts > 1, row_counts - 1, np.nan)
+            self.drops = (others - x) >= drop_points
+
+            # plain means unless the caller has (weighted) averages already
+            if averages is None:
+                averages = np.where(valid.sum(axis=1) > 0,
+                                    np.where(valid, x, 0).sum(axis=1) / np.maximum(valid.sum(axis=1), 1),
+                                    np.nan)
+            averages = np.asarray(averages, dtype=float)
+            self.averages = averages
+            self.at_risk = averages < at_risk_average
+
+    def row_tags(self):
+        # one tag per student ('' when nothing is wrong), picked by priority
+        return np.select(
+            [self.at_risk, self.drops.any(axis=1), self.outliers.any(axis=1)],
+            list(ROW_TAGS), default='')
+
+    def summary(self, rows=None):
+        # counts over every student, or only over `rows` (filtered views)
+        at_risk, drops, outliers = self.at_risk, self.drops, self.outliers
+        if rows is not None:
+            at_risk, drops, outliers = at_risk[rows], drops[rows], outliers[rows]
+        return {
+            'at_risk': int(at_risk.sum()),
+            'drop_students': int(drops.any(axis=1).sum()),
+            'outlier_grades': int(outliers.sum()),
+            'outlier_students': int(outliers.any(axis=1).sum()),
+        }
+
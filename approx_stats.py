@@ -0,0 +1,270 @@
+import numpy as np
+import pandas as pd
+
+from gradebook_stats import BAND_LETTERS, AT_RISK_AVERAGE, grade_bands
+
+
+# ==============================================================================
+# APPROXIMATE STATISTICS FOR HUGE FILES
+# One streaming pass over the file (pd.read_csv in chunks) keeps:
+#   * EXACT running counts, sums, sums of squares, min, max and grade bands
+#     per column -> count / mean / std / range / pass rate are exact
+#   * a KLL quantile sketch per column (and for all grades / student averages)
+#     -> median, quartiles and histograms are approximate, with a stated
+#        rank error
+#   * a reservoir sample of rows for the table preview
+# Memory stays the same whether the file has 10 thousand or 100 million rows.
+# ==============================================================================
+class KLLSketch:
+    # KLL quantile sketch: levels of sorted items, an item on level h stands for
+    # 2**h original values. Full levels are compacted by keeping every other item.
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) <= self.capacity(h):
+                h += 1
+                continue
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # an odd item out stays behind, the rest is halved and promoted
+            keep = items[:1] if len(items) % 2 else items[:0]
+            pairs = items[len(keep):]
+            promoted = pairs[self.rng.integers(2)::2]
+            self.levels[h] = keep
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h = 0 if h + 1 >= len(self.levels) - 1 else h + 1
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lv), 2 ** h, dtype=float) for h, lv in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, qs):
+        if self.n == 0:
+            return np.full(np.shape(qs), np.nan)
+        items, cum = self._weighted()
+        targets = np.asarray(qs, dtype=float) * cum[-1]
+        idx = np.clip(np.searchsorted(cum, targets, side='left'), 0, len(items) - 1)
+        return items[idx]
+
+    def cdf(self, points):
+        # estimated fraction of values <= each point
+        if self.n == 0:
+            return np.zeros(np.shape(points))
+        items, cum = self._weighted()
+        idx = np.searchsorted(items, np.asarray(points, dtype=float), side='right')
+        return np.where(idx > 0, cum[np.maximum(idx - 1, 0)], 0.0) / cum[-1]
+
+    def rank_error(self):
+        # normalised rank error (~99% confidence) reported for KLL by Apache DataSketches
+        return 2.296 / self.k ** 0.9723
+
+    def size(self):
+        return sum(len(lv) for lv in self.levels)
+
+
+class RunningColumn:
+    # exact moments + bands, plus a sketch for the order statistics
+    def __init__(self, k=200, seed=None):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.bands = np.zeros(5, dtype=np.int64)
+        self.sketch = KLLSketch(k, seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.total += values.sum()
+        self.total_sq += np.dot(values, values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.bands += grade_bands(values)
+        self.sketch.update(values)
+
+    def mean(self):
+        return self.total / self.count if self.count else float('nan')
+
+    def std(self, ddof=0):
+        if self.count <= ddof:
+            return float('nan')
+        var = (self.total_sq - self.total * self.total / self.count) / (self.count - ddof)
+        return float(np.sqrt(max(var, 0.0)))
+
+
+class ApproxSummary:
+    def __init__(self, sample_size=1000, k=200, seed=None):
+        self.sample_size = sample_size
+        self.k = k
+        self.rng = np.random.default_rng(seed)
+        self.columns = []
+        self.all_columns = []
+        self.stats = {}
+        self.overall = RunningColumn(k, seed)
+        self.student_avgs = RunningColumn(k, seed)
+        self.rows = 0
+        self.at_risk = 0
+        self.sample = None
+        self.sample_index = np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_csv(cls, path, chunksize=100000, progress=None, **kwargs):
+        summary = cls(**kwargs)
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            summary.update(chunk)
+            if progress is not None:
+                progress(summary.rows)
+        return summary
+
+    def update(self, chunk):
+        chunk.columns = chunk.columns.str.strip()
+        if not self.columns:
+            self.all_columns = list(chunk.columns)
+            self.columns = chunk.select_dtypes(include=[np.number]).columns.tolist()
+            self.stats = {c: RunningColumn(self.k) for c in self.columns}
+        values = chunk[self.columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        for j, col in enumerate(self.columns):
+            self.stats[col].update(values[:, j])
+        self.overall.update(values.ravel())
+
+        valid = ~np.isnan(values)
+        counts = valid.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avgs = np.where(counts > 0, np.where(valid, values, 0).sum(axis=1) / counts, np.nan)
+        self.student_avgs.update(avgs)
+        self.at_risk += int(np.sum(avgs < AT_RISK_AVERAGE))
+
+        self._sample(chunk)
+        self.rows += len(chunk)
+
+    def _sample(self, chunk):
+        # reservoir sampling (Algorithm R), one vectorised draw per chunk
+        n = len(chunk)
+        start = self.rows
+        # grades as float in the sample, so later chunks always fit the columns
+        chunk = chunk.assign(**{c: pd.to_numeric(chunk[c], errors='coerce').astype(float)
+                                for c in self.columns})
+        if self.sample is None:
+            self.sample = chunk.iloc[:0].copy()
+        fill = max(0, min(self.sample_size - len(self.sample), n))
+        if fill:
+            self.sample = pd.concat([self.sample, chunk.iloc[:fill]], ignore_index=True)
+            self.sample_index = np.concatenate([self.sample_index, np.arange(start, start + fill)])
+        if fill < n:
+            seen = np.arange(start + fill, start + n)
+            slots = self.rng.integers(0, seen + 1)
+            take = np.nonzero(slots < self.sample_size)[0]
+            if len(take):
+                # later rows overwrite earlier ones in the same slot, like the sequential version
+                slots, last = np.unique(slots[take][::-1], return_index=True)
+                rows = take[::-1][last] + fill
+                replacement = chunk.iloc[rows].reset_index(drop=True)
+                replacement.index = slots
+                self.sample.loc[slots, :] = replacement[self.sample.columns]
+                self.sample_index[slots] = start + rows
+
+    # ---- results in the same shape as gradebook_stats ----------------------------
+    def rank_error(self):
+        return self.overall.sketch.rank_error()
+
+    def overview(self):
+        o, s = self.overall, self.student_avgs
+        median, = o.sketch.quantile([0.5])
+        s_median, = s.sketch.quantile([0.5])
+        total = o.count
+        return {
+            'students': self.rows,
+            'assignments': len(self.columns),
+            'submissions': total,
+            'mean': float(o.mean()),
+            'median': float(median),
+            'std': o.std(),
+            'min': float(o.min) if total else float('nan'),
+            'max': float(o.max) if total else float('nan'),
+            'bands': dict(zip(BAND_LETTERS, o.bands.tolist())),
+            'pass_rate': float((total - o.bands[4]) / total * 100) if total else float('nan'),
+            'student_mean': float(s.mean()),
+            'student_median': float(s_median),
+            'student_min': float(s.min) if s.count else float('nan'),
+            'student_max': float(s.max) if s.count else float('nan'),
+            'at_risk': self.at_risk,
+        }
+
+    def assignments(self):
+        out = []
+        for j, col in enumerate(self.columns):
+            st = self.stats[col]
+            if st.count == 0:
+                continue
+            q1, median, q3 = st.sketch.quantile([0.25, 0.5, 0.75])
+            row = {
+                'index': j + 1, 'column': col, 'submissions': st.count, 'students': self.rows,
+                'mean': float(st.mean()), 'median': float(median), 'std': st.std(ddof=1),
+                'min': float(st.min), 'max': float(st.max), 'q1': float(q1), 'q3': float(q3),
+                'bands': None, 'pass_rate': None,
+            }
+            if st.max <= 100:
+                row['bands'] = dict(zip(BAND_LETTERS, st.bands.tolist()))
+                row['pass_rate'] = float((st.count - st.bands[4]) / st.count * 100)
+            out.append(row)
+        return out
+
+    def column_summary(self, col):
+        # what binning.bin_edges() needs, from the sketch
+        st = self.stats[col]
+        if st.count == 0:
+            return {'submissions': 0}
+        q1, q3 = st.sketch.quantile([0.25, 0.75])
+        return {'submissions': st.count, 'min': float(st.min), 'max': float(st.max),
+                'q1': float(q1), 'q3': float(q3)}
+
+    def histogram(self, col, bins=20):
+        # bin counts estimated from the sketch CDF between the exact min and max
+        # (bins: a number of equal bins or the edges themselves)
+        st = self.stats[col]
+        if st.count == 0:
+            return np.zeros(0), np.zeros(1)
+        if np.ndim(bins):
+            edges = np.asarray(bins, dtype=float)
+        else:
+            hi = st.max if st.max > st.min else st.min + 1
+            edges = np.linspace(st.min, hi, bins + 1)
+        cdf = st.sketch.cdf(edges)
+        cdf[0] = 0.0
+        cdf[-1] = 1.0
+        return np.diff(cdf) * st.count, edges
@@ -0,0 +1,98 @@
+import numpy as np
+
+
+# ==============================================================================
+# HISTOGRAM BINNING
+# Bin edges are worked out from a column summary the stats code already has
+# (count, min, max, q1, q3 - see gradebook_stats.column_stats), so picking the
+# bins never needs another pass over the scores:
+#   fixed    - `bins` equal bins over 0-100 (or min-max for non-percent scores)
+#   fd       - Freedman-Diaconis, width = 2 * IQR / n^(1/3)
+#   sturges  - log2(n) + 1 bins
+#   integer  - one bin per whole score (k - 0.5 .. k + 0.5)
+#   auto     - the narrower of fd / sturges, like numpy's 'auto'
+# When every score is a whole number the widths are whole numbers too and the
+# edges sit between scores (no empty comb bins from sub-point widths).
+# Always at least one bin and never more than MAX_BINS, from 5 scores to 5M.
+# ==============================================================================
+STRATEGIES = ('auto', 'fixed', 'fd', 'sturges', 'integer')
+STRATEGY_LABELS = {
+    'auto': "Auto",
+    'fixed': "Fixed (10)",
+    'fd': "Freedman–Diaconis",
+    'sturges': "Sturges",
+    'integer': "Integer scores",
+}
+FIXED_BINS = 10
+MAX_BINS = 200
+
+
+def summarize(values):
+    # the column summary bin_edges() needs, for callers without column_stats
+    data = np.asarray(values, dtype=float)
+    data = data[~np.isnan(data)]
+    if len(data) == 0:
+        return {'submissions': 0}
+    q1, q3 = np.quantile(data, [0.25, 0.75])
+    return {'submissions': len(data), 'min': float(data.min()), 'max': float(data.max()),
+            'q1': float(q1), 'q3': float(q3), 'whole': bool(np.all(data == np.round(data)))}
+
+
+def sturges_bins(n):
+    return int(np.ceil(np.log2(n))) + 1 if n > 1 else 1
+
+
+def fd_width(stats):
+    iqr = stats['q3'] - stats['q1']
+    return 2.0 * iqr / stats['submissions'] ** (1 / 3)
+
+
+def bin_edges(stats, strategy='auto', bins=FIXED_BINS):
+    # -> increasing edges array, or None when there are no scores
+    n = stats.get('submissions', 0) if stats else 0
+    if not n:
+        return None
+    lo, hi = stats['min'], stats['max']
+    whole = stats.get('whole', False)
+
+    if strategy == 'fixed':
+        if lo >= 0 and hi <= 100:
+            return np.linspace(0, 100, bins + 1)
+        return np.linspace(lo, hi if hi > lo else lo + 1, bins + 1)
+
+    if hi == lo:
+        return np.array([lo - 0.5, hi + 0.5])
+
+    if strategy == 'integer':
+        if np.ceil(hi) - np.floor(lo) + 1 <= MAX_BINS:
+            return np.arange(np.floor(lo), np.ceil(hi) + 2) - 0.5
+        strategy = 'fd'   # too many distinct whole scores for a bar each
+
+    span = hi - lo
+    sturges = span / sturges_bins(n)
+    if strategy == 'sturges':
+        width = sturges
+    else:
+        fd = fd_width(stats)
+        if strategy == 'fd':
+            width = fd if fd > 0 else sturges
+        else:
+            width = min(fd, sturges) if fd > 0 else sturges
+
+    width = max(width, span / MAX_BINS)
+    if whole:
+        # whole-number scores: whole-number widths, edges between the scores
+        width = max(1.0, np.round(width))
+        start = np.floor(lo) - 0.5
+        if (hi + 0.5 - start) / width > MAX_BINS:
+            # rounded down past the cap: the smallest whole width that fits
+            width = np.ceil((hi + 0.5 - start) / MAX_BINS)
+        count = int(np.ceil((hi + 0.5 - start) / width))
+        return start + width * np.arange(count + 1)
+    count = min(MAX_BINS, max(1, int(np.ceil(span / width))))   # float noise can give MAX_BINS + 1
+    return np.linspace(lo, hi, count + 1)
+
+
+def histogram_edges(values, strategy='auto', bins=FIXED_BINS):
+    # bin_edges() straight from the scores (one quantile call)
+    return bin_edges(summarize(values), strategy, bins)
@@ -0,0 +1,116 @@
+import base64
+import io
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import matplotlib.image as mpimg
+import matplotlib.pyplot as plt
+
+
+# ==============================================================================
+# CHART RENDER CACHE
+# The draw_* functions build a new matplotlib figure from the raw data every
+# time. Charts only change when the data (or the chart's own arguments) do, so
+# the first render is rasterised once with Agg and kept as an RGBA bitmap:
+#   key = (draw function, its arguments, data version, size, dpi)
+# Going back to a chart you've already seen is then just putting the bitmap on
+# screen, and "save as PNG" encodes that same bitmap instead of drawing again.
+# Entries are evicted least-recently-used once the cache goes over max_bytes.
+# ==============================================================================
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ChartCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()   # key -> {'rgba': array, 'png': bytes or None}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, func, args, kwargs, version, size, dpi):
+        return (func.__module__, func.__qualname__, freeze(args), freeze(kwargs),
+                version, tuple(size) if size is not None else None, dpi)
+
+    def get(self, func, *args, version=0, size=None, dpi=100, **kwargs):
+        # the cached entry for this chart, rendering it on a miss
+        key = self.key(func, args, kwargs, version, size, dpi)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        fig = func(*args, **kwargs)
+        entry = {'rgba': rasterize(fig, size, dpi), 'png': None}
+        self.entries[key] = entry
+        self.nbytes += entry['rgba'].nbytes
+        self._evict()
+        return entry
+
+    def rgba(self, func, *args, **kwargs):
+        return self.get(func, *args, **kwargs)['rgba']
+
+    def png(self, func, *args, **kwargs):
+        entry = self.get(func, *args, **kwargs)
+        if entry['png'] is None:
+            entry['png'] = encode_png(entry['rgba'])
+            self.nbytes += len(entry['png'])
+            self._evict()
+        return entry['png']
+
+    def photo_data(self, func, *args, **kwargs):
+        # base64 PNG for tk.PhotoImage(data=...)
+        return base64.b64encode(self.png(func, *args, **kwargs))
+
+    def save(self, path, func, *args, **kwargs):
+        # exports reuse the cached render
+        with open(path, 'wb') as f:
+            f.write(self.png(func, *args, **kwargs))
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def _evict(self):
+        # always keep the newest entry, even if it alone is over the limit
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.nbytes -= old['rgba'].nbytes + (len(old['png']) if old['png'] else 0)
+
+
+def rasterize(fig, size=None, dpi=100):
+    # draw a figure with Agg and return a copy of its RGBA pixels (h x w x 4, uint8)
+    if size is not None:
+        fig.set_size_inches(size[0] / dpi, size[1] / dpi)
+    fig.set_dpi(dpi)
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    pixels = np.asarray(canvas.buffer_rgba()).copy()
+    # pyplot figures would otherwise stay open in pyplot's figure manager
+    plt.close(fig)
+    return pixels
+
+
+def encode_png(rgba):
+    buf = io.BytesIO()
+    mpimg.imsave(buf, rgba, format='png')
+    return buf.getvalue()
+
+
+def freeze(value):
+    # hashable stand-in for the draw arguments. Data is keyed by its shape and
+    # labels only - whether the contents changed is what the data version says
+    if isinstance(value, pd.DataFrame):
+        return ('DataFrame', value.shape, tuple(value.columns))
+    if isinstance(value, pd.Series):
+        return ('Series', value.shape, value.name)
+    if isinstance(value, np.ndarray):
+        return ('ndarray', value.shape, value.dtype.str)
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
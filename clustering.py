@@ -0,0 +1,266 @@
+import numpy as np
+
+from gradebook_stats import BAND_LETTERS, grade_bands
+
+
+# ==============================================================================
+# PERFORMANCE PROFILES (k-means clustering of students)
+# Groups students by the shape of their grades ("strong in CS, weak in MATH")
+# instead of by one cut on the average:
+#   * missing grades are filled with the subject mean (a missing grade doesn't
+#     pull a student towards any profile)
+#   * k-means++ seeding, then Lloyd iterations; distances to all centers come
+#     from one matrix product per chunk of rows, centers from bincount sums
+#   * above MINI_BATCH_ROWS students, centers are fitted on random mini-batches
+#     (Sculley's mini-batch k-means) and every student is assigned once at the end
+#   * clusters are numbered strongest first and the seed is fixed, so the same
+#     data always gives the same clusters, names and colors
+# ==============================================================================
+DEFAULT_K = 4
+K_CHOICES = tuple(range(2, 9))
+N_INIT = 3               # full k-means: best of this many seedings
+MAX_ITER = 100
+TOLERANCE = 1e-4         # stop when no center moves more than this (score points)
+MINI_BATCH_ROWS = 50_000
+BATCH_SIZE = 2048
+BATCH_STEPS = 200
+INIT_SAMPLE = 20_000     # k-means++ seeds from at most this many rows
+CHUNK_ROWS = 65_536      # rows per distance block
+PLOT_POINTS = 4000       # students drawn in the projection
+STANDOUT = 0.5           # std devs from the student's own level to call a subject strong/weak
+CLUSTER_COLORS = ('#d6eaf8', '#d5f5e3', '#fdebd0', '#e8daef',
+                  '#fadbd8', '#fcf3cf', '#d1f2eb', '#ebdef0')
+MARKER_COLORS = ('#2e86c1', '#28b463', '#e67e22', '#8e44ad',
+                 '#e74c3c', '#d4ac0d', '#17a589', '#7f8c8d')
+
+
+def impute(matrix, fill=None):
+    # NaN -> subject mean (0 for a subject nobody has a grade in)
+    x = np.array(matrix, dtype=float)
+    if fill is None:
+        valid = ~np.isnan(x)
+        counts = valid.sum(axis=0)
+        fill = np.where(counts > 0, np.where(valid, x, 0.0).sum(axis=0) / np.maximum(counts, 1), 0.0)
+    missing = np.isnan(x)
+    if missing.any():
+        x[missing] = np.broadcast_to(fill, x.shape)[missing]
+    return x, fill
+
+
+def assign(x, centers):
+    # nearest center of every row and the squared distance to it
+    labels = np.empty(len(x), dtype=np.int64)
+    best = np.empty(len(x))
+    center_sq = (centers * centers).sum(axis=1)
+    for start in range(0, len(x), CHUNK_ROWS):
+        block = x[start:start + CHUNK_ROWS]
+        d = center_sq - 2.0 * block @ centers.T        # |x|^2 is the same for every center
+        i = d.argmin(axis=1)
+        labels[start:start + len(block)] = i
+        best[start:start + len(block)] = d[np.arange(len(block)), i] + (block * block).sum(axis=1)
+    return labels, np.maximum(best, 0.0)
+
+
+def seed_centers(x, k, rng):
+    # k-means++: each next seed is picked with probability ~ squared distance
+    # to the nearest seed so far
+    centers = np.empty((k, x.shape[1]))
+    centers[0] = x[rng.integers(len(x))]
+    d2 = ((x - centers[0]) ** 2).sum(axis=1)
+    for c in range(1, k):
+        total = d2.sum()
+        if total > 0:
+            i = min(int(np.searchsorted(np.cumsum(d2), rng.random() * total)), len(x) - 1)
+        else:
+            i = rng.integers(len(x))     # fewer distinct students than clusters
+        centers[c] = x[i]
+        d2 = np.minimum(d2, ((x - centers[c]) ** 2).sum(axis=1))
+    return centers
+
+
+def center_sums(x, labels, k):
+    counts = np.bincount(labels, minlength=k)
+    sums = np.column_stack([np.bincount(labels, weights=x[:, j], minlength=k) for j in range(x.shape[1])])
+    return sums, counts
+
+
+def lloyd(x, centers):
+    for iteration in range(1, MAX_ITER + 1):
+        labels, dist = assign(x, centers)
+        sums, counts = center_sums(x, labels, len(centers))
+        new = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+        for c in np.flatnonzero(counts == 0):
+            # an empty cluster takes over the student furthest from their center
+            far = int(dist.argmax())
+            new[c], dist[far] = x[far], 0.0
+        shift = np.abs(new - centers).max()
+        centers = new
+        if shift <= TOLERANCE:
+            break
+    labels, dist = assign(x, centers)
+    return centers, labels, float(dist.sum()), iteration
+
+
+def mini_batch(x, centers, rng):
+    # each center moves towards its batch members with step 1 / (students seen so far)
+    seen = np.zeros(len(centers))
+    for step in range(1, BATCH_STEPS + 1):
+        batch = x[rng.integers(len(x), size=BATCH_SIZE)]
+        labels, _ = assign(batch, centers)
+        sums, counts = center_sums(batch, labels, len(centers))
+        hit = counts > 0
+        seen[hit] += counts[hit]
+        old = centers.copy()
+        centers[hit] += (sums[hit] - counts[hit, None] * centers[hit]) / seen[hit, None]
+        if np.abs(centers - old).max() <= TOLERANCE:
+            break
+    labels, dist = assign(x, centers)
+    return centers, labels, float(dist.sum()), step
+
+
+class Clustering:
+    def __init__(self, matrix, subjects, k=DEFAULT_K, seed=0):
+        self.subjects = list(subjects)
+        x, self.fill = impute(matrix)
+        self.n_rows = len(x)
+        self.k = max(1, min(k, self.n_rows))
+        self.mini_batch = self.n_rows > MINI_BATCH_ROWS
+        rng = np.random.default_rng(seed)
+        sample = x if len(x) <= INIT_SAMPLE else x[rng.choice(len(x), INIT_SAMPLE, replace=False)]
+
+        if self.n_rows == 0 or not self.subjects:
+            self.centers = np.zeros((0, len(self.subjects)))
+            self.labels = np.zeros(self.n_rows, dtype=np.int64)
+            self.inertia, self.iterations, self.k = 0.0, 0, 0
+        elif self.mini_batch:
+            fit = mini_batch(x, seed_centers(sample, self.k, rng), rng)
+            self.centers, self.labels, self.inertia, self.iterations = fit
+        else:
+            runs = [lloyd(x, seed_centers(sample, self.k, rng)) for _ in range(N_INIT)]
+            self.centers, self.labels, self.inertia, self.iterations = min(runs, key=lambda r: r[2])
+
+        # strongest profile first
+        order = np.argsort(-self.centers.mean(axis=1), kind='stable') if self.k else np.zeros(0, int)
+        self.centers = self.centers[order]
+        remap = np.empty(len(order), dtype=np.int64)
+        remap[order] = np.arange(len(order))
+        self.labels = remap[self.labels] if self.k else self.labels
+        self.sizes = np.bincount(self.labels, minlength=self.k) if self.k else np.zeros(0, int)
+
+        # class-wide spread per subject, for naming profiles and the projection
+        self.subject_mean = x.mean(axis=0) if self.n_rows else self.fill
+        self.subject_std = x.std(axis=0) if self.n_rows else np.ones(len(self.subjects))
+        self._x = x
+        self._tags = None
+
+    def __len__(self):
+        return self.k
+
+    def predict(self, matrix):
+        # cluster of new students (same imputation as the fit)
+        x, _ = impute(matrix, self.fill)
+        return assign(x, self.centers)[0] if self.k else np.zeros(len(x), dtype=np.int64)
+
+    def names(self):
+        # "B level · strong CS101 · weak MATH": level of the center, then the subjects
+        # it sits furthest above / below its own level, relative to the class
+        out = []
+        spread = np.where(self.subject_std > 0, self.subject_std, 1.0)
+        for center in self.centers:
+            letter = BAND_LETTERS[int(np.argmax(grade_bands(np.array([center.mean()]))))]
+            z = (center - self.subject_mean) / spread
+            rel = z - z.mean()
+            parts = [f"{letter} level"]
+            if len(rel) > 1 and rel.max() >= STANDOUT:
+                parts.append(f"strong {self.subjects[int(rel.argmax())]}")
+            if len(rel) > 1 and rel.min() <= -STANDOUT:
+                parts.append(f"weak {self.subjects[int(rel.argmin())]}")
+            if len(parts) == 1:
+                parts.append("even")
+            out.append(" · ".join(parts))
+        return out
+
+    def row_tags(self):
+        # Treeview tag per student ('cluster0', ...), built once
+        if self._tags is None:
+            names = np.array([f'cluster{c}' for c in range(max(self.k, 1))], dtype=object)
+            self._tags = names[self.labels]
+        return self._tags
+
+    def projection(self):
+        # first two principal components of the (imputed) grades -> (points, centers)
+        x = self._x
+        if self.n_rows == 0:
+            return np.zeros((0, 2)), np.zeros((self.k, 2))
+        centered = x - self.subject_mean
+        cov = centered.T @ centered / max(len(x) - 1, 1)
+        values, vectors = np.linalg.eigh(cov)
+        axes = vectors[:, np.argsort(values)[::-1][:2]]
+        if axes.shape[1] < 2:
+            axes = np.column_stack([axes, np.zeros(len(axes))])
+        return centered @ axes, (self.centers - self.subject_mean) @ axes
+
+
+def cluster_tags(k):
+    return {f'cluster{i}': CLUSTER_COLORS[i % len(CLUSTER_COLORS)] for i in range(k)}
+
+
+def cluster_text(clustering, averages, pass_mark):
+    if not len(clustering):
+        return "\nNo students to cluster.\n"
+    names = clustering.names()
+    mode = (f"mini-batch, {clustering.iterations} batches of {BATCH_SIZE}" if clustering.mini_batch
+            else f"{clustering.iterations} iterations")
+    lines = ["PERFORMANCE PROFILES (k-means)", "=" * 70,
+             f"{clustering.n_rows:,} students, {len(clustering)} clusters ({mode}), "
+             f"inertia {clustering.inertia:,.0f}", ""]
+    header = f"{'#':<3}{'Profile':<34}{'Students':>9}{'Share':>7}{'Avg':>7}{'Pass %':>8}"
+    lines += [header, "-" * len(header)]
+    for c, name in enumerate(names):
+        members = clustering.labels == c
+        avg = averages[members]
+        avg = avg[~np.isnan(avg)]
+        mean = f"{avg.mean():.1f}" if len(avg) else "-"
+        rate = f"{100.0 * np.mean(avg >= pass_mark):.1f}" if len(avg) else "-"
+        lines.append(f"{c + 1:<3}{name[:33]:<34}{clustering.sizes[c]:>9}"
+                     f"{100.0 * clustering.sizes[c] / clustering.n_rows:>6.1f}%{mean:>7}{rate:>8}")
+
+    lines += ["", "Cluster centers (missing grades filled with the subject mean)", ""]
+    lines.append(f"{'#':<3}" + "".join(f"{s[:9]:>10}" for s in clustering.subjects))
+    for c, center in enumerate(clustering.centers):
+        lines.append(f"{c + 1:<3}" + "".join(f"{v:>10.1f}" for v in center))
+    lines.append(f"{'all':<3}" + "".join(f"{v:>10.1f}" for v in clustering.subject_mean))
+    return "\n".join(lines)
+
+
+def cluster_figure(clustering, figsize=(6, 4.5), seed=0):
+    # left: students on the first two principal components, colored by cluster;
+    # right: each cluster's center across subjects
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize, dpi=100)
+    ax_map, ax_profile = fig.subplots(1, 2)
+    points, centers = clustering.projection()
+    shown = np.arange(len(points))
+    if len(shown) > PLOT_POINTS:
+        shown = np.sort(np.random.default_rng(seed).choice(len(points), PLOT_POINTS, replace=False))
+    colors = np.array(MARKER_COLORS)[clustering.labels[shown] % len(MARKER_COLORS)]
+    ax_map.scatter(points[shown, 0], points[shown, 1], c=colors, s=8, alpha=0.6, linewidths=0)
+    ax_map.scatter(centers[:, 0], centers[:, 1], c=[MARKER_COLORS[i % len(MARKER_COLORS)]
+                                                     for i in range(len(centers))],
+                   marker='X', s=120, edgecolors='black')
+    ax_map.set_title('Students (PCA)', fontsize=11, fontweight='bold')
+    ax_map.set_xticks([])
+    ax_map.set_yticks([])
+
+    x = np.arange(len(clustering.subjects))
+    for c, center in enumerate(clustering.centers):
+        ax_profile.plot(x, center, marker='o', color=MARKER_COLORS[c % len(MARKER_COLORS)],
+                        label=f'{c + 1} ({clustering.sizes[c]})')
+    ax_profile.plot(x, clustering.subject_mean, color='black', linestyle='--', linewidth=1, label='all')
+    ax_profile.set_xticks(x)
+    ax_profile.set_xticklabels([s[:8] for s in clustering.subjects], rotation=45, ha='right', fontsize=8)
+    ax_profile.set_title('Cluster centers', fontsize=11, fontweight='bold')
+    ax_profile.legend(fontsize=7)
+    ax_profile.grid(alpha=0.3)
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+from grading import PASS_MARK, GPA_POINTS, gpa_codes, passed
+
+
+# ==============================================================================
+# COMPACT GRADEBOOK (opt-in)
+# A loaded CSV keeps grades as int64/float64 (8 bytes each) and names as Python
+# strings. For big rosters we store instead:
+#   * grades: uint8 per cell when every score is a whole number 0-255,
+#     float32 otherwise
+#   * missing cells: one bit per cell (np.packbits), not a NaN float
+#   * names: dictionary encoded (unique names + small integer code per student)
+#   * Status: one bool per student, GPA: one uint8 code into GPA_POINTS
+# The stats/chart code reads columns out of here as small float arrays, and the
+# viewer keeps only the text columns (roster()) as a pandas frame: this is the
+# one copy of the grades.
+# ==============================================================================
+class CompactGradebook:
+    def __init__(self, df, subjects=None, name_col=None, pass_mark=PASS_MARK):
+        if subjects is None:
+            subjects = df.select_dtypes(include=[np.number]).columns.tolist()
+        if name_col is None:
+            others = [c for c in df.columns if c not in subjects]
+            name_col = others[0] if others else None
+        self.subjects = list(subjects)
+        self.name_col = name_col
+        self.n_rows = len(df)
+        self.pass_mark = pass_mark
+
+        values = df[self.subjects].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        missing = np.isnan(values)
+        self.missing_bits = np.packbits(missing, axis=0)  # shape (ceil(rows/8), subjects)
+
+        filled = np.where(missing, 0, values)
+        whole = np.all(filled == np.round(filled)) and filled.min(initial=0) >= 0 and filled.max(initial=0) <= 255
+        self.grades = filled.astype(np.uint8 if whole else np.float32)
+
+        if name_col is not None:
+            names = pd.Categorical(df[name_col])
+            self.name_categories = np.asarray(names.categories, dtype=object)
+            self.name_codes = names.codes.astype(smallest_int(len(self.name_categories)))
+        else:
+            self.name_categories = np.array([], dtype=object)
+            self.name_codes = np.full(self.n_rows, -1, dtype=np.int8)
+        # any other text columns (section, teacher...) are dictionary encoded as well
+        self.column_order = list(df.columns)
+        self.other_cols = {c: pd.Categorical(df[c]) for c in df.columns
+                           if c not in self.subjects and c != name_col}
+
+        averages = self.row_averages()
+        self.status = passed(averages, pass_mark)
+        self.gpa_code = gpa_codes(averages)
+
+    # ---- decoding ------------------------------------------------------------
+    def missing_mask(self, subject=None):
+        # one subject unpacks only its own column of bits
+        if subject is None:
+            return np.unpackbits(self.missing_bits, axis=0, count=self.n_rows).astype(bool)
+        j = self.subjects.index(subject)
+        return np.unpackbits(self.missing_bits[:, j], count=self.n_rows).astype(bool)
+
+    def matrix(self, subjects=None):
+        # float32 grade matrix with NaN for missing cells
+        if subjects is None:
+            subjects = self.subjects
+        cols = [self.subjects.index(s) for s in subjects]
+        out = self.grades[:, cols].astype(np.float32)
+        out[self.missing_mask()[:, cols]] = np.nan
+        return out
+
+    def column(self, subject):
+        # valid scores only, same as df[subject].dropna()
+        j = self.subjects.index(subject)
+        keep = ~self.missing_mask(subject)
+        return self.grades[keep, j].astype(np.float32)
+
+    def values(self, subject, rows=None):
+        # float32 scores of one subject with NaN for missing cells, all rows or `rows`
+        j = self.subjects.index(subject)
+        missing = self.missing_mask(subject)
+        if rows is None:
+            out = self.grades[:, j].astype(np.float32)
+        else:
+            out, missing = self.grades[rows, j].astype(np.float32), missing[rows]
+        out[missing] = np.nan
+        return out
+
+    def names(self):
+        out = np.full(self.n_rows, '', dtype=object)
+        valid = self.name_codes >= 0
+        out[valid] = self.name_categories[self.name_codes[valid]]
+        return out
+
+    def gpa(self):
+        return GPA_POINTS[self.gpa_code]
+
+    # ---- statistics straight from the compact arrays -------------------------
+    def counts(self):
+        return self.n_rows - self.missing_mask().sum(axis=0)
+
+    def column_sums(self):
+        totals = self.grades.sum(axis=0, dtype=np.float64)
+        return totals  # missing cells are stored as 0, so they add nothing
+
+    def column_means(self):
+        counts = self.counts()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(counts > 0, self.column_sums() / counts, np.nan)
+
+    def row_averages(self):
+        valid = (~self.missing_mask()).sum(axis=1)
+        totals = self.grades.sum(axis=1, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(valid > 0, totals / valid, np.nan)
+
+    def pass_counts(self):
+        n_pass = int(self.status.sum())
+        return n_pass, self.n_rows - n_pass
+
+    def roster(self):
+        # the text columns only (name, section, teacher ...), in file order
+        data = dict(self.other_cols)
+        if self.name_col is not None:
+            data[self.name_col] = pd.Categorical.from_codes(self.name_codes, self.name_categories)
+        return pd.DataFrame(data, index=pd.RangeIndex(self.n_rows),
+                            columns=[c for c in self.column_order if c in data])
+
+    def to_frame(self):
+        # pandas view using nullable small ints / float32 and a categorical name column
+        data = dict(self.other_cols)
+        if self.name_col is not None:
+            data[self.name_col] = pd.Categorical.from_codes(self.name_codes, self.name_categories)
+        missing = self.missing_mask()
+        for j, col in enumerate(self.subjects):
+            if self.grades.dtype == np.uint8:
+                data[col] = pd.arrays.IntegerArray(self.grades[:, j].copy(), missing[:, j].copy())
+            else:
+                data[col] = pd.arrays.FloatingArray(self.grades[:, j].copy(), missing[:, j].copy())
+        return pd.DataFrame(data)[self.column_order]
+
+    def nbytes(self):
+        return (self.grades.nbytes + self.missing_bits.nbytes + self.name_codes.nbytes
+                + self.status.nbytes + self.gpa_code.nbytes
+                + sum(len(str(n)) for n in self.name_categories)
+                + sum(c.codes.nbytes for c in self.other_cols.values()))
+
+
+def smallest_int(n_values):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_values < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
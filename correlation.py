@@ -0,0 +1,87 @@
+import numpy as np
+
+
+# ==============================================================================
+# SUBJECT CORRELATION
+# Pairwise covariance / correlation of every subject against every other in one
+# pass: a few matrix products over the grade matrix with missing cells zeroed
+# out, so there is no Python loop over subject pairs. Missing values are handled
+# "pairwise complete" (a pair of subjects only uses students that have both),
+# which is what DataFrame.corr()/cov() do.
+# ==============================================================================
+def pairwise_stats(matrix):
+    x = np.asarray(matrix, dtype=float)
+    valid = ~np.isnan(x)
+    m = valid.astype(float)
+    x0 = np.where(valid, x, 0.0)
+
+    n = m.T @ m                    # students having both subjects
+    sx = x0.T @ m                  # sum of subject i over those students
+    sy = sx.T
+    sxx = (x0 * x0).T @ m
+    syy = sxx.T
+    sxy = x0.T @ x0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cross = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        cov = np.where(n > 1, cross / (n - 1), np.nan)
+        corr = cross / np.sqrt(var_x * var_y)
+    corr = np.where((n > 1) & (var_x > 0) & (var_y > 0), corr, np.nan)
+    return np.clip(corr, -1.0, 1.0), cov, n.astype(np.int64)
+
+
+class CorrelationCache:
+    # one result per (data version, columns); a reload bumps the version
+    def __init__(self):
+        self.key = None
+        self.result = None
+
+    def get(self, version, columns, matrix_fn):
+        key = (version, tuple(columns))
+        if key != self.key:
+            corr, cov, counts = pairwise_stats(matrix_fn())
+            self.result = {'columns': list(columns), 'corr': corr, 'cov': cov, 'counts': counts}
+            self.key = key
+        return self.result
+
+
+def draw_heatmap(fig, values, labels, title, symmetric=True, annotate_limit=12):
+    # one imshow artist for the whole matrix, text labels only while they are readable
+    ax = fig.add_subplot(111)
+    if symmetric:
+        vmax = np.nanmax(np.abs(values)) if np.isfinite(values).any() else 1.0
+        image = ax.imshow(values, cmap='RdBu_r', vmin=-vmax, vmax=vmax, interpolation='nearest')
+    else:
+        image = ax.imshow(values, cmap='viridis', interpolation='nearest')
+    fig.colorbar(image, ax=ax, fraction=0.046, pad=0.04)
+
+    k = len(labels)
+    if k <= 40:
+        short = [c[:10] + '...' if len(c) > 10 else c for c in labels]
+        ax.set_xticks(np.arange(k))
+        ax.set_yticks(np.arange(k))
+        ax.set_xticklabels(short, rotation=45, ha='right')
+        ax.set_yticklabels(short)
+    else:
+        ax.set_xticks([])
+        ax.set_yticks([])
+    if k <= annotate_limit:
+        for i in range(k):
+            for j in range(k):
+                if not np.isnan(values[i, j]):
+                    ax.text(j, i, f'{values[i, j]:.2f}', ha='center', va='center', fontsize=8)
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    return ax
+
+
+def correlation_figure(result, kind='corr', figsize=(6, 4.5)):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize, dpi=100)
+    if kind == 'cov':
+        draw_heatmap(fig, result['cov'], result['columns'], 'Subject Covariance', symmetric=False)
+    else:
+        draw_heatmap(fig, result['corr'], result['columns'], 'Subject Correlation')
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,225 @@
+import numpy as np
+
+from grading import PASS_MARK, GPA_POINTS, gpa_codes, passed
+from standing import rank_column
+
+
+# ==============================================================================
+# WHAT-IF CURVING
+# "What if I add 5 points to MATH?" without touching the loaded data:
+#   * curves are kept per subject as a list of (kind, amount) steps
+#   * the base grade matrix is only read - a curved subject is one new column,
+#     every other subject is still the base column
+#   * with plain averages only the curved columns are re-summed: the base row
+#     sums/counts are computed once and the curve's difference is added to them
+#     (weighted schemes need the whole curved matrix and build it)
+# so trying another curve costs O(students x curved subjects), not a reload.
+# ==============================================================================
+CURVES = ('add', 'scale', 'sqrt', 'clip')
+CURVE_HELP = {
+    'add': "add N points",
+    'scale': "scale so the top score becomes N",
+    'sqrt': "square-root curve: 10 x sqrt(score)",
+    'clip': "cap scores at N",
+}
+MOVERS = 10
+
+
+def apply_curve(values, kind, amount=None):
+    # one curve step on a column of grades (NaN stays NaN)
+    x = np.asarray(values, dtype=float)
+    if kind == 'add':
+        return x + amount
+    if kind == 'scale':
+        top = np.nanmax(x) if np.any(~np.isnan(x)) else np.nan
+        return x * (amount / top) if top and not np.isnan(top) else x.copy()
+    if kind == 'sqrt':
+        return 10.0 * np.sqrt(np.clip(x, 0, None))
+    if kind == 'clip':
+        return np.clip(x, 0, amount)
+    raise ValueError(f"unknown curve: {kind}")
+
+
+def describe_curve(kind, amount=None):
+    if kind == 'add':
+        return f"{amount:+g} points"
+    if kind == 'scale':
+        return f"scale max to {amount:g}"
+    if kind == 'sqrt':
+        return "10·√x"
+    return f"cap at {amount:g}"
+
+
+class WhatIf:
+    def __init__(self, matrix, subjects, base_averages, weights=None, pass_mark=PASS_MARK):
+        self.base = np.asarray(matrix, dtype=float)   # read only, never modified
+        self.subjects = list(subjects)
+        self.base_averages = np.asarray(base_averages, dtype=float)
+        self.weights = weights
+        self.pass_mark = pass_mark
+        self.curves = {}      # subject -> [(kind, amount), ...]
+        self._columns = {}    # subject -> (curve steps, curved column)
+        self._base_sums = None
+        self._base_ranks = None
+
+    # ---- curves --------------------------------------------------------------
+    def add(self, subject, kind, amount=None):
+        if kind not in CURVES:
+            raise ValueError(f"unknown curve: {kind}")
+        if kind != 'sqrt' and amount is None:
+            raise ValueError(f"'{kind}' needs an amount")
+        self.curves.setdefault(subject, []).append((kind, amount))
+
+    def reset(self, subject=None):
+        if subject is None:
+            self.curves.clear()
+        else:
+            self.curves.pop(subject, None)
+
+    def column(self, subject):
+        # curved grades of one subject (the base column itself if it has no curve)
+        j = self.subjects.index(subject)
+        steps = tuple(self.curves.get(subject, ()))
+        if not steps:
+            return self.base[:, j]
+        cached = self._columns.get(subject)
+        if cached is not None and cached[0] == steps:
+            return cached[1]
+        values = self.base[:, j]
+        for kind, amount in steps:
+            values = apply_curve(values, kind, amount)
+        self._columns[subject] = (steps, values)
+        return values
+
+    def curved_subjects(self):
+        return [s for s in self.subjects if self.curves.get(s)]
+
+    # ---- derived -------------------------------------------------------------
+    def averages(self):
+        curved = self.curved_subjects()
+        if not curved:
+            return self.base_averages
+        if self.weights is not None:
+            x = self.base.copy()
+            for s in curved:
+                x[:, self.subjects.index(s)] = self.column(s)
+            return self.weights.averages(x, self.subjects)
+        if self._base_sums is None:
+            valid = ~np.isnan(self.base)
+            self._base_sums = (np.where(valid, self.base, 0.0).sum(axis=1), valid.sum(axis=1))
+        sums, counts = self._base_sums
+        sums = sums.copy()
+        for s in curved:
+            # curves keep missing grades missing, so the counts don't change
+            diff = self.column(s) - self.base[:, self.subjects.index(s)]
+            sums += np.where(np.isnan(diff), 0.0, diff)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+    def summary(self):
+        # before/after numbers for the what-if report and charts
+        before, after = self.base_averages, self.averages()
+        if self._base_ranks is None:
+            self._base_ranks = rank_column(before)[0]
+        ranks = rank_column(after)[0]
+
+        subjects = []
+        for s in self.subjects:
+            old, new = self.base[:, self.subjects.index(s)], self.column(s)
+            subjects.append({
+                'subject': s,
+                'curve': ", ".join(describe_curve(k, a) for k, a in self.curves.get(s, ())),
+                'mean': (nanmean(old), nanmean(new)),
+                'pass_rate': (pass_rate(old, self.pass_mark), pass_rate(new, self.pass_mark)),
+            })
+
+        moved = np.where(np.isnan(ranks) | np.isnan(self._base_ranks), 0, self._base_ranks - ranks)
+        order = np.argsort(-moved, kind='stable')[:MOVERS]
+        top = np.argsort(np.where(np.isnan(ranks), np.inf, ranks), kind='stable')[:MOVERS]
+        return {
+            'subjects': subjects,
+            'pass_rate': (pass_rate(before, self.pass_mark), pass_rate(after, self.pass_mark)),
+            'mean': (nanmean(before), nanmean(after)),
+            'gpa': (gpa_distribution(before), gpa_distribution(after)),
+            'top': top, 'ranks': ranks, 'base_ranks': self._base_ranks, 'averages': after,
+            'movers': order[moved[order] > 0],
+        }
+
+
+def nanmean(x):
+    x = x[~np.isnan(x)]
+    return x.mean() if len(x) else np.nan
+
+
+def pass_rate(x, pass_mark=PASS_MARK):
+    n = int(np.sum(~np.isnan(x)))
+    return 100.0 * np.sum(passed(x, pass_mark)) / n if n else 0.0
+
+
+def gpa_distribution(averages):
+    # students per GPA value (GPA_POINTS order)
+    return np.bincount(gpa_codes(averages), minlength=len(GPA_POINTS))
+
+
+def whatif_text(summary, names):
+    lines = ["WHAT-IF CURVE", "=" * 60, ""]
+    b, a = summary['pass_rate']
+    mb, ma = summary['mean']
+    lines.append(f"Class average:  {mb:6.2f} -> {ma:6.2f}  ({ma - mb:+.2f})")
+    lines.append(f"Pass rate:      {b:5.1f}% -> {a:5.1f}%  ({a - b:+.1f}%)")
+    lines += ["", f"{'Subject':<14}{'Curve':<24}{'Mean':>16}{'Pass %':>16}", "-" * 70]
+    for s in summary['subjects']:
+        (m0, m1), (p0, p1) = s['mean'], s['pass_rate']
+        lines.append(f"{s['subject'][:13]:<14}{(s['curve'] or '-')[:23]:<24}"
+                     f"{m0:>7.1f} -> {m1:<6.1f}{p0:>7.1f} -> {p1:<6.1f}")
+
+    g0, g1 = summary['gpa']
+    lines += ["", "GPA distribution (students)", "-" * 40]
+    for points, n0, n1 in zip(GPA_POINTS, g0, g1):
+        if n0 or n1:
+            lines.append(f"  {points:.1f}: {n0:6d} -> {n1:<6d} ({n1 - n0:+d})")
+
+    ranks, base_ranks, avgs = summary['ranks'], summary['base_ranks'], summary['averages']
+    lines += ["", f"Top {len(summary['top'])} after the curve", "-" * 40]
+    for i in summary['top']:
+        if np.isnan(ranks[i]):
+            break
+        lines.append(f"  {int(ranks[i]):3d}. {str(names[i])[:24]:<24} {avgs[i]:6.2f}"
+                     f"  (was #{int(base_ranks[i])})")
+    if len(summary['movers']):
+        lines += ["", "Biggest climbers", "-" * 40]
+        for i in summary['movers']:
+            lines.append(f"  {str(names[i])[:24]:<24} #{int(base_ranks[i])} -> #{int(ranks[i])}")
+    return "\n".join(lines)
+
+
+def whatif_figure(whatif, summary, figsize=(6, 4.5)):
+    # left: before/after histogram of each curved subject (or the averages),
+    # right: GPA distribution before/after
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize, dpi=100)
+    ax_hist, ax_gpa = fig.subplots(1, 2)
+    curved = whatif.curved_subjects()
+    if curved:
+        s = curved[-1]
+        old, new, label = whatif.base[:, whatif.subjects.index(s)], whatif.column(s), s
+    else:
+        old, new, label = whatif.base_averages, summary['averages'], 'Average'
+    old, new = old[~np.isnan(old)], new[~np.isnan(new)]
+    hi = max(100.0, new.max() if len(new) else 100.0, old.max() if len(old) else 100.0)
+    bins = np.linspace(0, hi, 21)
+    ax_hist.hist(old, bins=bins, color='#bdc3c7', label='before')
+    ax_hist.hist(new, bins=bins, color='#3498db', alpha=0.6, label='after')
+    ax_hist.axvline(whatif.pass_mark, color='red', linestyle='--', linewidth=1)
+    ax_hist.set_title(label, fontsize=11, fontweight='bold')
+    ax_hist.legend(fontsize=8)
+
+    g0, g1 = summary['gpa']
+    x = np.arange(len(GPA_POINTS))
+    ax_gpa.bar(x - 0.2, g0, 0.4, color='#bdc3c7', label='before')
+    ax_gpa.bar(x + 0.2, g1, 0.4, color='#3498db', label='after')
+    ax_gpa.set_xticks(x)
+    ax_gpa.set_xticklabels([f'{p:.1f}' for p in GPA_POINTS], rotation=90, fontsize=7)
+    ax_gpa.set_title('GPA', fontsize=11, fontweight='bold')
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,96 @@
+import io
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+
+from grading import PASS_MARK
+from binning import histogram_edges
+
+
+# ==============================================================================
+# SMALL-MULTIPLES DASHBOARD
+# One panel per subject (histogram | box plot | pass/fail pie), rendered
+# off-screen with Agg in a pool of worker processes and handed back as PNG
+# bytes. Each subject is an independent job, so 100 subjects spread over all
+# cores instead of being drawn one after another in the GUI thread; the GUI
+# only turns the finished PNGs into images as they arrive.
+# ==============================================================================
+PANEL_SIZE = (540, 170)   # pixels
+PANEL_DPI = 80
+SERIAL_BELOW = 4          # fewer panels than this aren't worth the process hop
+
+
+def render_panel(subject, values, pass_mark=PASS_MARK, size=PANEL_SIZE, dpi=PANEL_DPI):
+    # runs in a worker process: only plain arrays in, PNG bytes out
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    data = np.asarray(values, dtype=float)
+    data = data[~np.isnan(data)]
+
+    fig = Figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax_hist, ax_box, ax_pie = fig.subplots(1, 3, gridspec_kw={'width_ratios': [2, 1, 1]})
+    fig.suptitle(str(subject), fontsize=10, fontweight='bold')
+
+    if len(data):
+        ax_hist.hist(data, bins=histogram_edges(data), color='#5DADE2', edgecolor='slategrey')
+        ax_hist.axvline(data.mean(), color='red', linestyle='--', linewidth=1.2)
+        ax_box.boxplot(data, widths=0.6, patch_artist=True,
+                       boxprops=dict(facecolor='#AED6F1', color='slategrey'),
+                       medianprops=dict(color='#2E86C1', linewidth=2))
+        passed = int(np.sum(data >= pass_mark))
+        ax_pie.pie([passed, len(data) - passed], colors=['#5DADE2', '#E74C3C'],
+                   autopct='%1.0f%%', startangle=90, textprops={'fontsize': 7})
+    else:
+        ax_hist.text(0.5, 0.5, "No grades", ha='center', va='center', transform=ax_hist.transAxes)
+
+    for ax in (ax_hist, ax_box):
+        ax.tick_params(labelsize=7)
+    ax_box.set_xticks([])
+    ax_pie.set_title(f'pass ≥ {pass_mark:g}', fontsize=8)
+    # fixed margins: tight_layout would cost more than drawing the panel
+    fig.subplots_adjust(left=0.06, right=0.98, bottom=0.14, top=0.82, wspace=0.25)
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')
+    return subject, buf.getvalue()
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+class DashboardRenderer:
+    # keeps one process pool alive between refreshes (starting it is the slow part)
+    def __init__(self, workers=None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.pool = None
+
+    def executor(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self.pool
+
+    def submit(self, matrix, subjects, pass_mark=PASS_MARK, size=PANEL_SIZE, dpi=PANEL_DPI):
+        # one future per subject, in subject order
+        x = np.asarray(matrix, dtype=float)
+        if len(subjects) < SERIAL_BELOW:
+            futures = []
+            for j, subject in enumerate(subjects):
+                future = Future()
+                future.set_result(render_panel(subject, x[:, j], pass_mark, size, dpi))
+                futures.append(future)
+            return futures
+        pool = self.executor()
+        return [pool.submit(render_panel, subject, x[:, j].copy(), pass_mark, size, dpi)
+                for j, subject in enumerate(subjects)]
+
+    def render(self, matrix, subjects, **kwargs):
+        return [f.result() for f in self.submit(matrix, subjects, **kwargs)]
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
@@ -1,27 +1,45 @@
 import matplotlib.pyplot as plt
+from matplotlib.widgets import Slider
 import pandas as pd
+from thresholds import ThresholdIndex
 df = pd.read_csv("project.csv")
-
+subject = 'SSC1'
 
 grades = [100,90,70, 50, 40, 25,0]
-cumulative_counts = {}
-for grade in grades:
-    count = len(df[df['SSC1'] >= grade])
-    cumulative_counts[f'{grade}+'] = count
+# sort the column once, every threshold after that is a binary search
+index = ThresholdIndex(df, [subject])
+cumulative_counts = index.cumulative_counts(subject, grades)
 
 
-plt.figure(figsize=(10, 6))
+fig, (ax, ax_pie) = plt.subplots(1, 2, figsize=(12, 6), gridspec_kw={'width_ratios': [3, 2]})
+fig.subplots_adjust(bottom=0.25)
 categories = list(cumulative_counts.keys())
 counts = list(cumulative_counts.values())
 
 
 
-plt.bar(categories, counts, align='center', color="blue", edgecolor='red', linewidth=3)
-plt.xticks(categories, categories, rotation=90)
-plt.xlabel('Grade Threshold', fontsize=12, fontweight='bold')
-plt.ylabel('Number of Students', fontsize=12, fontweight='bold')
-plt.title('Cumulative Student Grade Distribution (CS102)', fontsize=14)
-plt.tight_layout()
-plt.show()
+bars = ax.bar(categories, counts, align='center', color="blue", edgecolor='red', linewidth=3)
+ax.set_xticks(range(len(categories)), categories, rotation=90)
+ax.set_xlabel('Grade Threshold', fontsize=12, fontweight='bold')
+ax.set_ylabel('Number of Students', fontsize=12, fontweight='bold')
+ax.set_title(f'Cumulative Student Grade Distribution ({subject})', fontsize=14)
 
+# pass mark slider: recolors the thresholds that count as passing and redraws the pie
+slider_ax = fig.add_axes([0.15, 0.08, 0.7, 0.04])
+pass_slider = Slider(slider_ax, 'Pass mark', 0, 100, valinit=50, valstep=1)
 
+def update_pass_mark(pass_mark):
+    for bar, grade in zip(bars, grades):
+        bar.set_color("blue" if grade >= pass_mark else "lightgrey")
+        bar.set_edgecolor('red')
+    passed, failed = index.pass_fail(subject, pass_mark)
+    ax_pie.clear()
+    if passed + failed > 0:
+        ax_pie.pie([passed, failed], labels=[f'Pass ({passed})', f'Fail ({failed})'],
+                   colors=['#5DADE2', '#D5D8DC'], autopct='%1.1f%%', startangle=90)
+    ax_pie.set_title(f'Pass Rate at {pass_mark:.0f}+')
+    fig.canvas.draw_idle()
+
+pass_slider.on_changed(update_pass_mark)
+update_pass_mark(pass_slider.val)
+plt.show()
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+
+# ==============================================================================
+# FORMATTED COLUMN STORE
+# The table used to format every cell in a Python double loop on every redraw.
+# Here each column is converted to text ONCE with bulk NumPy/pandas conversion
+# (NaN -> "") and kept as a string array. Redraws, filters and sorts only pick
+# rows out of those arrays by position, they never format a value again.
+# Columns given as `numbers` (the compact store's grades) are the exception:
+# they keep no text at all and are formatted for the rows being shown.
+# ==============================================================================
+class FormattedColumns:
+    def __init__(self, df, numeric_cols=None, float_format='%.1f', columns=None, numbers=None):
+        # float_format=None keeps plain str() text for numbers too;
+        # numbers = {column: fn(positions) -> float values} for columns not in df,
+        # columns = the order of df's and those columns together
+        if numeric_cols is None:
+            numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        self.numeric_cols = list(numeric_cols)
+        self.float_format = float_format
+        self.index = df.index
+        self.columns = list(df.columns) if columns is None else list(columns)
+        self.numbers = dict(numbers or {})
+        self.text = {}
+        for col in self.columns:
+            if col in self.numbers:
+                continue
+            if col in numeric_cols and float_format is not None:
+                self.text[col] = format_numbers(df[col], float_format)
+            else:
+                self.text[col] = format_strings(df[col])
+
+    def append(self, frame):
+        # rows added at the end: only they get formatted
+        extra = FormattedColumns(frame, self.numeric_cols, self.float_format)
+        for col in self.columns:
+            if col in self.numbers:
+                continue
+            # computed columns (set_column) stay blank until they're set again
+            new = extra.text[col] if col in extra.text else np.full(len(frame), '')
+            self.text[col] = np.concatenate([self.text[col], new])
+        self.index = self.index.append(frame.index)
+
+    def set_column(self, col, values, float_format=None):
+        # (re)format one computed column, e.g. the Rank/Percentile standing
+        self.text[col] = format_numbers(pd.Series(values), float_format or self.float_format)
+        if col not in self.columns:
+            self.columns.append(col)
+
+    def __len__(self):
+        return len(self.index)
+
+    def positions_for(self, frame):
+        # row positions of a filtered/sorted view of the same frame, None if it isn't one
+        positions = self.index.get_indexer(frame.index)
+        if (positions < 0).any() or any(c not in self.text and c not in self.numbers for c in frame.columns):
+            return None
+        return positions
+
+    def rows(self, positions=None, columns=None):
+        if columns is None:
+            columns = self.columns
+        if positions is None:
+            positions = np.arange(len(self.index))
+        if len(columns) == 0 or len(positions) == 0:
+            return []
+        block = np.empty((len(positions), len(columns)), dtype=object)
+        for j, col in enumerate(columns):
+            block[:, j] = self.column_text(col, positions)
+        return block.tolist()
+
+    def column_text(self, col, positions):
+        if col in self.text:
+            return self.text[col][positions]
+        spec = self.float_format if col in self.numeric_cols and self.float_format else '%g'
+        return format_numbers(pd.Series(self.numbers[col](positions)), spec)
+
+    def search(self, positions, text, columns=None):
+        # which of `positions` show `text` in any column (case-insensitive substring)
+        hit = np.zeros(len(positions), dtype=bool)
+        for col in self.columns if columns is None else columns:
+            cells = pd.Series(self.column_text(col, positions), dtype=object)
+            hit |= cells.str.lower().str.contains(text, regex=False, na=False).to_numpy(dtype=bool)
+        return hit
+
+    def rows_for(self, frame):
+        positions = self.positions_for(frame)
+        if positions is None:
+            # not a view of this frame, format it on its own
+            return FormattedColumns(frame).rows()
+        return self.rows(positions, list(frame.columns))
+
+
+def format_numbers(series, float_format='%.1f'):
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    missing = np.isnan(values)
+    text = np.char.mod(float_format, np.where(missing, 0.0, values))
+    return np.where(missing, '', text)
+
+
+def format_strings(series):
+    missing = series.isna().to_numpy()
+    text = series.astype(str).to_numpy(dtype=str)
+    return np.where(missing, '', text)
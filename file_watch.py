@@ -0,0 +1,83 @@
+import hashlib
+import io
+import os
+
+import pandas as pd
+
+
+# ==============================================================================
+# LIVE FILE WATCH (tail ingestion)
+# The LMS keeps appending rows to the exported CSV. Instead of re-reading the
+# whole file we remember how many bytes we've already turned into rows:
+#   * poll() is just an os.stat() while nothing changes
+#   * when the file grew, only the new byte range is read and parsed
+#     (a half-written last line waits for the next poll)
+#   * if the bytes we had already read are different (file rewritten, edited
+#     in Excel, truncated) the caller is told to do a full reload instead
+# Checking "are the old bytes the same" hashes a small block at the start and
+# one just before the old end, not the whole file.
+# ==============================================================================
+CHECK_BYTES = 4096
+
+
+class TailReader:
+    def __init__(self, path, read_kwargs=None):
+        self.path = path
+        self.read_kwargs = dict(read_kwargs or {})
+        self.columns = []                   # the file's own header
+        self.offset = 0                     # bytes already turned into rows
+        self.signature = None               # (size, mtime) at the last poll
+        self.fingerprint = None
+        self.mark()
+
+    def mark(self):
+        # remember the file as it is now (after a full load / reload)
+        st = os.stat(self.path)
+        self.columns = list(pd.read_csv(self.path, nrows=0, **self.read_kwargs).columns)
+        # everything up to here was loaded, including a last line without a newline
+        # (a writer appending to it starts with the missing newline -> blank line)
+        self.offset = st.st_size
+        self.signature = (st.st_size, st.st_mtime_ns)
+        self.fingerprint = self._fingerprint(self.offset)
+
+    def _fingerprint(self, offset):
+        with open(self.path, 'rb') as f:
+            head = f.read(min(CHECK_BYTES, offset))
+            f.seek(max(0, offset - CHECK_BYTES))
+            tail = f.read(min(CHECK_BYTES, offset))
+        return hashlib.blake2b(head + b'|' + tail, digest_size=16).digest()
+
+    def poll(self):
+        # -> ('same', None) / ('append', new rows DataFrame) / ('reload', None)
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return 'same', None   # being replaced right now, try again next poll
+        signature = (st.st_size, st.st_mtime_ns)
+        if signature == self.signature:
+            return 'same', None
+        self.signature = signature
+
+        if st.st_size < self.offset or self._fingerprint(self.offset) != self.fingerprint:
+            return 'reload', None
+        if st.st_size == self.offset:
+            return 'same', None   # touched, nothing new
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read(st.st_size - self.offset)
+        complete = chunk.rfind(b'\n') + 1
+        if complete == 0:
+            return 'same', None   # only a partial line so far
+        chunk = chunk[:complete]
+        if not chunk.strip():
+            self.offset += complete
+            self.fingerprint = self._fingerprint(self.offset)
+            return 'same', None
+
+        rows = pd.read_csv(io.BytesIO(chunk), header=None, names=self.columns,
+                           skip_blank_lines=True, **self.read_kwargs)
+        self.offset += complete
+        self.fingerprint = self._fingerprint(self.offset)
+        return 'append', rows
+
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+from grading import PASS_MARK, gpa_points, passed
+from gradebook_stats import row_averages
+
+
+# ==============================================================================
+# GRADEBOOK MODEL
+# One place that owns the grades and the columns derived from them:
+#   Total   <- every subject
+#   Average <- every subject + weights
+#   Status  <- Average + pass mark
+#   GPA     <- Average
+# Derived columns are computed the first time someone asks for them and kept
+# together with the versions of the inputs they were built from. Changing an
+# input (set_column / set_weights / set_pass_mark) bumps only that input's
+# version, so only its dependents are rebuilt on the next read - the table,
+# rankings, pie charts and GPA report all read the same cached arrays.
+# ==============================================================================
+DERIVED = ('Total', 'Average', 'Status', 'GPA')
+
+
+class GradebookModel:
+    def __init__(self, df, subjects=None, weights=None, pass_mark=PASS_MARK, matrix_fn=None,
+                 whole_grades=None):
+        self.df = df
+        if subjects is None:
+            subjects = df.select_dtypes(include=[np.number]).columns.tolist()
+        self.subjects = list(subjects)
+        self.weights = weights
+        self.pass_mark = pass_mark
+        # optional source for the grade matrix (e.g. the compact store, which then
+        # holds the grades instead of df); its dtype is kept, float32 stays float32
+        self.matrix_fn = matrix_fn
+        # whole-number grades keep whole-number totals; None reads it from df's dtypes
+        self.whole_grades = whole_grades
+        self.version = 0
+        self.input_versions = {name: 0 for name in self.subjects + ['weights', 'pass_mark']}
+        self._cache = {}
+        self.computed = 0   # how many times something was (re)built, handy for checks
+
+    # ---- inputs --------------------------------------------------------------
+    def set_column(self, col, values):
+        self.df[col] = values
+        self.touch(col)
+
+    def set_weights(self, weights):
+        self.weights = weights
+        self.touch('weights')
+
+    def set_pass_mark(self, pass_mark):
+        if pass_mark != self.pass_mark:
+            self.pass_mark = pass_mark
+            self.touch('pass_mark')
+
+    def touch(self, *inputs):
+        # an input changed in place: its dependents are stale from now on
+        for name in inputs:
+            if name in self.input_versions:
+                self.input_versions[name] += 1
+        self.version += 1
+
+    # ---- dependency graph ----------------------------------------------------
+    def depends_on(self, name):
+        if name in ('matrix', 'Total'):
+            return self.subjects
+        if name == 'Average':
+            return self.subjects + ['weights']
+        if name == 'Status':
+            return self.depends_on('Average') + ['pass_mark']
+        if name == 'GPA':
+            return self.depends_on('Average')
+        raise KeyError(name)
+
+    def stamp(self, name):
+        return tuple(self.input_versions[i] for i in self.depends_on(name))
+
+    def is_cached(self, name):
+        entry = self._cache.get(name)
+        return entry is not None and entry[0] == self.stamp(name)
+
+    def get(self, name):
+        if not self.is_cached(name):
+            self._cache[name] = (self.stamp(name), self._build(name))
+            self.computed += 1
+        return self._cache[name][1]
+
+    __getitem__ = get
+
+    def _build(self, name):
+        if name == 'matrix':
+            if self.matrix_fn is not None:
+                return np.asarray(self.matrix_fn())
+            return self.df[self.subjects].to_numpy(dtype=float, na_value=np.nan)
+        x = self.get('matrix')
+        if name == 'Total':
+            # missing grades count as 0, like df[subjects].sum(axis=1)
+            total = np.where(np.isnan(x), 0.0, x).sum(axis=1, dtype=float)
+            whole = self.whole_grades
+            if whole is None:
+                whole = all(pd.api.types.is_integer_dtype(self.df[c]) for c in self.subjects)
+            if self.subjects and whole:
+                total = total.astype(np.int64)   # whole-number grades keep whole-number totals
+            return total
+        if name == 'Average':
+            if self.weights is not None:
+                return self.weights.averages(x, self.subjects)
+            return row_averages(x)
+        if name == 'Status':
+            return np.where(passed(self.get('Average'), self.pass_mark), 'Pass', 'Fail')
+        if name == 'GPA':
+            return gpa_points(self.get('Average'))
+        raise KeyError(name)
+
+    def append(self, rows):
+        # new students at the end: every derived column is per student, so the
+        # cached arrays are extended with just the new rows instead of rebuilt
+        if self.matrix_fn is not None:
+            raise ValueError("can't append to a gradebook backed by matrix_fn")
+        extra = GradebookModel(rows, self.subjects, self.weights, self.pass_mark)
+        for name, (stamp, values) in list(self._cache.items()):
+            if stamp == self.stamp(name):
+                self._cache[name] = (stamp, np.concatenate([values, extra.get(name)]))
+        self.df = pd.concat([self.df, rows])
+        self.version += 1
+        return self.df
+
+    # ---- convenience ---------------------------------------------------------
+    def matrix(self):
+        return self.get('matrix')
+
+    def series(self, name):
+        return pd.Series(self.get(name), index=self.df.index, name=name)
+
+    def frame(self, columns=DERIVED):
+        # the data with the derived columns appended (for printing / export)
+        out = self.df.copy()
+        for name in columns:
+            out[name] = self.get(name)
+        return out
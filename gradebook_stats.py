@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+
+from grading import PASS_MARK, gpa_points
+
+
+# ==============================================================================
+# GRADEBOOK STATISTICS
+# The numbers behind the Overview / Assignments / Rankings tabs and the
+# pass/fail + GPA report of Database.py, as plain functions over a float grade
+# matrix (students x subjects, NaN = missing). The GUI formats them as text,
+# the stats server sends them as JSON - both get the same numbers.
+# ==============================================================================
+BAND_LETTERS = ('A', 'B', 'C', 'D', 'F')
+AT_RISK_AVERAGE = 60
+
+
+def grade_bands(values):
+    # A >= 90, B >= 80, C >= 70, D >= 60, F below
+    values = np.asarray(values, dtype=float)
+    return [
+        int(np.sum(values >= 90)),
+        int(np.sum((values >= 80) & (values < 90))),
+        int(np.sum((values >= 70) & (values < 80))),
+        int(np.sum((values >= 60) & (values < 70))),
+        int(np.sum(values < 60)),
+    ]
+
+
+def row_averages(matrix):
+    # NaN-aware per-student mean, same as df[cols].mean(axis=1)
+    x = np.asarray(matrix, dtype=float)
+    valid = ~np.isnan(x)
+    counts = valid.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(counts > 0, np.where(valid, x, 0).sum(axis=1) / counts, np.nan)
+
+
+def overview_stats(matrix, averages=None):
+    x = np.asarray(matrix, dtype=float)
+    grades = x[~np.isnan(x)]
+    if averages is None:
+        averages = row_averages(x)
+    averages = np.asarray(averages, dtype=float)
+    avgs = averages[~np.isnan(averages)]
+    total = len(grades)
+    bands = grade_bands(grades)
+    stats = {
+        'students': int(x.shape[0]),
+        'assignments': int(x.shape[1]) if x.ndim == 2 else 0,
+        'submissions': total,
+        'mean': float(grades.mean()) if total else float('nan'),
+        'median': float(np.median(grades)) if total else float('nan'),
+        'std': float(grades.std()) if total else float('nan'),   # population std (np.std)
+        'min': float(grades.min()) if total else float('nan'),
+        'max': float(grades.max()) if total else float('nan'),
+        'bands': dict(zip(BAND_LETTERS, bands)),
+        'pass_rate': (total - bands[4]) / total * 100 if total else float('nan'),
+        'student_mean': float(avgs.mean()) if len(avgs) else float('nan'),
+        'student_median': float(np.median(avgs)) if len(avgs) else float('nan'),
+        'student_min': float(avgs.min()) if len(avgs) else float('nan'),
+        'student_max': float(avgs.max()) if len(avgs) else float('nan'),
+        'at_risk': int(np.sum(averages < AT_RISK_AVERAGE)),
+    }
+    return stats
+
+
+def column_stats(values, n_students):
+    data = np.asarray(values, dtype=float)
+    data = data[~np.isnan(data)]
+    n = len(data)
+    if n == 0:
+        return None
+    q1, median, q3 = np.quantile(data, [0.25, 0.5, 0.75])
+    stats = {
+        'submissions': n,
+        'students': int(n_students),
+        'mean': float(data.mean()),
+        'median': float(median),
+        'std': float(data.std(ddof=1)) if n > 1 else float('nan'),   # sample std like Series.std()
+        'min': float(data.min()),
+        'max': float(data.max()),
+        'q1': float(q1),
+        'q3': float(q3),
+        'whole': bool(np.all(data == np.round(data))),   # lets histograms use whole-score bins
+        'bands': None,
+        'pass_rate': None,
+    }
+    # letter bands only make sense for percentage scores
+    if stats['max'] <= 100:
+        bands = grade_bands(data)
+        stats['bands'] = dict(zip(BAND_LETTERS, bands))
+        stats['pass_rate'] = (n - bands[4]) / n * 100
+    return stats
+
+
+def assignment_stats(matrix, columns):
+    x = np.asarray(matrix, dtype=float)
+    out = []
+    for j, col in enumerate(columns):
+        stats = column_stats(x[:, j], x.shape[0])
+        if stats is not None:
+            stats['index'] = j + 1
+            stats['column'] = col
+            out.append(stats)
+    return out
+
+
+def ranking_order(averages):
+    # best first, students without an average at the very end (like sort_values)
+    averages = np.asarray(averages, dtype=float)
+    keys = np.where(np.isnan(averages), np.inf, -averages)
+    return np.argsort(keys, kind='stable')
+
+
+def rankings(matrix, names, averages=None, k=10):
+    x = np.asarray(matrix, dtype=float)
+    if averages is None:
+        averages = row_averages(x)
+    averages = np.asarray(averages, dtype=float)
+    order = ranking_order(averages)
+
+    def entry(pos):
+        grades = x[pos]
+        return {'row': int(pos), 'name': str(names[pos]), 'average': float(averages[pos]),
+                'grades': [float(g) for g in grades[~np.isnan(grades)]]}
+
+    return {
+        'top': [entry(p) for p in order[:k]],
+        'bottom': [entry(p) for p in order[::-1][:k]],
+    }
+
+
+def pass_report(matrix, columns, averages=None, pass_mark=PASS_MARK):
+    # pass/fail by overall average and per subject (Database.py's console report)
+    x = np.asarray(matrix, dtype=float)
+    if averages is None:
+        averages = row_averages(x)
+    averages = np.asarray(averages, dtype=float)
+    total = len(averages)
+    passed = int(np.sum(averages >= pass_mark))
+    failed = int(np.sum(averages < pass_mark))
+    subjects = {}
+    for j, col in enumerate(columns):
+        s_pass = int(np.sum(x[:, j] >= pass_mark))
+        s_fail = int(np.sum(x[:, j] < pass_mark))
+        subjects[col] = {'passed': s_pass, 'failed': s_fail,
+                         'pass_rate': s_pass / total * 100 if total else float('nan')}
+    return {
+        'pass_mark': pass_mark,
+        'students': total,
+        'passed': passed,
+        'failed': failed,
+        'pass_rate': passed / total * 100 if total else float('nan'),
+        'subjects': subjects,
+    }
+
+
+def gpa_report(averages, names):
+    averages = np.asarray(averages, dtype=float)
+    points = gpa_points(averages)
+    values, counts = np.unique(points, return_counts=True)
+    return {
+        'students': [{'name': str(n), 'average': float(a), 'gpa': float(g)}
+                     for n, a, g in zip(names, averages, points)],
+        'distribution': {f'{v:.1f}': int(c) for v, c in zip(values, counts)},
+        'mean_gpa': float(points.mean()) if len(points) else float('nan'),
+    }
+
+
+def frame_parts(df, numeric_cols=None):
+    # (matrix, numeric columns, names) for a loaded DataFrame
+    if numeric_cols is None:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    matrix = df[numeric_cols].to_numpy(dtype=float, na_value=np.nan)
+    if len(df.columns) > 0:
+        names = df.iloc[:, 0].astype(str).to_numpy()
+    else:
+        names = pd.RangeIndex(len(df)).astype(str).to_numpy()
+    return matrix, numeric_cols, names
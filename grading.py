@@ -0,0 +1,32 @@
+import numpy as np
+
+
+# ==============================================================================
+# GRADING RULES
+# The pass mark and GPA scale the scripts have been using (see GPA() in
+# Database.py / prefinal.py), written as arrays so whole columns can be mapped
+# with one np.searchsorted instead of .apply() per student.
+# ==============================================================================
+PASS_MARK = 50
+
+# an average >= GPA_CUTOFFS[i] earns GPA_POINTS[i + 1]; below the first cutoff is 0.0
+GPA_CUTOFFS = np.array([50, 60, 70, 75, 80, 83, 85, 90, 93], dtype=float)
+GPA_POINTS = np.array([0.0, 2.0, 2.2, 2.5, 2.7, 3.0, 3.3, 3.5, 3.7, 4.0])
+
+
+def gpa_codes(averages):
+    # small integer code per student, GPA_POINTS[code] is the GPA
+    averages = np.asarray(averages, dtype=float)
+    codes = np.searchsorted(GPA_CUTOFFS, averages, side='right').astype(np.uint8)
+    # GPA() returns 0.0 for a missing average (every comparison is False)
+    codes[np.isnan(averages)] = 0
+    return codes
+
+
+def gpa_points(averages):
+    return GPA_POINTS[gpa_codes(averages)]
+
+
+def passed(averages, pass_mark=PASS_MARK):
+    # NaN compares False, so students without an average count as Fail like before
+    return np.asarray(averages, dtype=float) >= pass_mark
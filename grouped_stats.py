@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+
+from gradebook_stats import AT_RISK_AVERAGE, BAND_LETTERS, row_averages
+
+
+# ==============================================================================
+# GROUPED STATISTICS (by section / teacher / year ...)
+# Every Overview / Assignments number, per value of a grouping column, without
+# a Python loop over groups:
+#   * the group column is factorized to integer codes and the rows are stably
+#     sorted by code once, so every group is one contiguous block
+#   * counts, sums, squares, min/max and grade bands are np.*.reduceat over
+#     those blocks (all subjects at once)
+#   * quartiles/medians come from per-group score counts (whole-number scores,
+#     one bincount) or else one lexsort by (group, score); either way every
+#     group's interpolated positions are read at once
+# Cost is a sort plus a few passes whatever the number of groups.
+# ==============================================================================
+BLANK = "(blank)"
+MAX_LISTED = 200     # groups listed per table in the text report
+MAX_BARS = 25        # more groups than this are drawn as a heatmap
+BAND_CUTS = (90, 80, 70, 60)
+COUNTING_LIMIT = 5_000_000   # groups x distinct scores up to which quantiles are counted
+MAX_COHORTS = 50     # whole-number columns with at most this many values can be grouped by
+
+
+def cohort_like(values):
+    # a whole-number column of a few repeated values (year, section number ...)
+    x = pd.Series(values)
+    if x.dtype.kind not in 'iuf':
+        return False
+    if x.iloc[:10_000].nunique() > MAX_COHORTS:     # most grade columns stop here
+        return False
+    x = x.dropna().to_numpy(dtype=float)
+    distinct = len(np.unique(x))
+    return len(x) > 0 and distinct <= MAX_COHORTS and 2 * distinct <= len(x) and bool(np.all(x == np.round(x)))
+
+
+def group_codes(values):
+    # -> (codes 0..k-1, labels); missing values form their own "(blank)" group
+    codes, labels = pd.factorize(pd.Series(values), sort=True)
+    labels = np.asarray(labels, dtype=object).astype(str)
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(labels), codes)
+        labels = np.append(labels, BLANK)
+    return codes, labels
+
+
+def segment_quantiles(values, group, starts, counts, qs):
+    # quantiles of each group's valid values (numpy's default linear method);
+    # values/group are rows in group order, counts = valid values per group
+    valid = ~np.isnan(values)
+    kept = values[valid]
+    low = kept.min() if len(kept) else 0.0
+    span = kept.max() - low if len(kept) else 0.0
+    if np.all(kept == np.round(kept)) and (span + 1) * len(starts) <= COUNTING_LIMIT:
+        # whole scores: count every score per group instead of sorting, the k-th
+        # smallest value of a group is where its running count passes k
+        width = int(span) + 1
+        bins = np.bincount(group[valid] * width + (kept - low).astype(np.int64),
+                           minlength=len(starts) * width)
+        running = np.cumsum(bins)
+        first = np.cumsum(counts) - counts
+        pick = lambda g, k: low + np.searchsorted(running, first[g] + k, side='right') % width
+    else:
+        ranked = values[np.lexsort((values, group))]     # by group, then score, NaN last
+        pick = lambda g, k: ranked[starts[g] + k]
+
+    out = np.full((len(qs), len(starts)), np.nan)
+    has = np.flatnonzero(counts > 0)
+    n = counts[has]
+    for i, q in enumerate(qs):
+        h = (n - 1) * q
+        lo = np.floor(h).astype(np.int64)
+        low_v, high_v = pick(has, lo), pick(has, np.minimum(lo + 1, n - 1))
+        out[i, has] = low_v + (h - lo) * (high_v - low_v)
+    return out
+
+
+def segment_stats(x, group, starts, ddof=1):
+    # per-group stats of every column of x (rows already in group order);
+    # ddof=1 is Series.std() like column_stats, ddof=0 np.std like overview_stats
+    valid = ~np.isnan(x)
+    count = np.add.reduceat(valid, starts, axis=0)
+    total = np.add.reduceat(np.where(valid, x, 0.0), starts, axis=0)
+    squares = np.add.reduceat(np.where(valid, x * x, 0.0), starts, axis=0)
+    low = np.minimum.reduceat(np.where(valid, x, np.inf), starts, axis=0)
+    high = np.maximum.reduceat(np.where(valid, x, -np.inf), starts, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        above = [np.add.reduceat(x >= cut, starts, axis=0) for cut in BAND_CUTS]
+        mean = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+        var = (squares - total * mean) / (count - ddof)
+    bands = np.stack([above[0]] + [above[i] - above[i - 1] for i in range(1, len(above))]
+                     + [count - above[-1]])
+    stats = {
+        'count': count, 'mean': mean,
+        'std': np.where(count > ddof, np.sqrt(np.maximum(var, 0.0)), np.nan),
+        'min': np.where(count > 0, low, np.nan), 'max': np.where(count > 0, high, np.nan),
+        'bands': bands,   # (5, groups, columns): A..F
+        'pass_rate': np.where(count > 0, (count - bands[-1]) / np.maximum(count, 1) * 100, np.nan),
+    }
+    q = np.empty((3,) + count.shape)
+    for j in range(x.shape[1]):
+        q[:, :, j] = segment_quantiles(x[:, j], group, starts, count[:, j], (0.25, 0.5, 0.75))
+    stats['q1'], stats['median'], stats['q3'] = q
+    return stats
+
+
+class GroupedStats:
+    def __init__(self, matrix, subjects, groups, averages=None):
+        x = np.asarray(matrix, dtype=float)
+        if averages is None:
+            averages = row_averages(x)
+        averages = np.asarray(averages, dtype=float)
+        self.subjects = list(subjects)
+
+        codes, labels = group_codes(groups)
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        n = len(order)
+        if n == 0:
+            self.labels, self.sizes = np.array([], dtype=object), np.zeros(0, dtype=np.int64)
+            self.subject = self.average = self.grades = None
+            return
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        group = np.cumsum(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) - 1
+        self.labels = labels[sorted_codes[starts]]
+        self.sizes = np.diff(np.r_[starts, n])
+
+        xs = x[order]
+        self.subject = segment_stats(xs, group, starts)            # per group x subject
+        self.average = segment_stats(averages[order][:, None], group, starts)
+        self.at_risk = np.add.reduceat(averages[order] < AT_RISK_AVERAGE, starts)
+        # every grade of the group pooled together (overview numbers)
+        flat = xs.reshape(-1, 1)
+        flat_group = np.repeat(group, xs.shape[1])
+        self.grades = segment_stats(flat, flat_group, starts * xs.shape[1], ddof=0)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def table(self, stat='mean'):
+        # groups x (subjects + 'Average') matrix of one statistic
+        if not len(self):
+            return np.empty((0, len(self.subjects) + 1))
+        return np.column_stack([self.subject[stat], self.average[stat][:, 0]])
+
+
+def fmt(value, spec='.1f'):
+    return '-' if value is None or np.isnan(value) else format(value, spec)
+
+
+def grouped_text(gs, group_col, limit=MAX_LISTED):
+    if not len(gs):
+        return "\nNo rows to group.\n"
+    shown = min(len(gs), limit)
+    more = f"   (first {shown} of {len(gs)} groups)" if len(gs) > shown else ""
+    out = "\n" + "=" * 78 + "\n"
+    out += f"  STATISTICS BY {str(group_col).upper()}  -  {len(gs)} groups{more}\n"
+    out += "=" * 78 + "\n\n"
+
+    g, a = gs.grades, gs.average
+    out += (f"{'Group':<20}{'Students':>9}{'Grades':>8}{'Mean':>7}{'Median':>8}{'Std':>7}"
+            f"{'Pass %':>8}{'Avg':>7}{'At risk':>9}\n")
+    out += "-" * 83 + "\n"
+    for i in range(shown):
+        out += (f"{gs.labels[i][:19]:<20}{gs.sizes[i]:>9}{g['count'][i, 0]:>8}"
+                f"{fmt(g['mean'][i, 0]):>7}{fmt(g['median'][i, 0]):>8}{fmt(g['std'][i, 0]):>7}"
+                f"{fmt(g['pass_rate'][i, 0]):>8}{fmt(a['mean'][i, 0]):>7}{gs.at_risk[i]:>9}\n")
+
+    s = gs.subject
+    for j, subject in enumerate(gs.subjects):
+        out += f"\n{'━' * 78}\n{subject}\n{'━' * 78}\n"
+        out += (f"{'Group':<20}{'N':>6}{'Mean':>7}{'Std':>7}{'Q1':>7}{'Median':>8}{'Q3':>7}"
+                f"{'Min':>6}{'Max':>6}{'Pass %':>8}  " + " ".join(BAND_LETTERS) + "\n")
+        for i in range(shown):
+            bands = " ".join(str(int(s['bands'][k, i, j])) for k in range(len(BAND_LETTERS)))
+            out += (f"{gs.labels[i][:19]:<20}{s['count'][i, j]:>6}{fmt(s['mean'][i, j]):>7}"
+                    f"{fmt(s['std'][i, j]):>7}{fmt(s['q1'][i, j]):>7}{fmt(s['median'][i, j]):>8}"
+                    f"{fmt(s['q3'][i, j]):>7}{fmt(s['min'][i, j], '.0f'):>6}{fmt(s['max'][i, j], '.0f'):>6}"
+                    f"{fmt(s['pass_rate'][i, j]):>8}  {bands}\n")
+    return out
+
+
+def grouped_figure(gs, stat='mean', figsize=(6, 4.5)):
+    # few groups: bars per subject side by side; many groups: a groups x subjects heatmap
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize, dpi=100)
+    ax = fig.add_subplot(111)
+    values = gs.table(stat)
+    columns = gs.subjects + ['Average']
+    title = {'mean': 'Mean', 'median': 'Median', 'pass_rate': 'Pass rate %'}.get(stat, stat)
+
+    if len(gs) <= MAX_BARS:
+        x = np.arange(len(gs))
+        width = 0.8 / len(columns)
+        for j, col in enumerate(columns):
+            ax.bar(x + (j - (len(columns) - 1) / 2) * width, values[:, j], width, label=col[:12])
+        ax.set_xticks(x)
+        ax.set_xticklabels([str(l)[:12] for l in gs.labels], rotation=45, ha='right', fontsize=8)
+        ax.set_ylabel(title)
+        ax.legend(fontsize=7, ncol=2)
+        ax.grid(axis='y', alpha=0.3)
+    else:
+        im = ax.imshow(values, aspect='auto', cmap='RdYlGn', interpolation='nearest')
+        fig.colorbar(im, ax=ax, label=title)
+        ax.set_xticks(np.arange(len(columns)))
+        ax.set_xticklabels([c[:10] for c in columns], rotation=45, ha='right', fontsize=8)
+        if len(gs) <= 60:
+            ax.set_yticks(np.arange(len(gs)))
+            ax.set_yticklabels([str(l)[:12] for l in gs.labels], fontsize=7)
+        else:
+            ax.set_ylabel(f'{len(gs)} groups')
+    ax.set_title(f'{title} by group', fontsize=13, fontweight='bold')
+    fig.tight_layout()
+    return fig
@@ -1,6 +1,9 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+from correlation import pairwise_stats, draw_heatmap
+from chart_cache import ChartCache
+from binning import histogram_edges
 
 # ==============================================================================
 # PART 1: LOADING THE DATA
@@ -60,7 +63,7 @@ def draw_histogram(df, subject_name):
         scores = df[subject_name].dropna()  # Remove empty scores
 
         # Plotting: Using SteelBlue for a professional look
-        plt.hist(scores, bins=10, range=(0, 100), color='#5DADE2', edgecolor='slategrey')
+        plt.hist(scores, bins=histogram_edges(scores), color='#5DADE2', edgecolor='slategrey')
 
         plt.title(f"Grade Distribution: {subject_name}")
         plt.xlabel("Score")
@@ -127,13 +130,17 @@ def draw_comparison(df, subjects_to_compare=None):
 
 # 🏆 GRAPH 4: TOP vs BOTTOM
 # Purpose: Identifies the highest achievers and those who need help.
-def draw_top_bottom(df):
+def draw_top_bottom(df, weights=None):
     fig = plt.figure(figsize=(8, 6))
 
     # 1. Calculate the 'Overall Average' for every student
+    #    (weights = a weighting.WeightScheme for credit/category weighted averages)
     numeric_cols = df.select_dtypes(include=[np.number]).columns
     temp_df = df.copy()
-    temp_df['Average'] = temp_df[numeric_cols].mean(axis=1)
+    if weights is None:
+        temp_df['Average'] = temp_df[numeric_cols].mean(axis=1)
+    else:
+        temp_df['Average'] = weights.averages(temp_df[numeric_cols].to_numpy(dtype=float), list(numeric_cols))
 
     # 2. Sort the list from lowest to highest
     temp_df = temp_df.sort_values('Average')
@@ -160,7 +167,7 @@ def draw_boxplot(df, subjects_to_compare=None):
     data = [df[sub].dropna() for sub in subjects]
 
     # Draw it with our color theme
-    plt.boxplot(data, labels=subjects, patch_artist=True,
+    plt.boxplot(data, tick_labels=subjects, patch_artist=True,
                 boxprops=dict(facecolor='#AED6F1', color='slategrey'),  # Light Blue box
                 medianprops=dict(color='#2E86C1', linewidth=2))  # Dark Blue line
 
@@ -188,6 +195,31 @@ def draw_trend(df, subjects_in_order=None):
     return fig
 
 
+# 🔗 GRAPH 7: CORRELATION HEATMAP
+# Purpose: Shows which subjects move together (e.g. good at MATH -> good at CS102?).
+def draw_correlation(df, subjects_to_compare=None):
+    fig = plt.figure(figsize=(7, 6))
+    subjects = get_subject_list(df, subjects_to_compare)
+
+    # all subject pairs at once (matrix products, no loop over pairs)
+    corr, cov, counts = pairwise_stats(df[subjects].to_numpy(dtype=float, na_value=np.nan))
+    draw_heatmap(fig, corr, subjects, "Subject Correlation")
+
+    plt.tight_layout()
+    return fig
+
+
+# 🗂 RENDER CACHE
+# Same chart + same data = same picture, so we keep the pixels instead of
+# drawing it again. data_version is a number the caller bumps when df changes.
+chart_cache = ChartCache()
+
+
+def render_chart(draw_func, df, *args, data_version=0, size=None, dpi=100):
+    # PNG bytes of draw_func(df, *args), rendered at most once per version/size
+    return chart_cache.png(draw_func, df, *args, version=data_version, size=size, dpi=dpi)
+
+
 # ==============================================================================
 # PART 3: TEST AREA
 # This runs if you just open this file directly.
@@ -206,4 +238,10 @@ if __name__ == "__main__":
     fig3 = draw_comparison(df, ["CS101", "CS102"])
     plt.show()
 
+    # Example 3: the second render of the same chart comes from the cache
+    print("Test 3: Render cache...")
+    render_chart(draw_histogram, df, "MATH")
+    render_chart(draw_histogram, df, "MATH")
+    print(f"  cache hits: {chart_cache.hits}, renders: {chart_cache.misses}")
+
     print("\n✓ All charts generated successfully.")
\ No newline at end of file
@@ -1,11 +1,18 @@
 #imports
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog
 import pandas as pd
 import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
+from thresholds import ThresholdIndex
+from display_format import FormattedColumns
+from weighting import load_scheme, checked, weights_path
+from gradebook_model import GradebookModel
+from validation import validate, fix
+from chart_cache import ChartCache
+from binning import histogram_edges
 
 root=tk.Tk()
 root.title("grade statistics visualizer")
@@ -16,13 +23,29 @@ root.grid_rowconfigure(0, weight=1)
 root.grid_rowconfigure(1, weight=1)
 root.grid_columnconfigure(0, weight=1)
 root.grid_columnconfigure(1, weight=1)
-df = pd.read_csv(r"C:\Users\omark\OneDrive\Documents\cs102 project\project.csv")
+data_path = r"C:\Users\omark\OneDrive\Documents\cs102 project\project.csv"
+df = pd.read_csv(data_path)
 # strip column names immediately and define subjects for the UI
 df.columns = df.columns.str.strip()
 subjects = ['CS101','CS102','ENG102','MATH','SSC1']
+#check the data once before using it (bad grades, duplicate/untrimmed names, empty rows)
+report = validate(df, subjects)
+if not report.ok:
+    print("Data check:")
+    print(report.text())
+    df = fix(df, report)
 # ensure subject columns are numeric for plotting (harmless if repeated later)
 for col in subjects:
     df[col] = pd.to_numeric(df[col], errors='coerce')
+# sorted copy of every subject (and the per-row average) for pass mark lookups
+threshold_index = ThresholdIndex(df, subjects)
+#weights.json from the data file's folder, checked against the subjects
+weights, problems = checked(load_scheme(weights_path(data_path)), subjects)
+for problem in problems:
+    print("Weights:", problem)
+# Total / Average / Status / GPA are derived once here and shared by the charts and the report below
+model = GradebookModel(df, subjects, weights)
+threshold_index.add_series('Average', model.series('Average'))
 # graph UI: combobox above the graph to choose subject and a frame to host the canvas
 buttons_frame = tk.Frame(root, bg='#3E3E3E')
 buttons_frame.grid(row=0, column=1, sticky='ew', padx=10, pady=10)
@@ -61,6 +84,8 @@ canvas = None
 view_mode = 'hist'  # add initial view mode
 
 def clear_content_frame():
+    global shown_chart
+    shown_chart = None
     for w in content_frame.winfo_children():
         w.destroy()
 
@@ -93,12 +118,12 @@ def display_table(df_subset, title):
 
     tv.configure(yscrollcommand=vs.set, xscrollcommand=hs.set)
 
-    df_subset = df_subset.fillna('')
     tv['columns'] = list(df_subset.columns)
     for col in df_subset.columns:
         tv.heading(col, text=col)
         tv.column(col, width=100, anchor='w')
-    for row in df_subset.to_numpy().tolist():
+    # rows come out of the already formatted main table text
+    for row in table_text.rows_for(df_subset):
         tv.insert("", "end", values=row)
 
 def draw_histogram(df, subject_name):
@@ -106,7 +131,7 @@ def draw_histogram(df, subject_name):
     fig = plt.figure(figsize=(6, 4))
     if subject_name in df.columns:
         scores = pd.to_numeric(df[subject_name], errors='coerce').dropna()
-        plt.hist(scores, bins=10, range=(0, 100), color='#5DADE2', edgecolor='slategrey')
+        plt.hist(scores, bins=histogram_edges(scores), color='#5DADE2', edgecolor='slategrey')
         plt.title(f"Grade Distribution: {subject_name}")
         plt.xlabel("Score")
         plt.ylabel("Number of Students")
@@ -115,11 +140,14 @@ def draw_histogram(df, subject_name):
     plt.tight_layout()
     return fig
 
-def draw_top_bottom(df):
+def draw_top_bottom(df, averages=None):
     # safer Figure/Axes-based implementation and fallback for name column
     numeric_cols = df.select_dtypes(include=[np.number]).columns
     temp_df = df.copy()
-    temp_df['Average'] = temp_df[numeric_cols].mean(axis=1)
+    if averages is None:
+        temp_df['Average'] = temp_df[numeric_cols].mean(axis=1)
+    else:
+        temp_df['Average'] = averages
     temp_df = temp_df.sort_values('Average')
     combined = pd.concat([temp_df.head(5), temp_df.tail(5)])
 
@@ -149,11 +177,36 @@ def display_figure(fig_to_show):
     canvas.draw()
     content_frame.update_idletasks()
 
+# charts are rendered once per (chart, data version, size) and kept as bitmaps,
+# so switching back to a chart just shows the cached picture
+chart_cache = ChartCache()
+shown_chart = None
+
+def display_chart(draw_func, *args):
+    global shown_chart
+    clear_content_frame()
+    content_frame.update_idletasks()
+    w, h = content_frame.winfo_width(), content_frame.winfo_height()
+    opts = dict(version=model.version, size=(w, h) if w > 50 and h > 50 else None, dpi=100)
+    image = tk.PhotoImage(data=chart_cache.photo_data(draw_func, *args, **opts))
+    label = tk.Label(content_frame, image=image, bg='#3E3E3E')
+    label.image = image  # keep a reference, Tk doesn't
+    label.grid(row=0, column=0, sticky='nsew')
+    shown_chart = (draw_func, args, opts)
+
+def save_chart():
+    # saves the chart on screen straight from the render cache
+    if shown_chart is None:
+        return
+    path = filedialog.asksaveasfilename(defaultextension='.png', filetypes=[('PNG image', '*.png')])
+    if path:
+        draw_func, args, opts = shown_chart
+        chart_cache.save(path, draw_func, *args, **opts)
+
 def update_graph(subject):
     if subject == "" or subject is None:
         subject = subjects[0]
-    fig_hist = draw_histogram(df, subject)
-    display_figure(fig_hist)
+    display_chart(draw_histogram, df, subject)
 
 # buttons to show top/worst students in place of the graph + restore graph
 def show_top():
@@ -184,21 +237,10 @@ combo.set(subjects[0])
 btn_restore = ttk.Button(buttons_frame, text="Show Graph", command=restore_graph)
 btn_restore.grid(row=0, column=4, padx=(8,0))
 
-def show_pass_fail_pie():
-    global canvas, view_mode
-    view_mode = 'pie'
-    clear_content_frame()
-    subject = subject_var.get() or subjects[0]
-    threshold = 50
-
-    # use selected subject if present, otherwise compute per-row average from subject columns
-    if subject in df.columns:
-        series = pd.to_numeric(df[subject], errors='coerce').dropna()
-    else:
-        series = pd.to_numeric(df[subjects].mean(axis=1), errors='coerce').dropna()
-
-    passed = int((series >= threshold).sum())
-    failed = int((series < threshold).sum())
+def draw_pass_fail_pie(ax_pie, subject, threshold):
+    # use selected subject if present, otherwise use the per-row average from subject columns
+    key = subject if subject in threshold_index.sorted_scores else 'Average'
+    passed, failed = threshold_index.pass_fail(key, threshold)
 
     # build pie safely if no data
     total = passed + failed
@@ -213,19 +255,44 @@ def show_pass_fail_pie():
         colors = ['#5DADE2', '#E74C3C']
         autopct = '%1.1f%%'
 
-    fig_pie = Figure(figsize=(6, 4), dpi=100)
-    ax_pie = fig_pie.add_subplot(111)
+    ax_pie.clear()
     ax_pie.pie(sizes, labels=labels, colors=colors, autopct=autopct, startangle=90)
     ax_pie.axis('equal')
-    ax_pie.set_title(f'Pass/Fail ({subject})')
+    ax_pie.set_title(f'Pass/Fail ({subject}, pass mark {threshold:.0f})')
 
-    canvas = FigureCanvasTkAgg(fig_pie, master=content_frame)
+pie_fig = None
+pie_ax = None
+
+def show_pass_fail_pie():
+    global canvas, view_mode, pie_fig, pie_ax
+    view_mode = 'pie'
+    clear_content_frame()
+    subject = subject_var.get() or subjects[0]
+
+    pie_fig = Figure(figsize=(6, 4), dpi=100)
+    pie_ax = pie_fig.add_subplot(111)
+    draw_pass_fail_pie(pie_ax, subject, pass_mark_var.get())
+
+    canvas = FigureCanvasTkAgg(pie_fig, master=content_frame)
     canvas.get_tk_widget().grid(row=0, column=0, sticky='nsew')
     canvas.draw()
 
+def on_pass_mark_change(value):
+    # slider moves only redraw the pie on the existing canvas
+    if view_mode != 'pie' or pie_ax is None:
+        return
+    draw_pass_fail_pie(pie_ax, subject_var.get() or subjects[0], float(value))
+    canvas.draw_idle()
+
 btn_pie = ttk.Button(buttons_frame, text="Pass/Fail Pie", command=show_pass_fail_pie)
 btn_pie.grid(row=0, column=5, padx=(8,0))
 
+pass_mark_var = tk.DoubleVar(value=50)
+pass_mark_scale = tk.Scale(buttons_frame, from_=0, to=100, orient='horizontal', variable=pass_mark_var,
+                           label='Pass mark', command=on_pass_mark_change, length=140,
+                           bg='#3E3E3E', fg='white', highlightthickness=0)
+pass_mark_scale.grid(row=0, column=8, padx=(8,0))
+
 def draw_comparison(df):
     # returns a Figure comparing average score per subject
     fig = Figure(figsize=(10, 6), dpi=100)
@@ -251,7 +318,7 @@ def draw_comparison(df):
 def show_comparison():
     global canvas, view_mode
     view_mode = 'comparison'
-    display_figure(draw_comparison(df))
+    display_chart(draw_comparison, df)
 
 btn_compare = ttk.Button(buttons_frame, text="Compare Subjects", command=show_comparison)
 btn_compare.grid(row=0, column=7, padx=(8,0))
@@ -259,13 +326,17 @@ btn_compare.grid(row=0, column=7, padx=(8,0))
 def show_top_bottom():
     global canvas, view_mode
     view_mode = 'topbottom'
-    display_figure(draw_top_bottom(df))
+    # rank by the (weighted) course average, not a mean over every numeric column
+    display_chart(draw_top_bottom, df, df['Average'])
 
 btn_topbottom = ttk.Button(buttons_frame, text="Top/Bottom 5", command=show_top_bottom)
 btn_topbottom.grid(row=0, column=6, padx=(8,0))
 
+btn_save = ttk.Button(buttons_frame, text="Save Chart", command=save_chart)
+btn_save.grid(row=0, column=9, padx=(8,0))
+
 # initial display is the graph
-display_figure(draw_histogram(df, subjects[0]))
+display_chart(draw_histogram, df, subjects[0])
 
 # update when dropdown changes: show graph + redraw
 def on_subject_change(event):
@@ -285,9 +356,9 @@ combo.bind("<<ComboboxSelected>>", on_subject_change)
 for col in subjects:
     df[col] = pd.to_numeric(df[col], errors='coerce')
 #Add Total column
-df['Total']= df[subjects].sum(axis=1)
-#Add Average column
-df['Average'] = df[subjects].mean(axis=1)
+df['Total']= model['Total']
+#Add Average column (credit/category weighted when weights.json exists, plain mean otherwise)
+df['Average'] = model['Average']
 #Add top students part
 top_students = df.sort_values(by='Total', ascending=False).head()
 print("Top 5 Students:")
@@ -296,9 +367,10 @@ print(top_students)
 lowest_students = df.sort_values(by='Total', ascending=True).head()
 print("Students that needs attention: ")
 print(lowest_students)
-#Add the status column pass/fail, "lambda x" creates anonymous function where x represents each individual average score
+#Add the status column pass/fail (Average >= pass mark, missing average counts as Fail)
 pass_students = 50
-df['Status'] = df['Average'].apply(lambda x: 'Pass' if x >= pass_students else 'Fail')
+model.set_pass_mark(pass_students)
+df['Status'] = model['Status']
 total_students=len(df)
 passed=(df['Average']>=pass_students).sum()
 failed=(df['Average']<pass_students).sum()
@@ -311,39 +383,19 @@ print(f'Failed: {failed}({fail_percentage:.2f}%)')
 print("\n"+"-"*46)
 print("pass and fail in each course:")
 print("-"*46)
-#for loop to add the pass/fail percentage in every course
-for subject in subjects:
-    subject_pass=(df[subject]>=pass_percentage).sum()
-    subject_fail=(df[subject]<pass_percentage).sum()
+#pass/fail count for every course in one go from the sorted threshold index
+course_index = ThresholdIndex(df, subjects)
+course_passes = course_index.count_matrix([pass_percentage])[:, 0]
+for subject, subject_pass in zip(subjects, course_passes):
+    subject_fail=course_index.valid_count(subject)-subject_pass
     subject_pass_percentage=(subject_pass/total_students)*100
     subject_fail_percentage=(subject_fail/total_students)*100
     print(f"\n{subject}:")
     print(f"pass: {subject_pass} students ({subject_pass_percentage:.2f}%)")
     print(f"fail: {subject_fail} students ({subject_fail_percentage:.2f}%)")
-#GPA calculation
-def GPA(Average):
-    if Average >=93:
-        return 4.0
-    elif Average >=90:
-        return 3.7
-    elif Average >=85:
-        return 3.5
-    elif Average >=83:
-        return 3.3
-    elif Average >=80:
-        return 3.0
-    elif Average >=75:
-        return 2.7
-    elif Average >=70:
-        return 2.5
-    elif Average >=60:
-        return 2.2
-    elif Average >=50:
-        return 2.0
-    else:
-        return 0.0
+#GPA calculation (grading.py scale, same cut-offs as the old GPA() if/elif chain)
 #Add gpa column
-df['GPA']=df['Average'].apply(GPA)
+df['GPA']=model['GPA']
 #To print all the columns together and it can be removed if other team members want
 pd.set_option('display.max_columns',None)
 def search(df,name):
@@ -373,15 +425,15 @@ scroll.grid(row=0, column=1, sticky='ns')
 tree.configure(yscrollcommand=scroll.set)
 #البلح مفيد
 
-df = df.fillna("") #fills empty
-tree["columns"] = list(df.columns)
 df.columns = df.columns.str.strip()
+table_text = FormattedColumns(df, float_format=None) #formats every column once, empty cells become ""
+tree["columns"] = list(df.columns)
 
 for col in df.columns: #adds columns to table
         tree.heading(col, text=col)
         tree.column(col, width=78)
 
-for row in df.to_numpy().tolist(): #adds data 
+for row in table_text.rows(): #adds data 
         tree.insert("", "end", values=row) 
 
 
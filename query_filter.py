@@ -0,0 +1,212 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# ==============================================================================
+# STRUCTURED FILTERS ("MATH < 50 and CS102 >= 80 or Status == Fail")
+# A filter is a list of clauses (column, op, value), each joined to the one
+# before it with 'and' / 'or'; 'and' binds tighter, so the list is read as
+# OR-groups of AND-ed clauses.
+#   * every clause is one vectorized comparison over its column -> bool mask
+#   * masks are kept packed (np.packbits, 1 bit per student) in a MaskCache,
+#     one entry per clause, until the data changes
+#   * adding / removing a clause just ANDs / ORs the cached bitsets again,
+#     the data is only scanned for clauses that are new
+# Missing values never match (not even '!=').
+# Column names and values with spaces, operators or the words and / or in them
+# are written in quotes ("Reading and Writing" < 50); describe() adds them.
+# ==============================================================================
+OPS = ('<', '<=', '>', '>=', '==', '!=', 'contains')
+CONNECTORS = ('and', 'or')
+SYMBOL_OPS = ('<=', '>=', '==', '!=', '<', '>', '=')
+PLAIN_RE = re.compile(r'[^\s"\'<>=!]+')
+
+
+def quote(text):
+    # bare when parse_query would read it back unchanged, "double quoted" otherwise
+    text = str(text)
+    if PLAIN_RE.fullmatch(text) and text.casefold() not in CONNECTORS + ('contains',):
+        return text
+    return '"' + text.replace('"', '""') + '"'
+
+
+def clause_text(clause):
+    column, op, value = clause
+    return f"{quote(column)} {op} {quote(value)}"
+
+
+def describe(clauses):
+    # [(connector, clause), ...] -> "MATH < 50 and Status == Fail"
+    parts = []
+    for i, (connector, clause) in enumerate(clauses):
+        parts.append(clause_text(clause) if i == 0 else f"{connector} {clause_text(clause)}")
+    return " ".join(parts)
+
+
+def tokenize(text):
+    # -> [(kind, text, start, end)], kind is 'quoted', 'op' or 'word';
+    # quotes only open a token at a token boundary ("O'Neil" stays one word)
+    # and a doubled quote inside quotes stands for the quote itself
+    tokens = []
+    i, n = 0, len(text)
+    while i < n:
+        if text[i].isspace():
+            i += 1
+            continue
+        start = i
+        if text[i] in '"\'':
+            mark, i, chars = text[i], i + 1, []
+            while True:
+                close = text.find(mark, i)
+                if close < 0:
+                    raise ValueError(f"unclosed quote in '{text[start:]}'")
+                chars.append(text[i:close])
+                if text.startswith(mark, close + 1):
+                    chars.append(mark)
+                    i = close + 2
+                else:
+                    i = close + 1
+                    break
+            tokens.append(('quoted', ''.join(chars), start, i))
+            continue
+        op = next((o for o in SYMBOL_OPS if text.startswith(o, i)), None)
+        if op:
+            tokens.append(('op', op, start, i + len(op)))
+            i += len(op)
+            continue
+        while i < n and not text[i].isspace() and text[i] not in '<>=' and not text.startswith('!=', i):
+            i += 1
+        if i == start:      # a lone '!'
+            i += 1
+        tokens.append(('word', text[start:i], start, i))
+    return tokens
+
+
+def _piece(text, tokens):
+    # the column / value a run of tokens stands for
+    if len(tokens) == 1 and tokens[0][0] == 'quoted':
+        return tokens[0][1]
+    return text[tokens[0][2]:tokens[-1][3]]
+
+
+def parse_query(text, columns):
+    # the inverse of describe(); column names are matched case-insensitively.
+    # 'and' / 'or' only join clauses when they stand unquoted after a value,
+    # so "Reading and Writing < 50" is one clause and "Status == 'Pass or Fail'"
+    # compares against the whole phrase
+    by_key = {str(c).strip().casefold(): c for c in columns}
+    tokens = tokenize(text)
+    clauses = []
+    connector, i = 'and', 0
+    while i < len(tokens):
+        first = i
+        while i < len(tokens) and not (i > first and _is_op(tokens[i])):
+            i += 1
+        if i == len(tokens):
+            raise ValueError(f"can't read '{text[tokens[first][2]:].strip()}' (expected: column op value)")
+        name, op = _piece(text, tokens[first:i]), tokens[i][1].lower()
+        i += 1
+        values = i
+        while i < len(tokens) and not (i > values and tokens[i][0] == 'word'
+                                       and tokens[i][1].casefold() in CONNECTORS):
+            i += 1
+        if i == values:
+            raise ValueError(f"can't read '{text[tokens[first][2]:].strip()}' (expected: column op value)")
+        column = by_key.get(name.strip().casefold())
+        if column is None:
+            raise ValueError(f"unknown column '{name}'")
+        clauses.append((connector, (column, {'=': '=='}.get(op, op), _piece(text, tokens[values:i]))))
+        if i < len(tokens):
+            connector = tokens[i][1].lower()
+            i += 1
+            if i == len(tokens):
+                raise ValueError(f"nothing after '{connector}'")
+    return clauses
+
+
+def _is_op(token):
+    kind, word = token[0], token[1]
+    return kind == 'op' or (kind == 'word' and word.casefold() == 'contains')
+
+
+def or_groups(clauses):
+    groups = []
+    for connector, clause in clauses:
+        if connector == 'or' or not groups:
+            groups.append([])
+        groups[-1].append(clause)
+    return groups
+
+
+def clause_mask(values, op, value):
+    # one clause over a whole column -> bool array
+    values = np.asarray(values)
+    if op not in OPS:
+        raise ValueError(f"unknown operator '{op}'")
+    if values.dtype.kind in 'fiub' and op != 'contains':
+        try:
+            target = float(value)
+        except ValueError:
+            raise ValueError(f"'{value}' is not a number") from None
+        x = values.astype(float)
+        with np.errstate(invalid='ignore'):
+            if op == '<':
+                return x < target
+            if op == '<=':
+                return x <= target
+            if op == '>':
+                return x > target
+            if op == '>=':
+                return x >= target
+            if op == '==':
+                return x == target
+            return (x != target) & ~np.isnan(x)
+
+    text = pd.Series(values, dtype=object)
+    missing = text.isna().to_numpy()
+    folded = text.astype(str).str.casefold()
+    target = str(value).casefold()
+    if op == 'contains':
+        mask = folded.str.contains(target, regex=False).to_numpy()
+    elif op == '==':
+        mask = (folded == target).to_numpy()
+    elif op == '!=':
+        mask = (folded != target).to_numpy()
+    else:
+        raise ValueError(f"'{op}' needs a numeric column")
+    return mask & ~missing
+
+
+class MaskCache:
+    # clause -> packed bitset, valid for one version of the data
+    def __init__(self):
+        self.key = None
+        self.n_rows = 0
+        self.masks = {}
+        self.scans = 0     # clauses evaluated against the data (the rest were cached)
+
+    def reset(self, key, n_rows):
+        if key != self.key:
+            self.key, self.n_rows, self.masks = key, n_rows, {}
+
+    def packed(self, clause, column_fn):
+        bits = self.masks.get(clause)
+        if bits is None:
+            column, op, value = clause
+            bits = self.masks[clause] = np.packbits(clause_mask(column_fn(column), op, value))
+            self.scans += 1
+        return bits
+
+    def combine(self, clauses, column_fn):
+        # bool mask of the rows matching the whole filter (all rows without clauses)
+        if not clauses:
+            return np.ones(self.n_rows, dtype=bool)
+        result = None
+        for group in or_groups(clauses):
+            bits = self.packed(group[0], column_fn)
+            for clause in group[1:]:
+                bits = bits & self.packed(clause, column_fn)
+            result = bits if result is None else result | bits
+        return np.unpackbits(result, count=self.n_rows).astype(bool)
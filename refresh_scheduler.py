@@ -0,0 +1,64 @@
+import time
+
+
+# ==============================================================================
+# REFRESH SCHEDULER
+# Instead of recomputing every view on every keystroke / button / combobox event
+# we only write down WHICH views are out of date. After a short quiet period
+# (Tk after()) all of them are rendered in one go. A new request inside the
+# window cancels the pending run and restarts the timer, so a burst of typing
+# costs one recompute instead of one per character.
+# ==============================================================================
+class RefreshScheduler:
+    def __init__(self, widget, callback, views, dependencies=None, delay_ms=150):
+        self.widget = widget              # any Tk widget, used for after()/after_cancel()
+        self.callback = callback          # callback(list_of_views) does the actual work
+        self.views = list(views)          # fixed order the views get rendered in
+        self.dependencies = dict(dependencies or {})  # input name -> views that use it
+        self.delay_ms = delay_ms
+        self.dirty = set()
+        self._after_id = None
+        self.last_flush = None            # (views, seconds) of the most recent run
+
+    def mark_dirty(self, *views):
+        for view in views:
+            if view not in self.views:
+                raise KeyError(f"Unknown view: {view}")
+            self.dirty.add(view)
+        self._schedule()
+
+    def invalidate(self, *inputs):
+        # an input changed -> every view that reads it is dirty
+        views = []
+        for name in inputs:
+            views.extend(self.dependencies.get(name, ()))
+        self.mark_dirty(*views)
+
+    def mark_all(self):
+        self.mark_dirty(*self.views)
+
+    def is_pending(self):
+        return self._after_id is not None
+
+    def cancel(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _schedule(self):
+        # superseded: drop the pending run and restart the quiet period
+        self.cancel()
+        if self.dirty:
+            self._after_id = self.widget.after(self.delay_ms, self.flush)
+
+    def flush(self):
+        # run now (also used directly when the caller cannot wait, e.g. after a load)
+        self.cancel()
+        if not self.dirty:
+            return []
+        todo = [v for v in self.views if v in self.dirty]
+        self.dirty.clear()
+        start = time.perf_counter()
+        self.callback(todo)
+        self.last_flush = (todo, time.perf_counter() - start)
+        return todo
@@ -0,0 +1,416 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import re
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# ==============================================================================
+# GOLDEN-OUTPUT REGRESSION CHECK
+# Runs the current code over a small corpus of gradebooks and compares what it
+# produces with the outputs recorded in golden/:
+#   overview / assignments / rankings - the viewer's tab text (date line removed)
+#   model                             - Total / Average / Status / GPA columns
+#   charts                            - what each pie_chart.draw_* puts on the axes
+#                                       (bars, wedges, lines, labels), not pixels
+# Numbers may differ by float noise (or one unit in the last printed digit);
+# anything else is a failure, and so is an exception (never recorded as
+# golden output). Every scenario also has a time and peak-memory
+# budget (golden/budgets.json) and fails when it goes well over it.
+#
+#   python regression_check.py                 check everything
+#   python regression_check.py --record        write new golden outputs + budgets
+#   python regression_check.py --record-budgets   only re-measure budgets (new machine)
+# ==============================================================================
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(HERE, 'golden')
+BUDGETS_FILE = os.path.join(GOLDEN_DIR, 'budgets.json')
+
+TIME_SLACK, TIME_FLOOR = 2.0, 0.05              # fail above 2x the budget + 50 ms
+MEMORY_SLACK, MEMORY_FLOOR = 1.5, 1024 * 1024   # fail above 1.5x the budget + 1 MB
+REPEAT = 3                                      # best-of timing runs
+HEAD = 20                                       # values kept verbatim per column digest
+
+# the viewer switches matplotlib to TkAgg when imported; charts here are drawn off-screen
+import DataBase_V1 as viewer
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+with contextlib.redirect_stdout(io.StringIO()):
+    import pie_chart   # prints while loading its demo data
+from gradebook_model import GradebookModel
+
+
+# ---- corpus ------------------------------------------------------------------
+def names(n):
+    return [f"Student {i + 1}" for i in range(n)]
+
+
+def synthetic_nans():
+    # missing grades everywhere, a student without any grade, a subject with one grade
+    rng = np.random.default_rng(1)
+    x = rng.integers(0, 101, size=(40, 5)).astype(float)
+    x[rng.random(x.shape) < 0.3] = np.nan
+    x[7, :] = np.nan
+    x[:, 4] = np.nan
+    x[3, 4] = 88
+    df = pd.DataFrame(x, columns=['MATH', 'CS101', 'CS102', 'ENG102', 'SSC1'])
+    df.insert(0, 'student name', names(len(df)))
+    return df
+
+
+def synthetic_ties():
+    # a handful of grade values -> lots of tied averages, and a duplicate name
+    rng = np.random.default_rng(2)
+    x = rng.choice([50, 60, 70, 80, 90], size=(60, 4))
+    df = pd.DataFrame(x, columns=['MATH', 'CS101', 'CS102', 'ENG102'])
+    df.insert(0, 'student name', names(len(df)))
+    df.loc[10, 'student name'] = df.loc[11, 'student name']
+    return df
+
+
+def synthetic_tiny():
+    return pd.DataFrame({'student name': ['A', 'B', 'C'],
+                         'MATH': [40.0, np.nan, 100.0], 'CS101': [55.0, 65.0, 75.0]})
+
+
+def synthetic_large():
+    rng = np.random.default_rng(3)
+    x = rng.normal(72, 15, size=(50_000, 6)).clip(0, 100).round()
+    x[rng.random(x.shape) < 0.02] = np.nan
+    df = pd.DataFrame(x, columns=[f'S{j + 1}' for j in range(6)])
+    df.insert(0, 'student name', names(len(df)))
+    return df
+
+
+DATASETS = OrderedDict([
+    ('project', lambda: pd.read_csv(os.path.join(HERE, 'project.csv'))),
+    ('project_final', lambda: pd.read_csv(os.path.join(HERE, 'project Final.csv'))),
+    ('nans', synthetic_nans),
+    ('ties', synthetic_ties),
+    ('tiny', synthetic_tiny),
+    ('large', synthetic_large),
+])
+
+
+# ---- scenarios ---------------------------------------------------------------
+class TextSink:
+    # stands in for the viewer's Text widgets
+    def __init__(self):
+        self.text = ''
+
+    def delete(self, *args):
+        self.text = ''
+
+    def insert(self, index, text, *args):
+        self.text += text
+
+
+class ReportSink:
+    # stands in for the viewer's ReportView panes (the whole report, every section)
+    def __init__(self):
+        self.report = None
+
+    def show(self, report):
+        self.report = report
+
+    def show_text(self, text):
+        self.report = viewer.Report()
+        self.report.add_text(text)
+
+    @property
+    def text(self):
+        return self.report.text() if self.report is not None else ''
+
+
+def make_viewer(df):
+    # the viewer's in-memory state for df, without any Tk widgets
+    v = viewer.GradebookViewer.__new__(viewer.GradebookViewer)
+    v.overview_text = TextSink()
+    for attr in ('assign_report', 'top_report', 'bottom_report'):
+        setattr(v, attr, ReportSink())
+    v.df = df
+    v.shown_rows = np.arange(len(df))
+    v.numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    v.compact = v.store = v.store_book = v.approx = v.weights = None
+    v.weights_file, v.weight_problems = None, []
+    v.data_version = 1
+    v.col_stats, v.col_stats_version = {}, None
+    v.query, v.query_version, v.query_masks = [], 0, viewer.MaskCache()
+    v.model = GradebookModel(df, v.numeric_cols)
+    v.update_flags()
+    return v
+
+
+def without_date(text):
+    return "\n".join(line for line in text.split("\n") if '📅' not in line)
+
+
+def run_overview(df):
+    v = make_viewer(df)
+    v.calc_overview()
+    return without_date(v.overview_text.text)
+
+
+def run_assignments(df):
+    v = make_viewer(df)
+    v.calc_assignments()
+    return v.assign_report.text
+
+
+def run_rankings(df):
+    v = make_viewer(df)
+    v.calc_rankings()
+    return {'top': v.top_report.text, 'bottom': v.bottom_report.text}
+
+
+def digest(values):
+    # enough of a column to catch changes without storing 50k values
+    values = np.asarray(values)
+    if values.dtype.kind in 'fiu':
+        x = values.astype(float)
+        valid = x[~np.isnan(x)]
+        return {'n': len(x), 'missing': int(len(x) - len(valid)),
+                'sum': float(valid.sum()), 'min': float(valid.min()) if len(valid) else None,
+                'max': float(valid.max()) if len(valid) else None, 'head': x[:HEAD].tolist()}
+    labels, counts = np.unique(values.astype(str), return_counts=True)
+    return {'n': len(values), 'counts': dict(zip(labels.tolist(), counts.tolist())),
+            'head': values[:HEAD].astype(str).tolist()}
+
+
+def run_model(df):
+    model = GradebookModel(df)
+    return {name: digest(model[name]) for name in ('Total', 'Average', 'Status', 'GPA')}
+
+
+def figure_signature(fig):
+    # what a chart shows, read back from its artists
+    fig.canvas.draw()
+    out = []
+    for ax in fig.axes:
+        entry = {
+            'title': ax.get_title(), 'xlabel': ax.get_xlabel(), 'ylabel': ax.get_ylabel(),
+            'xticks': [t.get_text() for t in ax.get_xticklabels()],
+            'yticks': [t.get_text() for t in ax.get_yticklabels()],
+            'texts': [t.get_text() for t in ax.texts],
+            'bars': [], 'wedges': [], 'lines': [], 'images': [],
+        }
+        for p in ax.patches:
+            if isinstance(p, matplotlib.patches.Wedge):
+                entry['wedges'].append([p.theta1, p.theta2])
+            elif isinstance(p, matplotlib.patches.Rectangle):
+                entry['bars'].append([p.get_x(), p.get_y(), p.get_width(), p.get_height()])
+        for line in ax.lines:
+            entry['lines'].append(np.asarray(line.get_ydata(), dtype=float).tolist())
+        for image in ax.images:
+            entry['images'].append(np.asarray(image.get_array(), dtype=float).round(6).tolist())
+        out.append(entry)
+    return out
+
+
+def chart_calls(df):
+    subjects = df.select_dtypes(include=[np.number]).columns.tolist()
+    first = subjects[0]
+    return OrderedDict([
+        ('histogram', lambda: pie_chart.draw_histogram(df, first)),
+        ('pass_fail', lambda: pie_chart.draw_pass_fail(df, first)),
+        ('comparison', lambda: pie_chart.draw_comparison(df)),
+        ('top_bottom', lambda: pie_chart.draw_top_bottom(df)),
+        ('boxplot', lambda: pie_chart.draw_boxplot(df)),
+        ('trend', lambda: pie_chart.draw_trend(df)),
+        ('correlation', lambda: pie_chart.draw_correlation(df)),
+    ])
+
+
+def run_charts(df):
+    out = OrderedDict()
+    for name, draw in chart_calls(df).items():
+        try:
+            fig = draw()
+        except Exception as e:
+            plt.close('all')
+            raise RuntimeError(f"{name}: {type(e).__name__}: {e}") from e
+        out[name] = figure_signature(fig)
+        plt.close(fig)
+    return out
+
+
+SCENARIOS = OrderedDict([
+    ('overview', run_overview),
+    ('assignments', run_assignments),
+    ('rankings', run_rankings),
+    ('model', run_model),
+    ('charts', run_charts),
+])
+
+
+# ---- comparing ---------------------------------------------------------------
+NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+def close(a, b, abs_tol=1e-9):
+    if a is None or b is None:
+        return a is b
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) and math.isnan(b)
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=abs_tol)
+
+
+def text_matches(expected, actual):
+    # same words, numbers equal up to one unit in the last printed digit
+    if expected == actual:
+        return True
+    e_parts, a_parts = NUMBER.split(expected), NUMBER.split(actual)
+    e_nums, a_nums = NUMBER.findall(expected), NUMBER.findall(actual)
+    if e_parts != a_parts or len(e_nums) != len(a_nums):
+        return False
+    for e, a in zip(e_nums, a_nums):
+        decimals = len(e.split('.')[1]) if '.' in e else 0
+        if not close(float(e), float(a), abs_tol=10 ** -decimals * 1.0001):
+            return False
+    return True
+
+
+def compare(expected, actual, path='', problems=None):
+    # -> list of "where: what" strings, empty when actual matches expected
+    if problems is None:
+        problems = []
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        if list(expected) != list(actual):
+            problems.append(f"{path}: keys {list(expected)} != {list(actual)}")
+        for key in expected:
+            if key in actual:
+                compare(expected[key], actual[key], f"{path}/{key}", problems)
+    elif isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            problems.append(f"{path}: {len(expected)} items != {len(actual)}")
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            compare(e, a, f"{path}[{i}]", problems)
+    elif isinstance(expected, str) and isinstance(actual, str):
+        if not text_matches(expected, actual):
+            problems.append(f"{path}: text differs{first_difference(expected, actual)}")
+    elif isinstance(expected, (int, float)) and isinstance(actual, (int, float)) \
+            and not isinstance(expected, bool):
+        if not close(float(expected), float(actual)):
+            problems.append(f"{path}: {expected!r} != {actual!r}")
+    elif expected != actual:
+        problems.append(f"{path}: {expected!r} != {actual!r}")
+    return problems
+
+
+def first_difference(expected, actual):
+    for i, (e, a) in enumerate(zip(expected.split("\n"), actual.split("\n"))):
+        if not text_matches(e, a):
+            return f" at line {i + 1}:\n      golden: {e.strip()}\n      now:    {a.strip()}"
+    return " (different number of lines)"
+
+
+# ---- measuring ---------------------------------------------------------------
+def measure(func, df):
+    # -> (output, best time in seconds, peak traced bytes)
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        output = func(df)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func(df)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return json.loads(json.dumps(output, default=plain)), best, peak
+
+
+def plain(value):
+    # numpy scalars/arrays -> JSON
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(type(value).__name__)
+
+
+def golden_path(dataset):
+    return os.path.join(GOLDEN_DIR, f"{dataset}.json")
+
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1, ensure_ascii=False)
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Golden-output and performance regression check")
+    parser.add_argument('--record', action='store_true', help="write golden outputs and budgets")
+    parser.add_argument('--record-budgets', action='store_true', help="only re-measure the budgets")
+    parser.add_argument('--no-budgets', action='store_true', help="skip the time/memory checks")
+    parser.add_argument('--datasets', nargs='+', choices=list(DATASETS), default=list(DATASETS))
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    args = parser.parse_args(argv)
+
+    budgets = load_json(BUDGETS_FILE, {})
+    failures = 0
+    for dataset in args.datasets:
+        df = DATASETS[dataset]()
+        golden = load_json(golden_path(dataset), {})
+        for scenario in args.scenarios:
+            try:
+                output, seconds, peak = measure(SCENARIOS[scenario], df)
+            except Exception as e:
+                failures += 1
+                print(f"✖ {dataset:<14} {scenario:<12} raised {type(e).__name__}: {e}")
+                continue
+            status = []
+            if args.record:
+                golden[scenario] = output
+            elif scenario not in golden:
+                status.append("no golden output (run with --record)")
+            else:
+                status += compare(golden[scenario], output, scenario)[:5]
+
+            budget = budgets.get(dataset, {}).get(scenario)
+            if args.record or args.record_budgets:
+                budgets.setdefault(dataset, {})[scenario] = {'seconds': round(seconds, 4), 'peak_bytes': peak}
+            elif budget is not None and not args.no_budgets:
+                if seconds > budget['seconds'] * TIME_SLACK + TIME_FLOOR:
+                    status.append(f"too slow: {seconds:.3f}s (budget {budget['seconds']:.3f}s)")
+                if peak > budget['peak_bytes'] * MEMORY_SLACK + MEMORY_FLOOR:
+                    status.append(f"too much memory: {peak / 1e6:.1f} MB "
+                                  f"(budget {budget['peak_bytes'] / 1e6:.1f} MB)")
+
+            failures += bool(status)
+            mark = "✖" if status else "✓"
+            print(f"{mark} {dataset:<14} {scenario:<12} {seconds * 1000:9.1f} ms {peak / 1e6:8.2f} MB")
+            for line in status:
+                print(f"    {line}")
+        if args.record:
+            save_json(golden_path(dataset), golden)
+    if args.record or args.record_budgets:
+        save_json(BUDGETS_FILE, budgets)
+        print(f"\nRecorded in {GOLDEN_DIR}")
+
+    print(f"\n{failures} failing" if failures else "\nAll scenarios match.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
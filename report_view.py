@@ -0,0 +1,195 @@
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkfont
+
+import numpy as np
+
+
+# ==============================================================================
+# VIRTUALIZED REPORT PANE
+# Long text reports (one block per assignment / per student) are kept as a list
+# of sections instead of one big string:
+#   * a section's text is only built when it is first shown (then cached), so
+#     opening a report with 500 assignments formats the few blocks on screen
+#   * the Text widget only ever holds the sections around the visible page;
+#     scrolling past them swaps in the next ones, the scrollbar covers the
+#     whole report
+#   * "Jump to" lists every labelled section
+# Open and scroll cost depend on the page size, not on the number of sections.
+# report.text() still gives the whole report (export, regression check).
+# ==============================================================================
+MARGIN_PAGES = 1     # pages rendered above and below the visible one
+MIN_PAGE = 20        # lines, before the widget has a size
+
+
+class Report:
+    def __init__(self):
+        self.renders = []
+        self.heights = []     # expected lines per section, corrected once rendered
+        self.labels = []
+        self._text = {}
+        self._offsets = None
+
+    def add(self, render, height, label=None):
+        # render() -> the section's text, called the first time it's needed
+        self.renders.append(render)
+        self.heights.append(height)
+        self.labels.append(label)
+        self._offsets = None
+
+    def add_text(self, text, label=None):
+        self.add(lambda: text, text.count("\n"), label)
+
+    def __len__(self):
+        return len(self.renders)
+
+    def section(self, i):
+        text = self._text.get(i)
+        if text is None:
+            text = self._text[i] = self.renders[i]()
+            lines = text.count("\n")
+            if lines != self.heights[i]:
+                self.heights[i] = lines
+                self._offsets = None
+        return text
+
+    def text(self):
+        return "".join(self.section(i) for i in range(len(self)))
+
+    def offsets(self):
+        # first line of every section, plus the total line count at the end
+        if self._offsets is None:
+            self._offsets = np.concatenate([[0], np.cumsum(self.heights, dtype=np.int64)])
+        return self._offsets
+
+    def total_lines(self):
+        return int(self.offsets()[-1])
+
+    def find(self, line):
+        # section containing a line of the whole report
+        i = int(np.searchsorted(self.offsets(), line, side='right')) - 1
+        return min(max(i, 0), max(len(self) - 1, 0))
+
+    def targets(self):
+        return [(label, i) for i, label in enumerate(self.labels) if label is not None]
+
+
+class ReportView(tk.Frame):
+    def __init__(self, master, jump=True, **text_options):
+        bg = text_options.get('bg', 'white')
+        super().__init__(master, bg=bg)
+        self.report = Report()
+        self.first = self.last = 0     # sections currently in the Text widget
+        self.top = 0                   # report line at the top of the page
+        self.job = None
+        self.jumps = []
+
+        self.jump_combo = None
+        if jump:
+            bar = tk.Frame(self, bg=bg)
+            bar.pack(fill=tk.X)
+            tk.Label(bar, text="Jump to:", bg=bg, font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=(10, 5), pady=4)
+            self.jump_combo = ttk.Combobox(bar, state="readonly", width=40)
+            self.jump_combo.pack(side=tk.LEFT, pady=4)
+            self.jump_combo.bind("<<ComboboxSelected>>", lambda e: self.jump_to(self.jump_combo.current()))
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text = tk.Text(self, yscrollcommand=self.on_view, **text_options)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.bind("<Configure>", lambda e: self.refresh())
+        self.linespace = tkfont.Font(font=self.text.cget('font')).metrics('linespace')
+
+    # ---- content -------------------------------------------------------------
+    def show(self, report):
+        self.report = report
+        self.top = 0
+        self.first = self.last = 0
+        self.jumps = report.targets()
+        if self.jump_combo is not None:
+            self.jump_combo['values'] = [label for label, _ in self.jumps]
+            self.jump_combo.set("")
+        self.refresh(force=True)
+
+    def show_text(self, text):
+        report = Report()
+        report.add_text(text)
+        self.show(report)
+
+    def get_text(self):
+        return self.report.text()
+
+    def jump_to(self, index):
+        if 0 <= index < len(self.jumps):
+            self.top = int(self.report.offsets()[self.jumps[index][1]])
+            self.refresh()
+
+    # ---- rendering -------------------------------------------------------------
+    def page(self):
+        return max(MIN_PAGE, self.text.winfo_height() // max(self.linespace, 1))
+
+    def window(self, page):
+        # sections needed for the page at self.top plus a margin on both sides
+        report = self.report
+        lo = report.find(self.top - page * MARGIN_PAGES)
+        hi = report.find(self.top + page * (1 + MARGIN_PAGES)) + 1
+        return lo, hi
+
+    def refresh(self, force=False):
+        self.job = None
+        report = self.report
+        page = self.page()
+        if not len(report):
+            self.replace("")
+            self.first = self.last = 0
+            self.scrollbar.set(0, 1)
+            return
+        self.top = max(0, min(self.top, report.total_lines() - page))
+        lo, hi = self.window(page)
+        if force or (lo, hi) != (self.first, self.last):
+            # building sections can correct their line counts: keep the page on
+            # the same line of the same section
+            anchor = report.find(self.top)
+            line = self.top - int(report.offsets()[anchor])
+            self.replace("".join(report.section(i) for i in range(lo, hi)))
+            self.first, self.last = lo, hi
+            self.top = int(report.offsets()[anchor]) + min(line, report.heights[anchor])
+        local = self.top - int(report.offsets()[self.first])
+        self.text.yview(f"{local + 1}.0")
+        self.update_scrollbar(page)
+
+    def replace(self, text):
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", text)
+        self.text.config(state=tk.DISABLED)
+
+    def update_scrollbar(self, page):
+        total = max(self.report.total_lines(), 1)
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + page) / total))
+
+    # ---- scrolling -------------------------------------------------------------
+    def on_view(self, *args):
+        # the Text widget scrolled itself (wheel, keys, selection drag)
+        if not len(self.report):
+            return
+        offsets = self.report.offsets()
+        local = int(self.text.index("@0,0").split(".")[0]) - 1
+        self.top = int(offsets[self.first]) + local
+        page = self.page()
+        self.update_scrollbar(page)
+        # swap sections in before the page reaches the end of what's rendered
+        near_top = self.first > 0 and self.top < offsets[self.first] + page // 2
+        near_end = self.last < len(self.report) and self.top + page > offsets[self.last] - page // 2
+        if (near_top or near_end) and self.job is None:
+            self.job = self.after_idle(self.refresh)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        total = self.report.total_lines()
+        if action == 'moveto':
+            self.top = int(float(amount) * total)
+        elif unit == 'pages':
+            self.top += int(amount) * self.page()
+        else:
+            self.top += int(amount)
+        self.refresh()
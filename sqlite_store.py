@@ -0,0 +1,340 @@
+import itertools
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from grading import PASS_MARK
+
+
+# ==============================================================================
+# SQLITE GRADEBOOK STORE (optional)
+# A gradebook is imported ONCE into a local SQLite file as long/narrow tables
+# (student, subject, score). After that searches, filters, per-subject
+# aggregates, quantiles and top/bottom-k run as indexed SQL, and the table
+# pages rows in on demand, so nothing has to fit in memory and the next
+# session starts without re-reading the CSV.
+# ==============================================================================
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS gradebooks (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    name_col TEXT
+);
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    gradebook_id INTEGER NOT NULL REFERENCES gradebooks(id),
+    row_no INTEGER NOT NULL,
+    name TEXT,
+    name_norm TEXT
+);
+CREATE TABLE IF NOT EXISTS subjects (
+    id INTEGER PRIMARY KEY,
+    gradebook_id INTEGER NOT NULL REFERENCES gradebooks(id),
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scores (
+    student_id INTEGER NOT NULL REFERENCES students(id),
+    subject_id INTEGER NOT NULL REFERENCES subjects(id),
+    score REAL NOT NULL,
+    PRIMARY KEY (student_id, subject_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_students_book_row ON students(gradebook_id, row_no);
+CREATE INDEX IF NOT EXISTS idx_students_name ON students(gradebook_id, name_norm);
+CREATE INDEX IF NOT EXISTS idx_scores_subject_score ON scores(subject_id, score);
+"""
+
+# filter operators (query_filter's spelling) -> SQL
+FILTER_OPS = {'<': '<', '<=': '<=', '>': '>', '>=': '>=', '==': '=', '=': '=', '!=': '!='}
+
+# same bands the Overview/Assignments tabs use
+BAND_SQL = """
+    SUM(score >= 90), SUM(score >= 80 AND score < 90), SUM(score >= 70 AND score < 80),
+    SUM(score >= 60 AND score < 70), SUM(score < 60)
+"""
+
+
+class GradebookStore:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # ---- import --------------------------------------------------------------
+    def find(self, source):
+        # id of an up-to-date import of this file, None if missing or changed since
+        size, mtime = file_signature(source)
+        row = self.conn.execute(
+            "SELECT id FROM gradebooks WHERE source = ? AND size IS ? AND mtime IS ?",
+            (os.path.abspath(source), size, mtime)).fetchone()
+        return row[0] if row else None
+
+    def import_file(self, path, reader=None, chunk_rows=50000):
+        existing = self.find(path)
+        if existing is not None:
+            return existing
+        if reader is not None:
+            return self.import_frame(reader(path), path, chunk_rows=chunk_rows)
+        if path.endswith('.csv'):
+            # streamed: one chunk in memory at a time, so files larger than RAM import
+            return self.import_chunks(pd.read_csv(path, chunksize=chunk_rows), path)
+        return self.import_frame(pd.read_excel(path), path, chunk_rows=chunk_rows)  # no chunked Excel reader
+
+    def import_frame(self, df, source, name_col=None, chunk_rows=50000):
+        # an empty frame still goes through once for its columns
+        chunks = (df.iloc[start:start + chunk_rows] for start in range(0, max(len(df), 1), chunk_rows))
+        return self.import_chunks(chunks, source, name_col)
+
+    def import_chunks(self, chunks, source, name_col=None):
+        # subjects and the name column come from the first chunk; later chunks
+        # are read against them (a stray text cell is a missing grade)
+        chunks = iter(chunks)
+        first = next(chunks)
+        subjects = first.select_dtypes(include=[np.number]).columns.tolist()
+        if name_col is None:
+            others = [c for c in first.columns if c not in subjects]
+            name_col = others[0] if others else None
+        size, mtime = file_signature(source)
+        source = os.path.abspath(source) if os.path.exists(source) else source
+
+        with self.conn:
+            # a changed file replaces its previous import
+            for (old_id,) in self.conn.execute("SELECT id FROM gradebooks WHERE source = ?", (source,)).fetchall():
+                self.delete(old_id)
+            cur = self.conn.execute(
+                "INSERT INTO gradebooks (source, size, mtime, name_col) VALUES (?, ?, ?, ?)",
+                (source, size, mtime, name_col))
+            book = cur.lastrowid
+            subject_ids = []
+            for pos, col in enumerate(subjects):
+                cur = self.conn.execute(
+                    "INSERT INTO subjects (gradebook_id, position, name) VALUES (?, ?, ?)", (book, pos, str(col)))
+                subject_ids.append(cur.lastrowid)
+            subject_ids = np.array(subject_ids, dtype=np.int64)
+
+            first_id = (self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM students").fetchone()[0]) + 1
+            start = 0
+            for part in itertools.chain([first], chunks):
+                ids = np.arange(first_id + start, first_id + start + len(part), dtype=np.int64)
+                if name_col is not None:
+                    names = part[name_col].astype(str).where(part[name_col].notna(), '').tolist()
+                else:
+                    names = [''] * len(part)
+                self.conn.executemany(
+                    "INSERT INTO students (id, gradebook_id, row_no, name, name_norm) VALUES (?, ?, ?, ?, ?)",
+                    zip(ids.tolist(), [book] * len(part), range(start, start + len(part)),
+                        names, [n.strip().lower() for n in names]))
+                # long format: one (student, subject, score) row per non-empty cell
+                values = part[subjects].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+                rows, cols = np.nonzero(~np.isnan(values))
+                self.conn.executemany(
+                    "INSERT INTO scores (student_id, subject_id, score) VALUES (?, ?, ?)",
+                    zip(ids[rows].tolist(), subject_ids[cols].tolist(), values[rows, cols].tolist()))
+                start += len(part)
+        self.conn.execute("ANALYZE")
+        return book
+
+    def delete(self, book):
+        self.conn.execute("DELETE FROM scores WHERE student_id IN (SELECT id FROM students WHERE gradebook_id = ?)", (book,))
+        self.conn.execute("DELETE FROM students WHERE gradebook_id = ?", (book,))
+        self.conn.execute("DELETE FROM subjects WHERE gradebook_id = ?", (book,))
+        self.conn.execute("DELETE FROM gradebooks WHERE id = ?", (book,))
+
+    def gradebooks(self):
+        return self.conn.execute("SELECT id, source FROM gradebooks ORDER BY id").fetchall()
+
+    # ---- metadata ------------------------------------------------------------
+    def subjects(self, book):
+        return [r[0] for r in self.conn.execute(
+            "SELECT name FROM subjects WHERE gradebook_id = ? ORDER BY position", (book,))]
+
+    def name_column(self, book):
+        row = self.conn.execute("SELECT name_col FROM gradebooks WHERE id = ?", (book,)).fetchone()
+        return row[0] if row and row[0] else 'student name'
+
+    def student_count(self, book, search=None, groups=None):
+        where, params = self._student_filter(book, search, groups)
+        return self.conn.execute(f"SELECT COUNT(*) FROM students WHERE {where}", params).fetchone()[0]
+
+    # ---- paging / search -----------------------------------------------------
+    def _name_filter(self, book, search):
+        if not search:
+            return "gradebook_id = ?", (book,)
+        # case-insensitive substring match on the normalised name, like the GUI search box
+        return ("gradebook_id = ? AND name_norm LIKE ? ESCAPE '\\'",
+                (book, '%' + escape_like(search.strip().lower()) + '%'))
+
+    def _student_filter(self, book, search=None, groups=None):
+        # name search AND a structured filter: OR-groups of AND-ed (subject, op, value)
+        # clauses, every clause an index range scan (filter_students)
+        where, params = self._name_filter(book, search)
+        if not groups:
+            return where, params
+        ors = []
+        for group in groups:
+            ands = []
+            for subject, op, value in group:
+                sql, clause_params = self.filter_students(book, subject, op, value)
+                ands.append(f"id IN ({sql})")
+                params += clause_params
+            ors.append("(" + " AND ".join(ands) + ")")
+        return f"{where} AND ({' OR '.join(ors)})", params
+
+    def page(self, book, after=None, limit=200, search=None, groups=None, before=None):
+        # DataFrame of up to `limit` students in file order, wide like the CSV and
+        # indexed by row number: the ones after row `after` (from the top when None)
+        # or, given `before`, the ones just before that row. Keyset paging: the
+        # (gradebook_id, row_no) index seeks to the key, however deep the page
+        where, params = self._student_filter(book, search, groups)
+        if before is not None:
+            students = self.conn.execute(
+                f"SELECT id, name, row_no FROM students WHERE {where} AND row_no < ? ORDER BY row_no DESC LIMIT ?",
+                params + (int(before), limit)).fetchall()[::-1]
+        else:
+            students = self.conn.execute(
+                f"SELECT id, name, row_no FROM students WHERE {where} AND row_no > ? ORDER BY row_no LIMIT ?",
+                params + (-1 if after is None else int(after), limit)).fetchall()
+        frame = self._wide(book, [s[:2] for s in students])
+        frame.index = pd.Index([s[2] for s in students], name='row_no')
+        return frame
+
+    def students_by_id(self, book, ids):
+        if len(ids) == 0:
+            return self._wide(book, [])
+        marks = ','.join('?' * len(ids))
+        rows = dict(self.conn.execute(f"SELECT id, name FROM students WHERE id IN ({marks})", list(ids)).fetchall())
+        return self._wide(book, [(i, rows[i]) for i in ids if i in rows])
+
+    def _wide(self, book, students):
+        subjects = self.subjects(book)
+        name_col = self.name_column(book)
+        ids = [s[0] for s in students]
+        grid = np.full((len(ids), len(subjects)), np.nan)
+        if ids:
+            marks = ','.join('?' * len(ids))
+            scores = self.conn.execute(
+                f"""SELECT sc.student_id, sub.position, sc.score FROM scores sc
+                    JOIN subjects sub ON sub.id = sc.subject_id
+                    WHERE sc.student_id IN ({marks})""", ids).fetchall()
+            if scores:
+                where = {sid: i for i, sid in enumerate(ids)}
+                sid, pos, val = zip(*scores)
+                grid[[where[s] for s in sid], list(pos)] = val
+        frame = pd.DataFrame(grid, columns=subjects)
+        frame.insert(0, name_col, [s[1] for s in students])
+        frame.index = pd.Index(ids, name='student_id')
+        return frame
+
+    def filter_students(self, book, subject, op, value):
+        # (SELECT of the ids of students whose score in `subject` satisfies
+        # `op value`, params); missing grades never match, like the in-memory filter
+        if op not in FILTER_OPS:
+            raise ValueError(f"'{op}' is not available in database mode")
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError(f"'{value}' is not a number") from None
+        return (f"""SELECT sc.student_id FROM scores sc JOIN subjects sub ON sub.id = sc.subject_id
+                    WHERE sub.gradebook_id = ? AND sub.name = ? AND sc.score {FILTER_OPS[op]} ?""",
+                (book, subject, value))
+
+    # ---- aggregates ----------------------------------------------------------
+    def subject_stats(self, book):
+        # one GROUP BY for every subject: count, mean, std, min, max and grade bands
+        rows = self.conn.execute(
+            f"""SELECT sub.name, COUNT(score), AVG(score), AVG(score * score), MIN(score), MAX(score),
+                       SUM(score >= ?), {BAND_SQL}
+                FROM subjects sub LEFT JOIN scores sc ON sc.subject_id = sub.id
+                WHERE sub.gradebook_id = ? GROUP BY sub.id ORDER BY sub.position""",
+            (PASS_MARK, book)).fetchall()
+        stats = []
+        for name, n, mean, mean_sq, lo, hi, n_pass, a, b, c, d, f in rows:
+            std = float(np.sqrt(max(mean_sq - mean * mean, 0) * n / (n - 1))) if n and n > 1 else float('nan')
+            stats.append({'subject': name, 'count': n, 'mean': mean, 'std': std, 'min': lo, 'max': hi,
+                          'passed': n_pass or 0, 'bands': (a or 0, b or 0, c or 0, d or 0, f or 0)})
+        return stats
+
+    def quantile(self, book, subject, q):
+        # walks idx_scores_subject_score to the q-th score, no sort of the column;
+        # subject=None is every score of the gradebook (one sort in SQLite)
+        if subject is None:
+            n = self.conn.execute(
+                """SELECT COUNT(score) FROM scores
+                   WHERE subject_id IN (SELECT id FROM subjects WHERE gradebook_id = ?)""", (book,)).fetchone()[0]
+            return self._kth(
+                """SELECT score FROM scores WHERE subject_id IN (SELECT id FROM subjects WHERE gradebook_id = ?)
+                   ORDER BY score""", (book,), n, q)
+        sub_id, n = self.conn.execute(
+            """SELECT sub.id, COUNT(sc.score) FROM subjects sub LEFT JOIN scores sc ON sc.subject_id = sub.id
+               WHERE sub.gradebook_id = ? AND sub.name = ?""", (book, subject)).fetchone()
+        return self._kth("SELECT score FROM scores WHERE subject_id = ? ORDER BY score", (sub_id,), n, q)
+
+    def student_average_quantile(self, book, q):
+        # q-th of the per-student averages (students with at least one score)
+        n = self.conn.execute(
+            """SELECT COUNT(DISTINCT sc.student_id) FROM students st JOIN scores sc ON sc.student_id = st.id
+               WHERE st.gradebook_id = ?""", (book,)).fetchone()[0]
+        return self._kth(
+            """SELECT AVG(sc.score) AS avg FROM students st JOIN scores sc ON sc.student_id = st.id
+               WHERE st.gradebook_id = ? GROUP BY st.id ORDER BY avg""", (book,), n, q)
+
+    def _kth(self, ordered_sql, params, n, q):
+        # value at quantile q of an ordered query with n rows, reading 2 of them
+        if not n:
+            return float('nan')
+        # linear interpolation between neighbours, same as pandas' default
+        pos = (n - 1) * q
+        lo = int(np.floor(pos))
+        vals = [r[0] for r in self.conn.execute(f"{ordered_sql} LIMIT 2 OFFSET ?", params + (lo,))]
+        if len(vals) == 1:
+            return vals[0]
+        return vals[0] + (vals[1] - vals[0]) * (pos - lo)
+
+    def overall_stats(self, book):
+        n, mean, mean_sq, lo, hi, a, b, c, d, f = self.conn.execute(
+            f"""SELECT COUNT(score), AVG(score), AVG(score * score), MIN(score), MAX(score), {BAND_SQL}
+                FROM scores WHERE subject_id IN (SELECT id FROM subjects WHERE gradebook_id = ?)""",
+            (book,)).fetchone()
+        std = float(np.sqrt(max(mean_sq - mean * mean, 0))) if n else float('nan')  # population std like np.std
+        return {'count': n, 'mean': mean, 'std': std, 'min': lo, 'max': hi,
+                'bands': (a or 0, b or 0, c or 0, d or 0, f or 0)}
+
+    def student_average_stats(self, book, at_risk_below=60):
+        return self.conn.execute(
+            """SELECT COUNT(*), AVG(avg), MIN(avg), MAX(avg), SUM(avg < ?) FROM (
+                   SELECT AVG(sc.score) AS avg FROM students st JOIN scores sc ON sc.student_id = st.id
+                   WHERE st.gradebook_id = ? GROUP BY st.id)""", (at_risk_below, book)).fetchone()
+
+    def top_k(self, book, k=10, ascending=False):
+        order = 'ASC' if ascending else 'DESC'
+        return self.conn.execute(
+            f"""SELECT st.id, st.name, AVG(sc.score) AS avg FROM students st
+                JOIN scores sc ON sc.student_id = st.id
+                WHERE st.gradebook_id = ? GROUP BY st.id ORDER BY avg {order}, st.row_no LIMIT ?""",
+            (book, k)).fetchall()
+
+    def histogram(self, book, subject, width=5):
+        # bin counts computed in SQL, only (bin start, count) pairs come back
+        return self.conn.execute(
+            """SELECT CAST(score / ? AS INTEGER) * ?, COUNT(*) FROM scores
+               WHERE subject_id = (SELECT id FROM subjects WHERE gradebook_id = ? AND name = ?)
+               GROUP BY 1 ORDER BY 1""", (width, width, book, subject)).fetchall()
+
+
+def file_signature(path):
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime
+    except OSError:
+        return None, None
+
+
+def escape_like(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
@@ -0,0 +1,134 @@
+import numpy as np
+
+
+# ==============================================================================
+# STUDENT STANDING (rank / percentile) + DRILL-DOWN PROFILES
+# Rankings used to be only the top/bottom 10. Here every student gets a rank
+# and a percentile for the overall average and for each subject, from ONE
+# argsort per column at load time:
+#   rank       - 1 = best, ties share the better rank (1, 2, 2, 4)
+#   percentile - share of the class below the student, ties counted half
+# Each column's sorted scores are kept as well, so the class distribution
+# (quartiles, mean, histogram) comes from the same sort. A student's profile
+# is then just indexing these arrays with the row position - no searching.
+# ==============================================================================
+OVERALL = 'Average'
+HIST_BINS = np.linspace(0, 100, 11)
+
+
+def rank_column(values):
+    # -> (rank, percentile, ascending valid scores); NaN for missing scores
+    x = np.asarray(values, dtype=float)
+    valid = ~np.isnan(x)
+    n = int(valid.sum())
+    rank = np.full(len(x), np.nan)
+    pct = np.full(len(x), np.nan)
+    if n == 0:
+        return rank, pct, np.empty(0)
+
+    # descending, missing last (argsort puts NaN at the end of -x too)
+    order = np.argsort(-x, kind='stable')[:n]
+    ranked = x[order]
+    starts = np.r_[True, ranked[1:] != ranked[:-1]]
+    group = np.cumsum(starts) - 1
+    first = np.flatnonzero(starts)          # position where each tie group starts
+    sizes = np.diff(np.r_[first, n])
+    rank[order] = first[group] + 1
+    ties = sizes[group]
+    below = n - first[group] - ties
+    pct[order] = 100.0 * (below + 0.5 * ties) / n
+    return rank, pct, ranked[::-1]
+
+
+def distribution(scores):
+    # class summary of one column from its already sorted valid scores
+    n = len(scores)
+    if n == 0:
+        return {'count': 0, 'mean': np.nan, 'min': np.nan, 'q1': np.nan,
+                'median': np.nan, 'q3': np.nan, 'max': np.nan,
+                'hist': np.zeros(len(HIST_BINS) - 1, dtype=int)}
+    q1, median, q3 = np.percentile(scores, [25, 50, 75])
+    hi = max(100.0, scores[-1])
+    return {'count': n, 'mean': scores.mean(), 'min': scores[0], 'q1': q1,
+            'median': median, 'q3': q3, 'max': scores[-1],
+            'hist': np.histogram(scores, bins=HIST_BINS * hi / 100)[0]}
+
+
+class Standing:
+    def __init__(self, matrix, subjects, averages, names=None):
+        # the grades are the caller's (cached, read-only) matrix, not a copy
+        self.grades = np.asarray(matrix)
+        self.averages = np.asarray(averages, dtype=float)
+        self.subjects = list(subjects)
+        self.columns = [OVERALL] + self.subjects
+        self.names = names
+        n_rows = len(self.averages)
+        self.rank = np.empty((n_rows, len(self.columns)))
+        self.pct = np.empty((n_rows, len(self.columns)))
+        self.dist = {}
+        for j, col in enumerate(self.columns):
+            self.rank[:, j], self.pct[:, j], ranked = rank_column(self.score_column(j))
+            self.dist[col] = distribution(ranked)
+
+    def __len__(self):
+        return len(self.averages)
+
+    def score_column(self, j):
+        # column j of the table: 0 is the overall average, then the subjects
+        return self.averages if j == 0 else self.grades[:, j - 1]
+
+    def table_columns(self):
+        # overall standing as extra table columns: {'Rank': ..., 'Percentile': ...}
+        return {'Rank': self.rank[:, 0], 'Percentile': self.pct[:, 0]}
+
+    def profile(self, position):
+        # everything the drill-down panel shows for one student (row position)
+        rows = []
+        for j, col in enumerate(self.columns):
+            rows.append({'column': col, 'score': float(self.score_column(j)[position]),
+                         'rank': self.rank[position, j], 'pct': self.pct[position, j],
+                         'of': self.dist[col]['count'], 'class': self.dist[col]})
+        name = self.names[position] if self.names is not None else f"Row {position + 1}"
+        return {'name': name, 'position': position, 'rows': rows}
+
+
+def profile_text(profile):
+    lines = [f"{profile['name']}", "=" * 60,
+             f"{'':<18}{'Score':>8}{'Rank':>12}{'Pctl':>8}{'Class avg':>12}"]
+    for r in profile['rows']:
+        if np.isnan(r['score']):
+            lines.append(f"{r['column'][:17]:<18}{'-':>8}")
+            continue
+        rank = f"{int(r['rank'])}/{r['of']}"
+        lines.append(f"{r['column'][:17]:<18}{r['score']:>8.1f}{rank:>12}"
+                     f"{r['pct']:>7.0f}%{r['class']['mean']:>12.1f}")
+    return "\n".join(lines)
+
+
+def profile_figure(profile, figsize=(6, 4.5)):
+    # each subject's class spread (min-max line, Q1-Q3 box, median tick)
+    # with the student's score on top
+    from matplotlib.figure import Figure
+    rows = profile['rows']
+    fig = Figure(figsize=figsize, dpi=100)
+    ax = fig.add_subplot(111)
+    y = np.arange(len(rows))[::-1]
+    for yi, r in zip(y, rows):
+        d = r['class']
+        if d['count'] == 0:
+            continue
+        ax.plot([d['min'], d['max']], [yi, yi], color='#bdc3c7', linewidth=1.5, zorder=1)
+        ax.barh(yi, d['q3'] - d['q1'], left=d['q1'], height=0.5,
+                color='#AED6F1', edgecolor='slategrey', zorder=2)
+        ax.plot([d['median'], d['median']], [yi - 0.25, yi + 0.25], color='#2E86C1', linewidth=2, zorder=3)
+        if not np.isnan(r['score']):
+            color = '#27ae60' if r['pct'] >= 50 else '#e74c3c'
+            ax.scatter([r['score']], [yi], s=70, color=color, edgecolor='black', zorder=4)
+            ax.text(r['score'], yi + 0.32, f"{r['pct']:.0f}%", ha='center', fontsize=8)
+    ax.set_yticks(y)
+    ax.set_yticklabels([r['column'][:12] for r in rows])
+    ax.set_xlabel('Score')
+    ax.set_title(f"{profile['name']} vs class", fontsize=13, fontweight='bold')
+    ax.grid(axis='x', alpha=0.3)
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,341 @@
+import argparse
+import asyncio
+import io
+import json
+import math
+import multiprocessing
+import os
+import signal
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from grading import PASS_MARK
+from binning import histogram_edges
+from gradebook_stats import (overview_stats, assignment_stats, rankings, pass_report,
+                             gpa_report, row_averages, frame_parts)
+
+
+# ==============================================================================
+# LOCAL STATS SERVER
+# Serves the numbers the GUI shows (overview, per-assignment stats, rankings,
+# pass rates, GPA) as JSON, and charts as PNG, over plain HTTP on localhost.
+#   * gradebooks are read once and kept until the file changes (size/mtime)
+#   * responses are cached by (file version, path, query)
+#   * the pandas work runs in a thread pool so the asyncio loop keeps accepting
+#     connections; identical requests in flight share one result
+#   * charts are drawn in a process pool: matplotlib holds the GIL while it
+#     draws, so in threads one chart would stall every other request
+#   * chart width/height/dpi are bounded (CHART_LIMITS), anything outside is a 400
+#
+#   python stats_server.py "project Final.csv" --port 8765
+#   curl "http://127.0.0.1:8765/overview"
+#   curl "http://127.0.0.1:8765/chart.png?subject=MATH" > math.png
+# ==============================================================================
+ROUTES = ('/overview', '/assignments', '/rankings', '/pass_rates', '/gpa', '/chart.png', '/files')
+CHART_LIMITS = {'width': (1.0, 20.0, 6.0), 'height': (1.0, 20.0, 4.5), 'dpi': (20, 300, 100)}  # low, high, default
+
+
+class Gradebook:
+    def __init__(self, path):
+        self.path = path
+        self.signature = file_signature(path)
+        df = pd.read_csv(path) if path.endswith('.csv') else pd.read_excel(path)
+        df.columns = df.columns.str.strip()
+        self.df = df
+        self.matrix, self.columns, self.names = frame_parts(df)
+        self.averages = row_averages(self.matrix)
+
+
+class StatsServer:
+    def __init__(self, files, cache_entries=256, workers=None, chart_workers=None):
+        self.files = {os.path.basename(f): os.path.abspath(f) for f in files}
+        self.default = os.path.basename(files[0]) if files else None
+        self.books = {}
+        self.cache = OrderedDict()
+        self.cache_entries = cache_entries
+        self.in_flight = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        # spawned, not forked: the parent already runs an event loop and threads
+        self.chart_executor = ProcessPoolExecutor(max_workers=chart_workers,
+                                                  mp_context=multiprocessing.get_context('spawn'))
+        self.hits = 0
+        self.misses = 0
+
+    # ---- data ----------------------------------------------------------------
+    def gradebook(self, name):
+        if name not in self.files:
+            raise KeyError(f"Unknown file: {name}")
+        path = self.files[name]
+        book = self.books.get(name)
+        if book is None or book.signature != file_signature(path):
+            book = Gradebook(path)
+            self.books[name] = book
+        return book
+
+    def compute(self, route, name, query):
+        # runs in the executor; returns (content type, body bytes)
+        if route == '/files':
+            return 'application/json', to_json(sorted(self.files))
+        book = self.gradebook(name)
+        if route == '/overview':
+            data = overview_stats(book.matrix, book.averages)
+        elif route == '/assignments':
+            data = assignment_stats(book.matrix, book.columns)
+        elif route == '/rankings':
+            data = rankings(book.matrix, book.names, book.averages, k=rank_count(query, len(book.names)))
+        elif route == '/pass_rates':
+            data = pass_report(book.matrix, book.columns, book.averages,
+                               pass_mark=float(query.get('pass_mark', PASS_MARK)))
+        elif route == '/gpa':
+            data = gpa_report(book.averages, book.names)
+        else:
+            raise KeyError(route)
+        return 'application/json', to_json(data)
+
+    async def respond(self, route, query):
+        name = query.get('file', self.default)
+        version = file_signature(self.files[name]) if name in self.files else None
+        key = (route, name, version, tuple(sorted(query.items())))
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return self.cache[key]
+        if key in self.in_flight:
+            return await self.in_flight[key]
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        if route == '/chart.png':
+            if name not in self.files:
+                raise KeyError(f"Unknown file: {name}")
+            chart_size(query)     # refuse oversized charts before they reach a worker
+            future = loop.run_in_executor(self.chart_executor, chart_png, self.files[name], query)
+        else:
+            future = loop.run_in_executor(self.executor, self.compute, route, name, query)
+        self.in_flight[key] = future
+        try:
+            result = await future
+        finally:
+            self.in_flight.pop(key, None)
+        self.cache[key] = result
+        if len(self.cache) > self.cache_entries:
+            self.cache.popitem(last=False)
+        return result
+
+    # ---- HTTP ----------------------------------------------------------------
+    async def handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while True:  # skip headers, we only need the request line
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2 or parts[0] != 'GET':
+                await send(writer, 405, 'application/json', to_json({'error': 'only GET is supported'}))
+                return
+            url = urlsplit(parts[1])
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if url.path not in ROUTES:
+                await send(writer, 404, 'application/json',
+                           to_json({'error': 'not found', 'routes': list(ROUTES)}))
+                return
+            try:
+                content_type, body = await self.respond(url.path, query)
+            except (KeyError, ValueError) as e:
+                message = e.args[0] if e.args else str(e)
+                await send(writer, 400, 'application/json', to_json({'error': str(message)}))
+                return
+            await send(writer, 200, content_type, body)
+        except Exception as e:
+            await send(writer, 500, 'application/json', to_json({'error': str(e)}))
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        return server
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        # wait for the chart processes, or they outlive the server
+        self.chart_executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def send(writer, status, content_type, body):
+    reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+              405: 'Method Not Allowed', 500: 'Internal Server Error'}[status]
+    head = (f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n")
+    writer.write(head.encode('latin-1') + body)
+    await writer.drain()
+
+
+def rank_count(query, n_students):
+    # students listed from each end: at least 1, at most the whole roster
+    try:
+        k = int(query.get('k', 10))
+    except ValueError:
+        raise ValueError("k must be a whole number") from None
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    return min(k, n_students)
+
+
+_chart_books = {}    # path -> Gradebook, kept by each chart process
+
+
+def chart_png(path, query):
+    # runs in a chart process; returns (content type, body bytes) like compute()
+    book = _chart_books.get(path)
+    if book is None or book.signature != file_signature(path):
+        book = _chart_books[path] = Gradebook(path)
+    return 'image/png', render_chart(book, query)
+
+
+def chart_size(query):
+    # -> (width, height, dpi) from the query, ValueError outside CHART_LIMITS
+    size = []
+    for key, (low, high, default) in CHART_LIMITS.items():
+        try:
+            value = type(default)(query.get(key, default))
+        except ValueError:
+            raise ValueError(f"{key} must be a number") from None
+        if not low <= value <= high:      # NaN fails too
+            raise ValueError(f"{key} must be between {low:g} and {high:g}")
+        size.append(value)
+    return tuple(size)
+
+
+def render_chart(book, query):
+    kind = query.get('kind', 'hist')
+    width, height, dpi = chart_size(query)
+    fig = Figure(figsize=(width, height), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    if kind == 'comparison':
+        means = np.nanmean(book.matrix, axis=0) if book.matrix.size else []
+        ax.bar(book.columns, means, color='#3498db', alpha=0.8, edgecolor='black')
+        ax.set_ylabel('Average Score')
+        ax.set_title('Assignment Comparison')
+    else:
+        subject = query.get('subject', book.columns[0] if book.columns else None)
+        if subject not in book.columns:
+            raise KeyError(f"Unknown subject: {subject}")
+        data = book.matrix[:, book.columns.index(subject)]
+        data = data[~np.isnan(data)]
+        if kind == 'pass_fail':
+            pass_mark = float(query.get('pass_mark', PASS_MARK))
+            passed = int(np.sum(data >= pass_mark))
+            ax.pie([passed, len(data) - passed], labels=['Pass', 'Fail'],
+                   colors=['#5DADE2', '#E74C3C'], autopct='%1.1f%%', startangle=90)
+            ax.set_title(f'Pass/Fail ({subject})')
+        else:
+            ax.hist(data, bins=histogram_edges(data), color='#5DADE2', edgecolor='slategrey')
+            ax.set_title(f'{subject} Distribution')
+            ax.set_xlabel('Score')
+            ax.set_ylabel('Frequency')
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')
+    return buf.getvalue()
+
+
+def to_json(data):
+    return json.dumps(clean(data)).encode('utf-8')
+
+
+def clean(value):
+    # JSON has no NaN / numpy types
+    if isinstance(value, dict):
+        return {str(k): clean(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [clean(v) for v in value]
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return None if math.isnan(value) else float(value)
+    return value
+
+
+def file_signature(path):
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime
+    except OSError:
+        return None
+
+
+# ---- benchmark: concurrent GETs against a running server ---------------------
+async def fetch(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return int(data.split(b' ', 2)[1])
+
+
+async def benchmark(host, port, paths, requests, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with sem:
+            start = time.perf_counter()
+            status = await fetch(host, port, paths[i % len(paths)])
+            latencies.append(time.perf_counter() - start)
+            return status
+
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    lat = np.array(latencies) * 1000
+    print(f"{requests} requests, concurrency {concurrency}: {elapsed:.2f}s "
+          f"({requests / elapsed:.0f} req/s), p50 {np.percentile(lat, 50):.1f}ms, "
+          f"p95 {np.percentile(lat, 95):.1f}ms, errors {sum(s != 200 for s in statuses)}")
+
+
+async def main(args):
+    stats = StatsServer(args.files)
+    server = await stats.serve(args.host, args.port)
+    print(f"Serving {', '.join(stats.files)} on http://{args.host}:{args.port}")
+    try:
+        async with server:
+            if args.bench:
+                paths = ['/overview', '/assignments', '/rankings', '/pass_rates', '/gpa', '/chart.png']
+                await benchmark(args.host, args.port, paths, args.bench, args.concurrency)
+                print(f"cache hits {stats.hits}, misses {stats.misses}")
+                return
+            serving = asyncio.ensure_future(server.serve_forever())
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                # stop serving so the chart processes are shut down below
+                loop.add_signal_handler(sig, serving.cancel)
+            await asyncio.wait({serving})
+            if not serving.cancelled():
+                serving.result()
+    finally:
+        stats.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local JSON/PNG gradebook statistics server")
+    parser.add_argument('files', nargs='*', default=['project.csv'])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--bench', type=int, default=0,
+                        help="fire this many concurrent requests at the server and exit")
+    parser.add_argument('--concurrency', type=int, default=32)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+
+# ==============================================================================
+# THRESHOLD INDEX
+# Every subject column is sorted ONCE. After that "how many students scored at
+# or above t" is a binary search (np.searchsorted) instead of a full scan, so
+# pass-mark sliders and cumulative "N+" charts can ask for any threshold live.
+# ==============================================================================
+class ThresholdIndex:
+    def __init__(self, df, subjects=None):
+        if subjects is None:
+            subjects = df.select_dtypes(include=[np.number]).columns.tolist()
+        self.subjects = list(subjects)
+        self.sorted_scores = {}
+        for col in self.subjects:
+            scores = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            # empty cells are not students that passed or failed, leave them out
+            self.sorted_scores[col] = np.sort(scores[~np.isnan(scores)])
+
+    def add_series(self, name, series):
+        # extra columns that are not in the frame (e.g. a per-row average)
+        scores = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        self.sorted_scores[name] = np.sort(scores[~np.isnan(scores)])
+        if name not in self.subjects:
+            self.subjects.append(name)
+
+    def valid_count(self, subject):
+        return len(self.sorted_scores[subject])
+
+    def count_at_least(self, subject, thresholds):
+        # works for a single threshold or an array of them
+        scores = self.sorted_scores[subject]
+        below = np.searchsorted(scores, thresholds, side='left')
+        return len(scores) - below
+
+    def pass_fail(self, subject, threshold=50):
+        passed = int(self.count_at_least(subject, threshold))
+        failed = self.valid_count(subject) - passed
+        return passed, failed
+
+    def count_matrix(self, thresholds, subjects=None):
+        # rows = subjects, columns = thresholds
+        if subjects is None:
+            subjects = self.subjects
+        thresholds = np.asarray(thresholds, dtype=float)
+        counts = np.empty((len(subjects), len(thresholds)), dtype=np.int64)
+        for i, col in enumerate(subjects):
+            counts[i] = self.count_at_least(col, thresholds)
+        return counts
+
+    def rate_matrix(self, thresholds, subjects=None):
+        # same as count_matrix but as a percentage of the students with a score
+        if subjects is None:
+            subjects = self.subjects
+        counts = self.count_matrix(thresholds, subjects)
+        totals = np.array([self.valid_count(c) for c in subjects], dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = counts / totals[:, None] * 100
+        return np.nan_to_num(rates)
+
+    def cumulative_counts(self, subject, thresholds):
+        # {'90+': 12, '70+': 30, ...} like the old df;ou.py loop built
+        counts = self.count_at_least(subject, np.asarray(thresholds, dtype=float))
+        return {f'{t}+': int(c) for t, c in zip(thresholds, counts)}
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+
+# ==============================================================================
+# LOAD-TIME VALIDATION
+# One pass over a freshly loaded gradebook, column-at-a-time (no row loops):
+#   * non_numeric  - text in a grade column ("absent", "9O") that pd.to_numeric
+#                    would silently turn into NaN
+#   * out_of_range - grades below 0 or above 100
+#   * duplicate    - the same student twice once names are trimmed/lower-cased
+#   * untrimmed    - names with leading/trailing/double spaces (" Wael Sedky")
+#   * empty_row / empty_column - nothing in them at all
+# The report keeps the row indices (df.index labels) per problem, and fix()
+# applies the safe repairs so the stats and chart code only see clean data.
+# ==============================================================================
+LOW, HIGH = 0, 100
+NUMERIC_SHARE = 0.5   # a column is a grade column when at least half its cells are numbers
+
+
+class ValidationReport:
+    def __init__(self, grade_cols, name_col):
+        self.grade_cols = grade_cols
+        self.name_col = name_col
+        self.issues = []   # (kind, column or None, row labels)
+
+    def add(self, kind, column, rows):
+        if len(rows):
+            self.issues.append((kind, column, list(rows)))
+
+    @property
+    def ok(self):
+        return not self.issues
+
+    def rows(self, kind=None):
+        # every row label with a problem (of one kind)
+        out = set()
+        for k, _, rows in self.issues:
+            if kind is None or k == kind:
+                out.update(rows)
+        return sorted(out, key=str)
+
+    def count(self, kind=None):
+        return sum(len(rows) for k, _, rows in self.issues if kind is None or k == kind)
+
+    def text(self, limit=8):
+        if self.ok:
+            return "No problems found."
+        labels = {
+            'non_numeric': "non-numeric grade",
+            'out_of_range': f"grade outside {LOW}-{HIGH}",
+            'duplicate': "duplicate student",
+            'untrimmed': "name with extra spaces",
+            'empty_row': "empty row",
+            'empty_column': "empty column",
+        }
+        lines = []
+        for kind, column, rows in self.issues:
+            where = f" in {column}" if column is not None and kind != 'empty_column' else ""
+            if kind == 'empty_column':
+                lines.append(f"• {labels[kind]}: {column}")
+                continue
+            shown = ", ".join(str(r) for r in rows[:limit])
+            more = f" (+{len(rows) - limit} more)" if len(rows) > limit else ""
+            lines.append(f"• {len(rows)} × {labels[kind]}{where}: rows {shown}{more}")
+        return "\n".join(lines)
+
+
+def guess_grade_columns(df, parsed=None, blank=None):
+    # numeric dtype, or mostly numbers with a few bad cells (read as object)
+    cols = []
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            cols.append(col)
+            continue
+        if blank is not None:
+            filled = (~blank[col]).sum()
+        else:
+            filled = (df[col].notna() & (df[col].astype(str).str.strip() != '')).sum()
+        if filled == 0:
+            continue
+        numbers = parsed[col] if parsed is not None else pd.to_numeric(df[col], errors='coerce')
+        if numbers.notna().sum() >= NUMERIC_SHARE * filled:
+            cols.append(col)
+    return cols
+
+
+def clean_names(names):
+    # trimmed and single-spaced; the regex only runs on names that need it
+    text = names.astype(str).str.strip()
+    inner = text.str.contains(r'\s\s', regex=True)
+    if inner.any():
+        text = text.copy()
+        text[inner] = text[inner].str.replace(r'\s+', ' ', regex=True)
+    return text
+
+
+def normalize_names(names):
+    # trimmed, single-spaced, case-insensitive
+    return clean_names(names).str.casefold()
+
+
+def name_column(df, grade_cols):
+    if 'student name' in df.columns:
+        return 'student name'
+    others = [c for c in df.columns if c not in grade_cols]
+    return others[0] if others else None
+
+
+def validate(df, grade_cols=None, name_col=None, low=LOW, high=HIGH):
+    # every text column is stripped and parsed once and reused by all the checks
+    text_cols = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]
+    parsed = {c: pd.to_numeric(df[c], errors='coerce') for c in text_cols}
+    blank = df.isna()
+    for col in text_cols:
+        blank[col] = blank[col] | (df[col].astype(str).str.strip() == '')
+
+    if grade_cols is None:
+        grade_cols = guess_grade_columns(df, parsed, blank)
+    if name_col is None:
+        name_col = name_column(df, grade_cols)
+    report = ValidationReport(list(grade_cols), name_col)
+    index = df.index.to_numpy()
+
+    if len(grade_cols):
+        values = pd.DataFrame({c: parsed[c] if c in parsed else df[c] for c in grade_cols})
+        bad_text = values.isna().to_numpy() & ~blank[grade_cols].to_numpy()
+        with np.errstate(invalid='ignore'):
+            x = values.to_numpy(dtype=float, na_value=np.nan)
+            out_of_range = (x < low) | (x > high)
+        for j, col in enumerate(grade_cols):
+            report.add('non_numeric', col, index[bad_text[:, j]])
+            report.add('out_of_range', col, index[out_of_range[:, j]])
+
+    if name_col is not None:
+        names = df[name_col]
+        present = names.notna().to_numpy()
+        clean = clean_names(names)
+        dup = clean.str.casefold().duplicated(keep=False).to_numpy() & present
+        report.add('duplicate', name_col, index[dup])
+        untrimmed = (names.astype(str) != clean).to_numpy() & present
+        report.add('untrimmed', name_col, index[untrimmed])
+
+    all_blank_rows = blank.all(axis=1).to_numpy()
+    report.add('empty_row', None, index[all_blank_rows])
+    for col in df.columns[blank.all(axis=0).to_numpy()]:
+        report.add('empty_column', col, [col])
+
+    return report
+
+
+def fix(df, report, out_of_range='blank', drop_duplicates=False, low=LOW, high=HIGH):
+    # returns a cleaned copy:
+    #   names trimmed, empty rows/columns dropped, grade columns made numeric
+    #   (bad text -> NaN), out-of-range grades blanked (or clipped with out_of_range='clip'),
+    #   and with drop_duplicates=True only the first row of each duplicate student kept
+    out = df.copy()
+    empty_cols = [c for kind, c, _ in report.issues if kind == 'empty_column']
+    out = out.drop(columns=empty_cols)
+    out = out.drop(index=report.rows('empty_row'))
+
+    grade_cols = [c for c in report.grade_cols if c in out.columns]
+    if grade_cols:
+        values = out[grade_cols].apply(pd.to_numeric, errors='coerce')
+        if out_of_range == 'clip':
+            values = values.clip(lower=low, upper=high)
+        else:
+            values = values.mask((values < low) | (values > high))
+        out[grade_cols] = values
+
+    name_col = report.name_col
+    if name_col is not None and name_col in out.columns:
+        present = out[name_col].notna()
+        out.loc[present, name_col] = clean_names(out.loc[present, name_col])
+        if drop_duplicates:
+            out = out[~(normalize_names(out[name_col]).duplicated() & present)]
+    return out
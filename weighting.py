@@ -0,0 +1,193 @@
+import json
+import os
+
+import numpy as np
+
+from grading import PASS_MARK, gpa_points, passed
+
+
+# ==============================================================================
+# WEIGHTED GRADING
+# Averages the way the courses are actually graded: every subject has a weight
+# (credit hours), subjects can be grouped into categories with their own weight
+# (e.g. Exams 60 / Coursework 40), and a category can drop each student's
+# lowest N grades.
+# Everything is done for all students at once:
+#   * drop-lowest-N = one np.argpartition per category over the rows
+#   * category averages = grades @ weight matrix / (has grade) @ weight matrix,
+#     so missing grades are left out and the remaining weights renormalise
+#   * overall average = the same product again over the category averages
+# With no config every weight is 1 and this is the plain mean(axis=1).
+#
+# A gradebook's config is the weights.json next to its file (weights_path);
+# checked() compares it with the gradebook's subjects and falls back to the
+# plain mean when none of the weighted subjects are there.
+#
+# weights.json (see weights_example.json):
+#   {"credits": {"CS101": 3, "CS102": 3, "ENG102": 2, "MATH": 4, "SSC1": 2},
+#    "categories": {"Core": {"weight": 70, "columns": ["CS101", "CS102", "MATH"]},
+#                   "Electives": {"weight": 30, "columns": ["ENG102", "SSC1"],
+#                                 "drop_lowest": 1}}}
+# ==============================================================================
+WEIGHTS_FILE = 'weights.json'
+
+
+class WeightScheme:
+    def __init__(self, credits=None, categories=None, drop_lowest=0, default_credit=1.0):
+        self.credits = dict(credits or {})
+        self.default_credit = float(default_credit)
+        # name -> {'weight', 'columns' (None = every column), 'drop_lowest'}
+        if categories:
+            self.categories = {
+                name: {'weight': float(c.get('weight', 1)),
+                       'columns': list(c['columns']),
+                       'drop_lowest': int(c.get('drop_lowest', 0))}
+                for name, c in categories.items()
+            }
+        else:
+            self.categories = {'All': {'weight': 1.0, 'columns': None,
+                                       'drop_lowest': int(drop_lowest)}}
+        self._matrices = {}
+
+    @classmethod
+    def from_dict(cls, config):
+        return cls(credits=config.get('credits'), categories=config.get('categories'),
+                   drop_lowest=config.get('drop_lowest', 0),
+                   default_credit=config.get('default_credit', 1.0))
+
+    def is_plain(self):
+        return (not self.credits and len(self.categories) == 1 and 'All' in self.categories
+                and self.categories['All']['drop_lowest'] == 0)
+
+    def weight_matrix(self, columns):
+        # (subjects x categories) credit weights, 0 where a subject isn't in the category
+        key = tuple(columns)
+        if key not in self._matrices:
+            credit = np.array([float(self.credits.get(c, self.default_credit)) for c in columns])
+            member = np.zeros((len(columns), len(self.categories)))
+            for k, cat in enumerate(self.categories.values()):
+                wanted = columns if cat['columns'] is None else cat['columns']
+                member[:, k] = [c in wanted for c in columns]
+            self._matrices[key] = credit[:, None] * member
+        return self._matrices[key]
+
+    def category_weights(self):
+        return np.array([c['weight'] for c in self.categories.values()])
+
+    def category_averages(self, matrix, columns):
+        x = np.asarray(matrix, dtype=float)
+        W = self.weight_matrix(columns)
+        out = np.full((x.shape[0], len(self.categories)), np.nan)
+        for k, cat in enumerate(self.categories.values()):
+            cols = np.nonzero(W[:, k])[0]
+            if len(cols) == 0:
+                continue
+            sub = drop_lowest(x[:, cols], cat['drop_lowest'])
+            out[:, k] = weighted_mean(sub, W[cols, k])
+        return out
+
+    def averages(self, matrix, columns):
+        x = np.asarray(matrix, dtype=float)
+        if len(self.categories) == 1:
+            return self.category_averages(x, columns)[:, 0]
+        return weighted_mean(self.category_averages(x, columns), self.category_weights())
+
+    def gpa(self, matrix, columns):
+        return gpa_points(self.averages(matrix, columns))
+
+    def status(self, matrix, columns, pass_mark=PASS_MARK):
+        return np.where(passed(self.averages(matrix, columns), pass_mark), 'Pass', 'Fail')
+
+    def fits(self, columns):
+        # at least one category averages a subject of this gradebook
+        return any(cat['columns'] is None or any(c in columns for c in cat['columns'])
+                   for cat in self.categories.values())
+
+    def problems(self, columns):
+        # ways the config doesn't match a gradebook's subjects, one line each
+        columns = list(columns)
+        out = []
+        listed = set()
+        for name, cat in self.categories.items():
+            if cat['columns'] is None:
+                listed.update(columns)
+                continue
+            listed.update(cat['columns'])
+            missing = [c for c in cat['columns'] if c not in columns]
+            if len(missing) == len(cat['columns']):
+                out.append(f"category '{name}' has none of its subjects here")
+            elif missing:
+                out.append(f"category '{name}' is missing {', '.join(missing)}")
+        unused = [c for c in columns if c not in listed]
+        if unused:
+            out.append(f"not in any category, left out of the average: {', '.join(unused)}")
+        unknown = [c for c in self.credits if c not in columns]
+        if unknown:
+            out.append(f"credits for subjects that aren't here: {', '.join(unknown)}")
+        return out
+
+    def describe(self, columns=None):
+        # one line per category for the report headers
+        lines = []
+        for name, cat in self.categories.items():
+            cols = cat['columns'] if cat['columns'] is not None else (columns or [])
+            parts = [f"{c}×{self.credits.get(c, self.default_credit):g}" for c in cols]
+            line = f"{name} ({cat['weight']:g}): " + (', '.join(parts) if parts else 'all subjects')
+            if cat['drop_lowest']:
+                line += f", drop lowest {cat['drop_lowest']}"
+            lines.append(line)
+        return lines
+
+
+def weighted_mean(matrix, weights):
+    # NaN-aware row means with per-column weights as two matrix-vector products
+    x = np.asarray(matrix, dtype=float)
+    w = np.asarray(weights, dtype=float)
+    valid = ~np.isnan(x)
+    total = np.where(valid, x, 0.0) @ w
+    weight = valid @ w
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(weight > 0, total / weight, np.nan)
+
+
+def drop_lowest(matrix, n):
+    # blank out each row's n lowest grades, always keeping at least one grade
+    x = np.array(matrix, dtype=float)
+    if n <= 0 or x.shape[1] < 2:
+        return x
+    n = min(n, x.shape[1] - 1)
+    filled = np.where(np.isnan(x), np.inf, x)
+    lowest = np.argpartition(filled, n - 1, axis=1)[:, :n]
+    # argpartition leaves the n smallest unordered; order them so rows that may
+    # only drop fewer than n take the smallest ones
+    order = np.argsort(np.take_along_axis(filled, lowest, axis=1), axis=1, kind='stable')
+    lowest = np.take_along_axis(lowest, order, axis=1)
+    allowed = np.clip((~np.isnan(x)).sum(axis=1) - 1, 0, n)
+    drop = np.arange(n) < allowed[:, None]
+    rows = np.broadcast_to(np.arange(x.shape[0])[:, None], lowest.shape)
+    x[rows[drop], lowest[drop]] = np.nan
+    return x
+
+
+def weights_path(data_path):
+    # the weights.json belonging to a gradebook file: the one in the same folder
+    return os.path.join(os.path.dirname(os.path.abspath(data_path)), WEIGHTS_FILE)
+
+
+def load_scheme(path):
+    # plain equal weights when there is no config file
+    if not path or not os.path.exists(path):
+        return WeightScheme()
+    with open(path, encoding='utf-8') as f:
+        return WeightScheme.from_dict(json.load(f))
+
+
+def checked(scheme, columns):
+    # -> (scheme to use, problems); None (the plain mean) when the config
+    # doesn't weight any subject of this gradebook
+    if scheme is None:
+        return None, []
+    problems = scheme.problems(columns)
+    if not scheme.fits(columns):
+        return None, problems + ["none of the weighted subjects are here: using plain averages"]
+    return scheme, problems
@@ -0,0 +1,215 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from grading import PASS_MARK
+
+
+# ==============================================================================
+# MULTI-GRADEBOOK WORKSPACE
+# Several sections (gradebooks) open in one app instead of one app per file.
+# All of them share the same stats code and a subject dictionary, so "Math",
+# "MATH" and "math " from different exports line up as one subject.
+# Comparing sections never concatenates their frames: every section keeps a
+# small aggregate per subject (count, sum, sum of squares, min, max, passes,
+# histogram on common 0-100 bins), built once per model version. Pooled
+# numbers are sums of those aggregates.
+# ==============================================================================
+OVERALL = 'Average'
+EDGES = np.linspace(0, 100, 21)   # common bins so histograms can be overlaid/summed
+
+
+def subject_key(name):
+    return " ".join(str(name).split()).casefold()
+
+
+class SubjectDictionary:
+    # normalised subject name -> the spelling first seen
+    def __init__(self):
+        self.names = OrderedDict()
+
+    def canonical(self, name):
+        key = subject_key(name)
+        if key not in self.names:
+            self.names[key] = " ".join(str(name).split())
+        return self.names[key]
+
+    def __len__(self):
+        return len(self.names)
+
+
+class Aggregate:
+    # everything the comparison needs about one subject in one section
+    def __init__(self, values, pass_mark=PASS_MARK):
+        x = np.asarray(values, dtype=float)
+        x = x[~np.isnan(x)]
+        self.count = len(x)
+        self.total = float(x.sum())
+        self.squares = float((x * x).sum())
+        self.min = float(x.min()) if self.count else np.nan
+        self.max = float(x.max()) if self.count else np.nan
+        self.passed = int(np.sum(x >= pass_mark))
+        # anything outside 0-100 goes into the end bins
+        self.hist = np.histogram(np.clip(x, EDGES[0], EDGES[-1]), bins=EDGES)[0]
+
+    @classmethod
+    def pooled(cls, parts):
+        out = cls.__new__(cls)
+        parts = [p for p in parts if p.count]
+        out.count = sum(p.count for p in parts)
+        out.total = sum(p.total for p in parts)
+        out.squares = sum(p.squares for p in parts)
+        out.min = min((p.min for p in parts), default=np.nan)
+        out.max = max((p.max for p in parts), default=np.nan)
+        out.passed = sum(p.passed for p in parts)
+        out.hist = sum((p.hist for p in parts), np.zeros(len(EDGES) - 1, dtype=np.int64))
+        return out
+
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+    def std(self):
+        # sample std from the running sums
+        if self.count < 2:
+            return np.nan
+        var = (self.squares - self.total * self.total / self.count) / (self.count - 1)
+        return float(np.sqrt(max(var, 0.0)))
+
+    def pass_rate(self):
+        return 100.0 * self.passed / self.count if self.count else np.nan
+
+
+class Section:
+    def __init__(self, name, model, subjects):
+        self.name = name
+        self.model = model
+        self.subjects = subjects          # canonical subject name per model column
+        self.state = {}                   # whatever the viewer needs to switch back to it
+        self._aggregates = None
+        self._aggregates_key = None
+
+    def aggregates(self):
+        # canonical subject (and 'Average') -> Aggregate, rebuilt when the model changes
+        model = self.model
+        key = (id(model), model.version, tuple(model.input_versions.values()))
+        if self._aggregates_key != key:
+            x = model.matrix()
+            out = OrderedDict()
+            for j, subject in enumerate(self.subjects):
+                out[subject] = Aggregate(x[:, j], model.pass_mark)
+            out[OVERALL] = Aggregate(model['Average'], model.pass_mark)
+            self._aggregates = out
+            self._aggregates_key = key
+        return self._aggregates
+
+
+class Workspace:
+    def __init__(self):
+        self.dictionary = SubjectDictionary()
+        self.sections = OrderedDict()     # name -> Section
+        self.current = None
+
+    def add(self, name, model):
+        # the name is made unique ("project.csv (2)") so every tab has its own
+        base, n = name, 2
+        while name in self.sections:
+            name = f"{base} ({n})"
+            n += 1
+        subjects = [self.dictionary.canonical(c) for c in model.subjects]
+        self.sections[name] = Section(name, model, subjects)
+        self.current = name
+        return self.sections[name]
+
+    def replace(self, old, name, model):
+        # a section reloaded from a (new) file keeps its place in the tab order
+        order = list(self.sections)
+        self.sections.pop(old)
+        section = self.add(name, model)
+        self.sections = OrderedDict((section.name, section) if k == old else (k, self.sections[k])
+                                    for k in order)
+        return section
+
+    def remove(self, name):
+        self.sections.pop(name, None)
+        if self.current == name:
+            self.current = next(reversed(self.sections), None)
+
+    def get(self, name=None):
+        return self.sections.get(name if name is not None else self.current)
+
+    def __len__(self):
+        return len(self.sections)
+
+    def subjects(self):
+        # every subject in at least one section (dictionary order), then the average
+        present = set()
+        for section in self.sections.values():
+            present.update(section.subjects)
+        return [s for s in self.dictionary.names.values() if s in present] + [OVERALL]
+
+    def comparison(self):
+        # {subject: [(section name, Aggregate), ..., ('All sections', pooled)]}
+        out = OrderedDict()
+        for subject in self.subjects():
+            parts = [(name, s.aggregates()[subject]) for name, s in self.sections.items()
+                     if subject in s.aggregates()]
+            if len(parts) > 1:
+                parts.append(("All sections", Aggregate.pooled([a for _, a in parts])))
+            out[subject] = parts
+        return out
+
+
+def comparison_text(comparison):
+    lines = ["SECTION COMPARISON", "=" * 70, ""]
+    for subject, parts in comparison.items():
+        lines.append(f"{subject}")
+        lines.append(f"  {'Section':<26}{'N':>7}{'Mean':>8}{'Std':>8}{'Min':>7}{'Max':>7}{'Pass %':>9}")
+        for name, agg in parts:
+            if not agg.count:
+                lines.append(f"  {name[:25]:<26}{0:>7}")
+                continue
+            lines.append(f"  {name[:25]:<26}{agg.count:>7}{agg.mean():>8.1f}{agg.std():>8.1f}"
+                         f"{agg.min:>7.0f}{agg.max:>7.0f}{agg.pass_rate():>8.1f}%")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def comparison_figure(comparison, subject=OVERALL, figsize=(6, 4.5)):
+    # top: mean per subject, one bar per section; bottom: the chosen subject's
+    # distribution per section (share of students per bin, so sizes don't matter)
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize, dpi=100)
+    ax_means, ax_dist = fig.subplots(2, 1)
+    subjects = list(comparison)
+    sections = []
+    for parts in comparison.values():
+        sections += [name for name, _ in parts if name != "All sections" and name not in sections]
+    colors = ['#3498db', '#e67e22', '#2ecc71', '#9b59b6', '#e74c3c', '#16a085', '#7f8c8d']
+
+    width = 0.8 / max(1, len(sections))
+    x = np.arange(len(subjects))
+    for k, name in enumerate(sections):
+        means = []
+        for subject in subjects:
+            agg = dict(comparison[subject]).get(name)
+            means.append(agg.mean() if agg is not None else np.nan)
+        ax_means.bar(x + (k - (len(sections) - 1) / 2) * width, means, width,
+                     color=colors[k % len(colors)], label=name[:20])
+    ax_means.set_xticks(x)
+    ax_means.set_xticklabels([s[:10] for s in subjects], fontsize=8)
+    ax_means.set_ylabel('Mean')
+    ax_means.legend(fontsize=7)
+    ax_means.grid(axis='y', alpha=0.3)
+
+    centers = (EDGES[:-1] + EDGES[1:]) / 2
+    for k, (name, agg) in enumerate(comparison.get(subject, [])):
+        if name == "All sections" or not agg.count:
+            continue
+        ax_dist.step(centers, 100.0 * agg.hist / agg.count, where='mid',
+                     color=colors[sections.index(name) % len(colors)], label=name[:20], linewidth=1.8)
+    ax_dist.set_title(f'{subject} distribution', fontsize=10, fontweight='bold')
+    ax_dist.set_xlabel('Score')
+    ax_dist.set_ylabel('% of section')
+    ax_dist.grid(alpha=0.3)
+    fig.tight_layout()
+    return fig